@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+
+from rlglue.agent import BaseAgent
+from rlglue.linear import SparseLinear
+from rlglue.tiles import ArrayIHT, TileCoder
+
+import numpy as np
+
+# the pendulum (angle, angular velocity) ranges; the angle wraps around
+LOWS = [-np.pi, -2 * np.pi]
+HIGHS = [np.pi, 2 * np.pi]
+
+
+class ActorCriticSoftmaxAgent(BaseAgent):
+    """Average-reward softmax Actor-Critic for the pendulum swing-up.
+
+    The actor preferences (one weight row per action) and the critic values
+    are SparseLinear functions of the tiles of a memoized TileCoder backed
+    by an ArrayIHT. It takes the same actions and makes the same updates as
+    the agent of the notebook, for the same seed.
+    """
+
+    def __init__(self):
+        self.rand_generator = None
+
+        self.actor_step_size = None
+        self.critic_step_size = None
+        self.avg_reward_step_size = None
+
+        self.tc = None
+
+        self.avg_reward = None
+        self.critic = None
+        self.actor = None
+
+        self.actions = None
+
+        self.softmax_prob = None
+        self.prev_tiles = None
+        self.last_action = None
+
+    def agent_init(self, agent_info={}):
+        """Setup for the agent called when the experiment first starts.
+
+        Assume agent_info dict contains:
+        {
+            "iht_size": int
+            "num_tilings": int,
+            "num_tiles": int,
+            "actor_step_size": float,
+            "critic_step_size": float,
+            "avg_reward_step_size": float,
+            "num_actions": int,
+            "seed": int
+        }
+        """
+        self.rand_generator = np.random.RandomState(agent_info.get("seed"))
+
+        iht_size = agent_info.get("iht_size")
+        num_tilings = agent_info.get("num_tilings")
+        num_tiles = agent_info.get("num_tiles")
+
+        self.tc = TileCoder(ArrayIHT(iht_size), num_tilings, LOWS, HIGHS, num_tiles,
+                            wrap=[True, False], memoize=True)
+
+        # the actor and critic step-sizes are divided by the number of tilings (p.217-218 of textbook)
+        self.actor_step_size = agent_info.get("actor_step_size") / num_tilings
+        self.critic_step_size = agent_info.get("critic_step_size") / num_tilings
+        self.avg_reward_step_size = agent_info.get("avg_reward_step_size")
+
+        self.actions = list(range(agent_info.get("num_actions")))
+
+        self.avg_reward = 0.0
+        self.actor = SparseLinear(iht_size, len(self.actions))
+        self.critic = SparseLinear(iht_size)
+
+        self.softmax_prob = None
+        self.prev_tiles = None
+        self.last_action = None
+
+    @property
+    def actor_w(self):
+        return self.actor.weights
+
+    @property
+    def critic_w(self):
+        return self.critic.weights[0]
+
+    def agent_policy(self, active_tiles):
+        """ policy of the agent
+        Args:
+            active_tiles (Numpy array): active tiles returned by tile coder
+
+        Returns:
+            The action selected according to the policy
+        """
+        preferences = self.actor.values(active_tiles)
+        numerator = np.exp(preferences - np.max(preferences))
+        softmax_prob = numerator / numerator.sum()
+
+        chosen_action = self.rand_generator.choice(self.actions, p=softmax_prob)
+
+        # save softmax_prob as it will be useful later when updating the Actor
+        self.softmax_prob = softmax_prob
+
+        return chosen_action
+
+    def agent_start(self, state):
+        """The first method called when the experiment starts, called after
+        the environment starts.
+        Args:
+            state (Numpy array): the state from the environment's env_start function.
+        Returns:
+            The first action the agent takes.
+        """
+        active_tiles = self.tc.get_tiles(state)
+        self.last_action = self.agent_policy(active_tiles)
+        self.prev_tiles = active_tiles
+
+        return self.last_action
+
+    def agent_step(self, reward, state):
+        """A step taken by the agent.
+        Args:
+            reward (float): the reward received for taking the last action taken
+            state (Numpy array): the state from the environment's step based on
+                                where the agent ended up after the
+                                last step.
+        Returns:
+            The action the agent is taking.
+        """
+        active_tiles = self.tc.get_tiles(state)
+
+        delta = reward - self.avg_reward + self.critic.value(active_tiles) - self.critic.value(self.prev_tiles)
+        self.avg_reward += self.avg_reward_step_size * delta
+        self.critic.update(self.prev_tiles, self.critic_step_size * delta, output=0)
+
+        # the gradient of the log softmax policy is (one-hot(last action) - softmax_prob) per action row
+        gradient = -self.softmax_prob
+        gradient[self.last_action] += 1
+        self.actor.update(self.prev_tiles, self.actor_step_size * delta * gradient)
+
+        self.last_action = self.agent_policy(active_tiles)
+        self.prev_tiles = active_tiles
+
+        return self.last_action
+
+    def agent_end(self, reward):
+        """The pendulum task is continuing, so episodes never end."""
+        pass
+
+    def agent_cleanup(self):
+        """Cleanup done after the agent ends."""
+        pass
+
+    def agent_message(self, message):
+        if message == 'get avg reward':
+            return self.avg_reward
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+
+"""The Actor-Critic pendulum experiment of the notebook, as a rlglue.sweep experiment.
+
+Every run takes max_steps steps and records the return so far and the
+exponential average reward of every step. With summaries_experiment the two
+curves go straight into RunningStats, step by step, so a sweep with
+keep_runs=False never keeps a (num_runs, max_steps) array:
+
+    run_sweep(PendulumEnvironment, ActorCriticSoftmaxAgent, agent_parameters,
+              {"num_runs": 50, "max_steps": 20000}, NAME_FORMAT,
+              experiment=summaries_experiment, summaries=True, keep_runs=False)
+    plot_script.plot_result(agent_parameters, "results")
+"""
+
+import numpy as np
+
+from rlglue.stats import RunningStats
+
+# the names of the notebook's result files, which plot_script reads
+NAME_FORMAT = ("ActorCriticSoftmax_tilings_{num_tilings}_tiledim_{num_tiles}_actor_ss_{actor_step_size}"
+               "_critic_ss_{critic_step_size}_avg_reward_ss_{avg_reward_step_size}")
+
+
+def run_steps(rl_glue, max_steps):
+    """Starts an episode and takes max_steps steps
+
+    Yields:
+        (int, float, float): the step (from 0), the return so far and the
+            exponential average reward without initial bias
+    """
+    rl_glue.rl_start()
+
+    total_return = 0.
+    exp_avg_reward = 0.0
+    exp_avg_reward_ss = 0.01
+    exp_avg_reward_normalizer = 0
+
+    for step in range(max_steps):
+        reward = rl_glue.rl_step()[0]
+        total_return += reward
+
+        exp_avg_reward_normalizer = exp_avg_reward_normalizer + exp_avg_reward_ss * (1 - exp_avg_reward_normalizer)
+        ss = exp_avg_reward_ss / exp_avg_reward_normalizer
+        exp_avg_reward += ss * (reward - exp_avg_reward)
+
+        yield step, total_return, exp_avg_reward
+
+
+def curves_experiment(rl_glue, experiment_parameters):
+    """One run, as the notebook's run_experiment records it.
+
+    Returns:
+        dict: the (max_steps,) "total_return" and "exp_avg_reward" curves
+    """
+    max_steps = experiment_parameters["max_steps"]
+    return_per_step = np.zeros(max_steps)
+    exp_avg_reward_per_step = np.zeros(max_steps)
+
+    for step, total_return, exp_avg_reward in run_steps(rl_glue, max_steps):
+        return_per_step[step] = total_return
+        exp_avg_reward_per_step[step] = exp_avg_reward
+
+    return {"total_return": return_per_step, "exp_avg_reward": exp_avg_reward_per_step}
+
+
+def summaries_experiment(rl_glue, experiment_parameters):
+    """One run, fed step by step into RunningStats (for a sweep with keep_runs=False).
+
+    Returns:
+        dict: the "total_return" and "exp_avg_reward" RunningStats of the run
+    """
+    max_steps = experiment_parameters["max_steps"]
+    return_stats = RunningStats(max_steps)
+    exp_avg_reward_stats = RunningStats(max_steps)
+
+    for step, total_return, exp_avg_reward in run_steps(rl_glue, max_steps):
+        return_stats.add(total_return, start=step)
+        exp_avg_reward_stats.add(exp_avg_reward, start=step)
+
+    return {"total_return": return_stats, "exp_avg_reward": exp_avg_reward_stats}
@@ -1,4 +1,4 @@
-from environment import BaseEnvironment
+from rlglue.environment import BaseEnvironment
 import numpy as np
 
 class PendulumEnvironment(BaseEnvironment):
@@ -112,4 +112,109 @@ class PendulumEnvironment(BaseEnvironment):
         
         self.reward_obs_term = (reward, observation, is_terminal)
         
-        return self.reward_obs_term
\ No newline at end of file
+        return self.reward_obs_term
+
+
+class BatchPendulumEnvironment:
+    """BatchPendulumEnvironment class
+
+    num_runs pendulums with the dynamics of PendulumEnvironment, stepped
+    together with the batched protocol of rlglue.VectorRLGlue. The angles and
+    angular velocities are a (num_runs, 2) array updated in place, and the
+    actions (0, 1, 2) index an array of torques, so no per-pendulum Python
+    code runs in env_step_batch.
+
+    args (in env_info):
+        num_runs (int): the number of pendulums (default 1)
+    """
+
+    def __init__(self):
+        self.num_runs = None
+        self.ang_velocity_range = None
+        self.dt = None
+        self.gravity = None
+        self.mass = None
+        self.length = None
+
+        self.valid_actions = None
+        self.actions = None
+        self.current_states = None
+        self.reward_obs_term = (None, None, None)
+
+    def env_init(self, env_info={}):
+        """Setup for the environment called when the experiment first starts."""
+        self.num_runs = env_info.get("num_runs", 1)
+
+        self.ang_velocity_range = [-2 * np.pi, 2 * np.pi]
+        self.dt = 0.05
+        self.gravity = 9.8
+        self.mass = float(1./3.)
+        self.length = float(3./2.)
+
+        self.valid_actions = (0,1,2)
+        self.actions = np.array([-1., 0., 1.])
+
+        self.current_states = np.zeros((self.num_runs, 2))
+
+    def env_start_batch(self, mask=None):
+        """Puts the pendulums selected by mask (every one if mask is None) at rest, hanging down.
+
+        Returns:
+            Numpy array: the (num_runs, 2) angles and angular velocities
+        """
+        if mask is None:
+            mask = np.ones(self.num_runs, dtype=bool)
+        self.current_states[mask] = [-np.pi, 0.]
+
+        return self.current_states.copy()
+
+    def env_step_batch(self, actions):
+        """Steps every pendulum with its own action.
+
+        Args:
+            actions (Numpy array): one action in valid_actions per pendulum
+
+        Returns:
+            (Numpy array, Numpy array, Numpy array): the (num_runs,) rewards,
+                the (num_runs, 2) observations and the (num_runs,) terminal
+                flags, which are always False
+        """
+        beta = self.current_states[:, 0]
+        betadot = self.current_states[:, 1]
+
+        torque = self.actions[actions]
+        betadot += 0.75 * (torque + self.mass * self.length * self.gravity * np.sin(beta)) / (self.mass * self.length**2) * self.dt
+
+        beta += betadot * self.dt
+
+        # normalize angle
+        beta += np.pi
+        np.remainder(beta, 2 * np.pi, out=beta)
+        beta -= np.pi
+
+        # reset if out of bound
+        out_of_bound = (betadot < self.ang_velocity_range[0]) | (betadot > self.ang_velocity_range[1])
+        self.current_states[out_of_bound] = [-np.pi, 0.]
+
+        # compute reward
+        rewards = -(np.abs(((beta + np.pi) % (2 * np.pi)) - np.pi))
+        terminals = np.zeros(self.num_runs, dtype=bool)
+
+        self.reward_obs_term = (rewards, self.current_states.copy(), terminals)
+
+        return self.reward_obs_term
+
+    def env_cleanup(self):
+        """Cleanup done after the environment ends"""
+        pass
+
+    def env_message(self, message):
+        """A message asking the environment for information
+
+        Args:
+            message: the message passed to the environment
+
+        Returns:
+            the response (or answer) to the message
+        """
+        pass
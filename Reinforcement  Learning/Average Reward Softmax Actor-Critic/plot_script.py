@@ -1,6 +1,32 @@
+import os
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+from rlglue.results import open_results
+from rlglue.stats import load_summary
+
+
+def load_runs(store, directory, load_name, file_type, x_range, **config):
+    """The (runs, x_range) results of one configuration, sliced from the results store
+    in directory if there is one, otherwise from its .npy file"""
+    if store is not None:
+        return store.get(file_type, x_range=x_range, **config)
+    return np.load('{}/{}_{}.npy'.format(directory, load_name, file_type))[:, :x_range]
+
+
+def load_mean_std_err(store, directory, load_name, file_type, x_range, **config):
+    """The mean and standard error over runs of the first x_range steps of one configuration,
+    and the number of runs. Reads the rlglue.stats.RunningStats summary
+    "{load_name}_{file_type}_summary.npz" when the experiment saved one, otherwise every run"""
+    summary_path = '{}/{}_{}_summary.npz'.format(directory, load_name, file_type)
+    if os.path.exists(summary_path):
+        summary = load_summary(summary_path, x_range)
+        return summary["mean"], summary["std_err"], int(summary["count"].max())
+
+    data = load_runs(store, directory, load_name, file_type, x_range, **config)
+    return np.mean(data, axis=0), np.std(data, axis=0)/np.sqrt(len(data)), len(data)
+
 # Function to plot result
 def plot_result(agent_parameters, directory):
     
@@ -13,6 +39,7 @@ def plot_result(agent_parameters, directory):
     plt1_yticks = range(0, -6001, -2000)
     plt2_yticks = range(-3, 1, 1)
     
+    store = open_results(directory)
         
     # single plots: Exp Avg reward 
     fig, ax = plt.subplots(nrows=2, ncols=1, figsize=(12,14))
@@ -24,16 +51,12 @@ def plot_result(agent_parameters, directory):
                     for avg_reward_ss in agent_parameters["avg_reward_step_size"]:
 
                         load_name = 'ActorCriticSoftmax_tilings_{}_tiledim_{}_actor_ss_{}_critic_ss_{}_avg_reward_ss_{}'.format(num_tilings, num_tiles, actor_ss, critic_ss, avg_reward_ss)
+                        config = {"num_tilings": num_tilings, "num_tiles": num_tiles, "actor_step_size": actor_ss,
+                                  "critic_step_size": critic_ss, "avg_reward_step_size": avg_reward_ss}
                         
                         ### plot1
                         file_type1 = "total_return"
-                        data = np.load('{}/{}_{}.npy'.format(directory, load_name, file_type1))
-
-                        data_mean = np.mean(data, axis=0)
-                        data_std_err = np.std(data, axis=0)/np.sqrt(len(data))
-
-                        data_mean = data_mean[:x_range]
-                        data_std_err = data_std_err[:x_range]
+                        data_mean, data_std_err, num_runs = load_mean_std_err(store, directory, load_name, file_type1, x_range, **config)
 
                         plt_x_legend = range(0,len(data_mean))[:x_range]
 
@@ -44,13 +67,7 @@ def plot_result(agent_parameters, directory):
     
                         ### plot2
                         file_type2 = "exp_avg_reward"
-                        data = np.load('{}/{}_{}.npy'.format(directory, load_name, file_type2))
-
-                        data_mean = np.mean(data, axis=0)
-                        data_std_err = np.std(data, axis=0)/np.sqrt(len(data))
-
-                        data_mean = data_mean[:x_range]
-                        data_std_err = data_std_err[:x_range]
+                        data_mean, data_std_err, num_runs = load_mean_std_err(store, directory, load_name, file_type2, x_range, **config)
 
                         plt_x_legend = range(1,len(data_mean) + 1)[:x_range]
 
@@ -83,7 +100,7 @@ def plot_result(agent_parameters, directory):
     ax[1].set_xlim([0,20000])
     ax[1].set_ylim([-3, 0.16])
 
-    plt.suptitle("Average Reward Softmax Actor-Critic ({} Runs)".format(len(data)),fontsize=16, fontweight='bold', y=1.03)
+    plt.suptitle("Average Reward Softmax Actor-Critic ({} Runs)".format(num_runs),fontsize=16, fontweight='bold', y=1.03)
                     
     # ax[1].legend(handles=plt2_agent_sweeps)
 
@@ -110,6 +127,8 @@ def plot_sweep_result(directory):
     plt_xlabels = [1, 5000, 10000, 15000, 20000]
     plt2_yticks = range(-3, 1, 1)
 
+    store = open_results(directory)
+
     top_results = [{"actor_ss": 0.25, "critic_ss": 2, "avg_reward_ss": 0.03125},
                   {"actor_ss": 0.25, "critic_ss": 2, "avg_reward_ss": 0.015625},
                   {"actor_ss": 0.5, "critic_ss": 2, "avg_reward_ss": 0.0625},
@@ -127,13 +146,10 @@ def plot_sweep_result(directory):
         load_name = 'ActorCriticSoftmax_tilings_{}_tiledim_{}_actor_ss_{}_critic_ss_{}_avg_reward_ss_{}'.format(num_tilings, num_tiles, actor_ss, critic_ss, avg_reward_ss)
 
         file_type2 = "exp_avg_reward"
-        data = np.load('{}/{}_{}.npy'.format(directory, load_name, file_type2))
-
-        data_mean = np.mean(data, axis=0)
-        data_std_err = np.std(data, axis=0)/np.sqrt(len(data))
-
-        data_mean = data_mean[:x_range]
-        data_std_err = data_std_err[:x_range]
+        data_mean, data_std_err, num_runs = load_mean_std_err(
+            store, directory, load_name, file_type2, x_range,
+            num_tilings=num_tilings, num_tiles=num_tiles, actor_step_size=actor_ss,
+            critic_step_size=critic_ss, avg_reward_step_size=avg_reward_ss)
 
         plt_x_legend = range(1,len(data_mean) + 1)[:x_range]
 
@@ -145,7 +161,7 @@ def plot_sweep_result(directory):
     ax.set_xticks(plt_xticks)
     ax.set_yticks(plt2_yticks)
 
-    ax.set_title("Exponential Average Reward per Step ({} Runs)".format(len(data)))
+    ax.set_title("Exponential Average Reward per Step ({} Runs)".format(num_runs))
     ax.set_xlabel('Training steps')
     ax.set_ylabel('Exponential Average Reward', rotation=90)
     ax.set_xticklabels(plt_xlabels)
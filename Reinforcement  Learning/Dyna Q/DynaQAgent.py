@@ -1,8 +1,11 @@
 from abc import ABCMeta
 
-from agent import BaseAgent
+from rlglue.agent import BaseAgent
+from rlglue.utils import argmax
 import numpy as np
 
+from dyna_model import TabularModel, PriorityQueue, TERMINAL, batch_planning_update
+
 
 class DynaQAgent(BaseAgent, metaclass=ABCMeta):
 
@@ -24,15 +27,27 @@ class DynaQAgent(BaseAgent, metaclass=ABCMeta):
         self.rand_generator = np.random.RandomState(agent_info.get('random_seed', 42))
         self.planning_rand_generator = np.random.RandomState(agent_info.get('planning_random_seed', 42))
 
+        # model_sampling selects how planning picks an experience from the model:
+        #   "state_then_action" (default) draws a visited state, then one of its tried actions,
+        #       with the same random draws as the original dictionary-of-dictionaries model
+        #   "pair" draws one tried (state, action) pair uniformly, with a single draw
+        self.model_sampling = agent_info.get("model_sampling", "state_then_action")
+
+        # planning_mode selects how the planning updates are applied:
+        #   "loop" (default) samples and updates one experience at a time
+        #   "sequential" samples all planning_steps experiences at once and applies them in
+        #       vectorized chunks, with the same values as updating them one after another
+        #   "jacobi" computes every TD target from the same action values and updates them at once
+        self.planning_mode = agent_info.get("planning_mode", "loop")
+
         # Next, we initialize the attributes required by the agent, e.g., q_values, model, etc.
-        # A simple way to implement the model is to have a dictionary of dictionaries,
-        #        mapping each state to a dictionary which maps actions to (reward, next state) tuples.
+        # The model stores the (next state, reward) of every tried (state, action) in arrays,
+        # see TabularModel; model.as_dict() gives the equivalent dictionary of dictionaries.
         self.q_values = np.zeros((self.num_states, self.num_actions))
         self.actions = list(range(self.num_actions))
         self.past_action = -1
         self.past_state = -1
-        self.model = {}  # model is a dictionary of dictionaries, which maps states to actions to
-        # (reward, next_state) tuples
+        self.model = TabularModel(self.num_states, self.num_actions)
 
     def agent_init(self, agent_info: dict):
         """Setup for the agent called when the experiment first starts.
@@ -50,6 +65,8 @@ class DynaQAgent(BaseAgent, metaclass=ABCMeta):
 
                 random_seed (int): the seed for the RNG used in epsilon-greedy
                 planning_random_seed (int): the seed for the RNG used in the planner
+                model_sampling (str): "state_then_action" (default) or "pair", see TabularModel
+                planning_mode (str): "loop" (default), "sequential" or "jacobi", see batch_planning_update
             }
         """
 
@@ -70,15 +87,27 @@ class DynaQAgent(BaseAgent, metaclass=ABCMeta):
         self.rand_generator = np.random.RandomState(agent_info.get('random_seed', 42))
         self.planning_rand_generator = np.random.RandomState(agent_info.get('planning_random_seed', 42))
 
+        # model_sampling selects how planning picks an experience from the model:
+        #   "state_then_action" (default) draws a visited state, then one of its tried actions,
+        #       with the same random draws as the original dictionary-of-dictionaries model
+        #   "pair" draws one tried (state, action) pair uniformly, with a single draw
+        self.model_sampling = agent_info.get("model_sampling", "state_then_action")
+
+        # planning_mode selects how the planning updates are applied:
+        #   "loop" (default) samples and updates one experience at a time
+        #   "sequential" samples all planning_steps experiences at once and applies them in
+        #       vectorized chunks, with the same values as updating them one after another
+        #   "jacobi" computes every TD target from the same action values and updates them at once
+        self.planning_mode = agent_info.get("planning_mode", "loop")
+
         # Next, we initialize the attributes required by the agent, e.g., q_values, model, etc.
-        # A simple way to implement the model is to have a dictionary of dictionaries,
-        #        mapping each state to a dictionary which maps actions to (reward, next state) tuples.
+        # The model stores the (next state, reward) of every tried (state, action) in arrays,
+        # see TabularModel; model.as_dict() gives the equivalent dictionary of dictionaries.
         self.q_values = np.zeros((self.num_states, self.num_actions))
         self.actions = list(range(self.num_actions))
         self.past_action = -1
         self.past_state = -1
-        self.model = {}  # model is a dictionary of dictionaries, which maps states to actions to
-        # (reward, next_state) tuples
+        self.model = TabularModel(self.num_states, self.num_actions)
 
     def update_model(self, past_state: int, past_action: int, state: int, reward: float):
         """updates the model
@@ -95,9 +124,7 @@ class DynaQAgent(BaseAgent, metaclass=ABCMeta):
 
         # ----------------
         # your code here
-        model_sa = self.model.get(past_state, {})
-        model_sa[past_action] = state, reward
-        self.model[past_state] = model_sa
+        self.model.update(past_state, past_action, state, reward)
         # ----------------
 
     def planning_step(self):
@@ -126,13 +153,21 @@ class DynaQAgent(BaseAgent, metaclass=ABCMeta):
 
         # ----------------
         # your code here
+        if self.planning_mode != "loop" and self.planning_steps > 0:
+            states, actions = self.model.sample_batch(self.planning_rand_generator, self.planning_steps,
+                                                      self.model_sampling)
+            batch_planning_update(self.q_values, self.model, states, actions, self.step_size, self.gamma,
+                                  mode=self.planning_mode)
+            return
+
+        sample = self.model.sample_pair if self.model_sampling == "pair" else self.model.sample
         for _ in range(self.planning_steps):
-            s = self.planning_rand_generator.choice(list(self.model.keys()))
-            a = self.planning_rand_generator.choice(list(self.model[s].keys()))
-            next_s, reward = self.model[s][a]
+            s, a = sample(self.planning_rand_generator)
+            next_s = self.model.next_state[s, a]
+            reward = self.model.reward[s, a]
             self.q_values[s, a] += (self.step_size *
                                     (reward
-                                     + self.gamma * (np.max(self.q_values[next_s, :]) if next_s != -1 else 0)
+                                     + self.gamma * (np.max(self.q_values[next_s, :]) if next_s != TERMINAL else 0)
                                      - self.q_values[s, a]))
         # ----------------
 
@@ -143,18 +178,7 @@ class DynaQAgent(BaseAgent, metaclass=ABCMeta):
         Returns:
             action (int): an action with the highest value
         """
-        top = float("-inf")
-        ties = []
-
-        for i in range(len(q_values)):
-            if q_values[i] > top:
-                top = q_values[i]
-                ties = []
-
-            if q_values[i] == top:
-                ties.append(i)
-
-        return self.rand_generator.choice(ties)
+        return argmax(q_values, self.rand_generator)
 
     def choose_action_egreedy(self, state):
         """returns an action using an epsilon-greedy policy w.r.t. the current action-value function.
@@ -295,6 +319,8 @@ class DynaQPlusAgent(BaseAgent, metaclass=ABCMeta):
         self.epsilon = agent_info.get("epsilon", 0.1)
         self.planning_steps = agent_info.get("planning_steps", 10)
         self.kappa = agent_info.get("kappa", 0.001)
+        self.model_sampling = agent_info.get("model_sampling", "state_then_action")
+        self.planning_mode = agent_info.get("planning_mode", "loop")
 
         self.rand_generator = np.random.RandomState(agent_info.get('random_seed', 42))
         self.planning_rand_generator = np.random.RandomState(agent_info.get('planning_random_seed', 42))
@@ -306,7 +332,7 @@ class DynaQPlusAgent(BaseAgent, metaclass=ABCMeta):
         self.actions = list(range(self.num_actions))
         self.past_action = -1
         self.past_state = -1
-        self.model = {}
+        self.model = TabularModel(self.num_states, self.num_actions)
 
     def agent_init(self, agent_info: dict):
         """Setup for the agent called when the experiment first starts.
@@ -324,6 +350,8 @@ class DynaQPlusAgent(BaseAgent, metaclass=ABCMeta):
 
                 random_seed (int): the seed for the RNG used in epsilon-greedy
                 planning_random_seed (int): the seed for the RNG used in the planner
+                model_sampling (str): "state_then_action" (default) or "pair", see TabularModel
+                planning_mode (str): "loop" (default), "sequential" or "jacobi", see batch_planning_update
             }
         """
 
@@ -341,6 +369,8 @@ class DynaQPlusAgent(BaseAgent, metaclass=ABCMeta):
         self.epsilon = agent_info.get("epsilon", 0.1)
         self.planning_steps = agent_info.get("planning_steps", 10)
         self.kappa = agent_info.get("kappa", 0.001)
+        self.model_sampling = agent_info.get("model_sampling", "state_then_action")
+        self.planning_mode = agent_info.get("planning_mode", "loop")
 
         self.rand_generator = np.random.RandomState(agent_info.get('random_seed', 42))
         self.planning_rand_generator = np.random.RandomState(agent_info.get('planning_random_seed', 42))
@@ -352,7 +382,7 @@ class DynaQPlusAgent(BaseAgent, metaclass=ABCMeta):
         self.actions = list(range(self.num_actions))
         self.past_action = -1
         self.past_state = -1
-        self.model = {}
+        self.model = TabularModel(self.num_states, self.num_actions)
 
     def update_model(self, past_state, past_action, state, reward):
         """updates the model
@@ -372,15 +402,15 @@ class DynaQPlusAgent(BaseAgent, metaclass=ABCMeta):
         # Note: do *not* update the visitation-counts here. We will do that in `agent_step`.
         #
         # (3 lines)
-        if past_state not in self.model:
-            self.model[past_state] = {past_action: (state, reward)}
+        if self.model.num_observed_actions[past_state] == 0:
+            self.model.update(past_state, past_action, state, reward)
             # ----------------
             # your code here
             for action in filter(lambda x: x != past_action, self.actions):
-                self.model[past_state][action] = (past_state, 0)
+                self.model.update(past_state, action, past_state, 0)
             # ----------------
         else:
-            self.model[past_state][past_action] = (state, reward)
+            self.model.update(past_state, past_action, state, reward)
 
     def planning_step(self):
         """performs planning, i.e. indirect RL.
@@ -408,14 +438,23 @@ class DynaQPlusAgent(BaseAgent, metaclass=ABCMeta):
 
         # ----------------
         # your code here
+        if self.planning_mode != "loop" and self.planning_steps > 0:
+            states, actions = self.model.sample_batch(self.planning_rand_generator, self.planning_steps,
+                                                      self.model_sampling)
+            bonus = self.kappa * np.sqrt(self.tau[self.past_state, self.past_action])
+            batch_planning_update(self.q_values, self.model, states, actions, self.step_size, self.gamma,
+                                  bonus=bonus, mode=self.planning_mode)
+            return
+
+        sample = self.model.sample_pair if self.model_sampling == "pair" else self.model.sample
         for _ in range(self.planning_steps):
-            s = self.planning_rand_generator.choice(list(self.model.keys()))
-            a = self.planning_rand_generator.choice(list(self.model[s].keys()))
-            next_s, reward = self.model[s][a]
+            s, a = sample(self.planning_rand_generator)
+            next_s = self.model.next_state[s, a]
+            reward = self.model.reward[s, a]
             reward += self.kappa * np.sqrt(self.tau[self.past_state, self.past_action])
             self.q_values[s, a] += (self.step_size *
                                     (reward
-                                     + self.gamma * (np.max(self.q_values[next_s, :]) if next_s != -1 else 0)
+                                     + self.gamma * (np.max(self.q_values[next_s, :]) if next_s != TERMINAL else 0)
                                      - self.q_values[s, a]))
         # ----------------
 
@@ -426,18 +465,7 @@ class DynaQPlusAgent(BaseAgent, metaclass=ABCMeta):
         Returns:
             action (int): an action with the highest value
         """
-        top = float("-inf")
-        ties = []
-
-        for i in range(len(q_values)):
-            if q_values[i] > top:
-                top = q_values[i]
-                ties = []
-
-            if q_values[i] == top:
-                ties.append(i)
-
-        return self.rand_generator.choice(ties)
+        return argmax(q_values, self.rand_generator)
 
     def choose_action_egreedy(self, state):
         """returns an action using an epsilon-greedy policy w.r.t. the current action-value function.
@@ -539,3 +567,96 @@ class DynaQPlusAgent(BaseAgent, metaclass=ABCMeta):
         self.update_model(self.past_state, self.past_action, -1, reward)
         self.planning_step()
         # ----------------
+
+
+class PrioritizedSweepingAgent(DynaQAgent):
+    """Dyna-Q with prioritized sweeping instead of uniform random search control.
+
+    Every real transition is queued with the magnitude of its TD error as
+    priority. Each planning step updates the queued (state, action) with the
+    highest priority, then queues the (state, action) pairs the model predicts
+    lead into that state, so value changes are propagated backwards only along
+    the transitions they affect. Planning stops early once the queue is empty.
+    """
+
+    def __init__(self, agent_info: dict):
+        super().__init__(agent_info)
+        self.priority_threshold = agent_info.get("priority_threshold", 1e-4)
+        self.queue = PriorityQueue(self.num_states * self.num_actions)
+        self.num_planning_updates = 0
+
+    def agent_init(self, agent_info: dict):
+        """Setup for the agent called when the experiment first starts.
+
+        Args:
+            agent_info (dict): the parameters of DynaQAgent.agent_init, where planning_steps is the
+                maximum number of queued updates per environmental interaction, plus
+            {
+                priority_threshold (float): only TD errors larger than this are queued (default 1e-4)
+            }
+        """
+        super().agent_init(agent_info)
+        self.priority_threshold = agent_info.get("priority_threshold", 1e-4)
+        self.queue = PriorityQueue(self.num_states * self.num_actions)
+        self.num_planning_updates = 0
+
+    def queue_update(self, state, action, priority):
+        """Queues (state, action) if its priority exceeds priority_threshold."""
+        if priority > self.priority_threshold:
+            self.queue.push(state * self.num_actions + action, priority)
+
+    def planning_step(self):
+        """performs planning, i.e. indirect RL, on the (state, action) pairs with the largest TD errors.
+
+        Returns:
+            Nothing
+        """
+        model = self.model
+        q_values = self.q_values
+        for _ in range(self.planning_steps):
+            if not self.queue:
+                break
+
+            s, a = divmod(self.queue.pop()[0], self.num_actions)
+            next_s = model.next_state[s, a]
+            q_values[s, a] += (self.step_size *
+                               (model.reward[s, a]
+                                + self.gamma * (np.max(q_values[next_s, :]) if next_s != TERMINAL else 0)
+                                - q_values[s, a]))
+            self.num_planning_updates += 1
+
+            value = self.gamma * np.max(q_values[s, :])
+            for past_s, past_a in model.predecessors[s]:
+                self.queue_update(past_s, past_a, abs(model.reward[past_s, past_a] + value - q_values[past_s, past_a]))
+
+    def agent_step(self, reward, state):
+        """A step taken by the agent.
+
+        Args:
+            reward (float): the reward received for taking the last action taken
+            state (int): the state the agent ended up in after the last step
+        Returns:
+            (int) The action the agent takes given this state.
+        """
+        # the real transition is learnt through the queue, there is no separate direct-RL update
+        self.update_model(self.past_state, self.past_action, state, reward)
+        self.queue_update(self.past_state, self.past_action,
+                          abs(reward + self.gamma * np.max(self.q_values[state, :])
+                              - self.q_values[self.past_state, self.past_action]))
+        self.planning_step()
+        self.past_state = state
+        self.past_action = self.choose_action_egreedy(state)
+
+        return self.past_action
+
+    def agent_end(self, reward):
+        """Called when the agent terminates.
+
+        Args:
+            reward (float): the reward the agent received for entering the
+                terminal state.
+        """
+        self.update_model(self.past_state, self.past_action, TERMINAL, reward)
+        self.queue_update(self.past_state, self.past_action,
+                          abs(reward - self.q_values[self.past_state, self.past_action]))
+        self.planning_step()
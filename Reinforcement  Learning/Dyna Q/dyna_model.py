@@ -0,0 +1,255 @@
+import numpy as np
+
+TERMINAL = -1
+
+
+class TabularModel:
+    """Deterministic tabular model of the (s, a) -> (s', r) transitions seen so far.
+
+    The transitions live in preallocated (num_states, num_actions) arrays, and
+    the observed states, the observed actions of every state and the observed
+    (s, a) pairs are kept as dense arrays in first-visit order, so sampling an
+    experience is O(1) instead of rebuilding lists of dictionary keys.
+
+    A terminal next state is stored as TERMINAL (-1). predecessors[s'] is the
+    set of (s, a) pairs whose modelled next state is s', for backward
+    (prioritized sweeping) planning.
+    """
+
+    def __init__(self, num_states: int, num_actions: int):
+        self.num_states = num_states
+        self.num_actions = num_actions
+
+        self.next_state = np.full((num_states, num_actions), TERMINAL, dtype=int)
+        self.reward = np.zeros((num_states, num_actions))
+        self.observed = np.zeros((num_states, num_actions), dtype=bool)
+
+        # observed states in first-visit order, and their observed actions in first-visit order
+        self.states = np.zeros(num_states, dtype=int)
+        self.num_observed_states = 0
+        self.actions = np.zeros((num_states, num_actions), dtype=int)
+        self.num_observed_actions = np.zeros(num_states, dtype=int)
+
+        # observed (s, a) pairs in first-visit order, and the position of each pair
+        self.pairs = np.zeros((num_states * num_actions, 2), dtype=int)
+        self.num_pairs = 0
+        self.pair_index = np.full((num_states, num_actions), -1, dtype=int)
+
+        self.predecessors = [set() for _ in range(num_states)]
+
+    def update(self, state: int, action: int, next_state: int, reward: float):
+        """Stores (or overwrites) the outcome of taking action in state."""
+        if not self.observed[state, action]:
+            if self.num_observed_actions[state] == 0:
+                self.states[self.num_observed_states] = state
+                self.num_observed_states += 1
+
+            self.actions[state, self.num_observed_actions[state]] = action
+            self.num_observed_actions[state] += 1
+
+            self.pairs[self.num_pairs] = state, action
+            self.pair_index[state, action] = self.num_pairs
+            self.num_pairs += 1
+
+            self.observed[state, action] = True
+
+        else:
+            previous_state = self.next_state[state, action]
+            if previous_state != next_state and previous_state != TERMINAL:
+                self.predecessors[previous_state].discard((state, action))
+
+        if next_state != TERMINAL:
+            self.predecessors[next_state].add((state, action))
+
+        self.next_state[state, action] = next_state
+        self.reward[state, action] = reward
+
+    def sample(self, rand_generator):
+        """Draws an observed state uniformly, then one of its observed actions uniformly.
+
+        Consumes rand_generator exactly like
+            s = rand_generator.choice(list(model.keys()))
+            a = rand_generator.choice(list(model[s].keys()))
+        on the equivalent dictionary-of-dictionaries model, so seeded runs are
+        unchanged.
+
+        Returns:
+            (int, int): the sampled state and action
+        """
+        state = self.states[rand_generator.randint(self.num_observed_states)]
+        action = self.actions[state, rand_generator.randint(self.num_observed_actions[state])]
+
+        return state, action
+
+    def sample_pair(self, rand_generator):
+        """Draws an observed (s, a) pair uniformly, with a single draw.
+
+        Returns:
+            (int, int): the sampled state and action
+        """
+        state, action = self.pairs[rand_generator.randint(self.num_pairs)]
+
+        return state, action
+
+    def sample_batch(self, rand_generator, size, sampling="state_then_action"):
+        """Draws size experiences at once.
+
+        Every draw follows the same distribution as sample (or sample_pair for
+        sampling="pair"), but the draws are made in vectorized calls, so the
+        random stream differs from size calls to sample.
+
+        Returns:
+            (Numpy array, Numpy array): the sampled states and actions
+        """
+        if sampling == "pair":
+            pairs = self.pairs[rand_generator.randint(self.num_pairs, size=size)]
+            return pairs[:, 0], pairs[:, 1]
+
+        states = self.states[rand_generator.randint(self.num_observed_states, size=size)]
+        actions = self.actions[states, rand_generator.randint(0, self.num_observed_actions[states])]
+
+        return states, actions
+
+    def as_dict(self):
+        """The model as a dictionary of dictionaries, {s: {a: (s', r)}}, in first-visit order."""
+        return {int(s): {int(a): (int(self.next_state[s, a]), self.reward[s, a])
+                         for a in self.actions[s, :self.num_observed_actions[s]]}
+                for s in self.states[:self.num_observed_states]}
+
+
+class PriorityQueue:
+    """Max-priority queue of the items 0, ..., size - 1, with decrease-key.
+
+    A binary heap that also tracks the heap position of every item, so pushing
+    an item that is already queued raises its priority in place (the
+    decrease-key of the equivalent min-heap) instead of adding a duplicate.
+    """
+
+    def __init__(self, size: int):
+        self.heap = []
+        self.priorities = [0.0] * size
+        self.positions = [-1] * size
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return self.positions[item] != -1
+
+    def push(self, item: int, priority: float):
+        """Queues item, or raises its priority if it is queued with a lower one."""
+        position = self.positions[item]
+        if position == -1:
+            self.heap.append(item)
+            position = len(self.heap) - 1
+        elif priority <= self.priorities[item]:
+            return
+
+        self.priorities[item] = priority
+        self._sift_up(item, position)
+
+    def pop(self):
+        """Removes the item with the highest priority.
+
+        Returns:
+            (int, float): the item and its priority
+        """
+        item = self.heap[0]
+        last = self.heap.pop()
+        self.positions[item] = -1
+        if self.heap:
+            self._sift_down(last, 0)
+
+        return item, self.priorities[item]
+
+    def clear(self):
+        for item in self.heap:
+            self.positions[item] = -1
+        self.heap = []
+
+    def _sift_up(self, item, position):
+        heap, priorities, positions = self.heap, self.priorities, self.positions
+        priority = priorities[item]
+        while position > 0:
+            parent = (position - 1) // 2
+            if priorities[heap[parent]] >= priority:
+                break
+            heap[position] = heap[parent]
+            positions[heap[position]] = position
+            position = parent
+
+        heap[position] = item
+        positions[item] = position
+
+    def _sift_down(self, item, position):
+        heap, priorities, positions = self.heap, self.priorities, self.positions
+        priority = priorities[item]
+        size = len(heap)
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and priorities[heap[child + 1]] > priorities[heap[child]]:
+                child += 1
+            if priorities[heap[child]] <= priority:
+                break
+            heap[position] = heap[child]
+            positions[heap[position]] = position
+            position = child
+
+        heap[position] = item
+        positions[item] = position
+
+
+def batch_planning_update(q_values, model, states, actions, step_size, gamma, bonus=0.0, mode="sequential"):
+    """Applies the Q-planning updates of a batch of simulated experiences, in place.
+
+    Args:
+        q_values (Numpy array): the (num_states, num_actions) action values
+        model (TabularModel): the model queried for every (state, action)
+        states (Numpy array): the sampled states
+        actions (Numpy array): the sampled actions
+        step_size (float): the step-size
+        gamma (float): the discount factor
+        bonus (float or Numpy array): added to the modelled rewards (Dyna-Q+)
+        mode (str):
+            "sequential" gives exactly the values of updating the samples one
+                after another: the batch is cut into consecutive chunks in
+                which no sample reads a row of q_values written earlier in the
+                chunk, and each chunk is updated with fancy indexing.
+            "jacobi" computes every TD target from the current q_values and
+                applies all the updates at once (repeated pairs add up).
+    """
+    next_states = model.next_state[states, actions]
+    rewards = model.reward[states, actions] + bonus
+    not_terminal = next_states != TERMINAL
+
+    if mode == "jacobi":
+        _apply_updates(q_values, states, actions, next_states, rewards, not_terminal, step_size, gamma)
+        return
+
+    if mode != "sequential":
+        raise ValueError("Unknown planning mode: {}".format(mode))
+
+    rewards = np.broadcast_to(rewards, states.shape)
+    start = 0
+    written = set()
+    for i, (state, next_state) in enumerate(zip(states.tolist(), next_states.tolist())):
+        if state in written or next_state in written:
+            chunk = slice(start, i)
+            _apply_updates(q_values, states[chunk], actions[chunk], next_states[chunk],
+                           rewards[chunk], not_terminal[chunk], step_size, gamma)
+            start = i
+            written.clear()
+        written.add(state)
+
+    chunk = slice(start, len(states))
+    _apply_updates(q_values, states[chunk], actions[chunk], next_states[chunk],
+                   rewards[chunk], not_terminal[chunk], step_size, gamma)
+
+
+def _apply_updates(q_values, states, actions, next_states, rewards, not_terminal, step_size, gamma):
+    """One synchronous Q-learning update of every (state, action) in the batch."""
+    next_values = np.where(not_terminal, q_values[next_states].max(axis=1), 0)
+    targets = rewards + gamma * next_values
+    np.add.at(q_values, (states, actions), step_size * (targets - q_values[states, actions]))
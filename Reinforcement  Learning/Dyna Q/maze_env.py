@@ -1,12 +1,58 @@
 #!/usr/bin/env python
 
-from environment import BaseEnvironment
+from rlglue.environment import BaseEnvironment
 
 import numpy as np
 
+# the (row, col) change of the actions up, right, down and left
+ACTION_MOVES = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+
+
+def compile_transitions(environment, states, next_states, rewards, terminals):
+    """Fills the transition table rows of states for a grid maze
+
+    A move out of the grid or into an obstacle leaves the agent where it is,
+    and moving into the end state gives a reward of 1 and ends the episode.
+
+    Args:
+        environment: the maze, with maze_dim, end_state, out_of_bounds and is_obstacle
+        states (iterable): the state ids of the rows to (re)compute
+        next_states (Numpy array): the (num_states, 4) next state ids, filled in place
+        rewards (Numpy array): the (num_states, 4) rewards, filled in place
+        terminals (Numpy array): the (num_states, 4) terminal flags, filled in place
+    """
+    end = environment.get_observation(environment.end_state)
+    for state in states:
+        row, col = divmod(state, environment.maze_dim[1])
+        for action, (d_row, d_col) in enumerate(ACTION_MOVES):
+            next_row, next_col = row + d_row, col + d_col
+            if environment.out_of_bounds(next_row, next_col) or environment.is_obstacle(next_row, next_col):
+                next_states[state, action] = state
+            else:
+                next_states[state, action] = next_row * environment.maze_dim[1] + next_col
+
+        terminals[state] = next_states[state] == end
+        rewards[state] = terminals[state]
+
+
+def valid_actions(actions):
+    """The actions as an integer array, after checking that every one is 0, 1, 2 or 3."""
+    actions = np.asarray(actions)
+    int_actions = actions.astype(int)
+    if ((int_actions < 0) | (int_actions >= len(ACTION_MOVES)) | (int_actions != actions)).any():
+        raise ValueError("Invalid actions {}".format(actions))
+    return int_actions
+
+
 class MazeEnvironment(BaseEnvironment):
     """Implements the environment for an RLGlue environment
 
+    The moves of every state and action are compiled into a (num_states,
+    num_actions) table of next states, rewards and terminal flags at env_init,
+    so env_step is a table lookup. env_start_batch and env_step_batch step
+    num_runs (from env_info) independent agents in the maze at once, with the
+    batched protocol of rlglue.VectorRLGlue.
+
     Note:
         env_init, env_start, env_step, env_cleanup, and env_message are required
         methods.
@@ -19,7 +65,13 @@ class MazeEnvironment(BaseEnvironment):
 
         self.start_state = [2, 0]
         self.end_state = [0, 8]
-        self.current_state = [None, None]
+        self.current_state = None
+        self.current_states = None
+
+        self.next_states = None
+        self.rewards = None
+        self.terminals = None
+        self.transitions = None
 
         reward = None
         observation = None
@@ -33,9 +85,30 @@ class MazeEnvironment(BaseEnvironment):
             Initialize a tuple with the reward, first state observation, boolean
             indicating if it's terminal.
         """
+        self.compile()
+        self.current_states = np.zeros(agent_info.get("num_runs", 1), dtype=int)
 
         self.reward_obs_term = [0.0, None, False]
 
+    def compile(self):
+        """Builds the transition tables of the current obstacles."""
+        num_states = self.maze_dim[0] * self.maze_dim[1]
+        self.next_states = np.zeros((num_states, len(ACTION_MOVES)), dtype=int)
+        self.rewards = np.zeros((num_states, len(ACTION_MOVES)))
+        self.terminals = np.zeros((num_states, len(ACTION_MOVES)), dtype=bool)
+        self.transitions = [None] * num_states
+
+        self.update_transitions(range(num_states))
+
+    def update_transitions(self, states):
+        """Recomputes the transitions out of states, e.g. after an obstacle moved next to them."""
+        compile_transitions(self, states, self.next_states, self.rewards, self.terminals)
+        for state in states:
+            # the tuples env_step returns, with Python ints, floats and bools
+            self.transitions[state] = list(zip(self.rewards[state].tolist(),
+                                               self.next_states[state].tolist(),
+                                               self.terminals[state].tolist()))
+
     def env_start(self):
         """The first method called when the experiment starts, called before the
         agent starts.
@@ -43,8 +116,8 @@ class MazeEnvironment(BaseEnvironment):
         Returns:
             The first state observation from the environment.
         """
-        self.current_state = self.start_state
-        self.reward_obs_term[1] = self.get_observation(self.current_state)
+        self.current_state = self.get_observation(self.start_state)
+        self.reward_obs_term[1] = self.current_state
 
         return self.reward_obs_term[1]
 
@@ -75,35 +148,41 @@ class MazeEnvironment(BaseEnvironment):
             (float, state, Boolean): a tuple of the reward, state observation,
                 and boolean indicating if it's terminal.
         """
+        # the actions are 0 (up), 1 (right), 2 (down) and 3 (left), compared by value, so 1.0 is right
+        if action not in (0, 1, 2, 3):
+            raise ValueError("Invalid action {}".format(action))
+        reward, self.current_state, is_terminal = self.transitions[self.current_state][int(action)]
 
-        reward = 0.0
-        is_terminal = False
+        self.reward_obs_term = [reward, self.current_state, is_terminal]
 
-        row = self.current_state[0]
-        col = self.current_state[1]
+        return self.reward_obs_term
 
-        # update current_state with the action (also check validity of action)
-        if action == 0: # up
-            if not (self.out_of_bounds(row-1, col) or self.is_obstacle(row-1, col)):
-                self.current_state = [row-1, col]
+    def env_start_batch(self, mask):
+        """Puts the agents selected by mask at the start state.
 
-        elif action == 1: # right
-            if not (self.out_of_bounds(row, col+1) or self.is_obstacle(row, col+1)):
-                self.current_state = [row, col+1]
+        Returns:
+            Numpy array: the state of every agent
+        """
+        self.current_states[mask] = self.get_observation(self.start_state)
+
+        return self.current_states.copy()
 
-        elif action == 2: # down
-            if not (self.out_of_bounds(row+1, col) or self.is_obstacle(row+1, col)):
-                self.current_state = [row+1, col]
+    def env_step_batch(self, actions):
+        """Steps every agent with its own action.
 
-        elif action == 3: # left
-            if not (self.out_of_bounds(row, col-1) or self.is_obstacle(row, col-1)):
-                self.current_state = [row, col-1]
+        Args:
+            actions (Numpy array): one action per agent
 
-        if self.current_state == self.end_state: # terminate if goal is reached
-            reward = 1.0
-            is_terminal = True
+        Returns:
+            (Numpy array, Numpy array, Numpy array): the rewards, states and
+                terminal flags of the agents
+        """
+        actions = valid_actions(actions)
+        rewards = self.rewards[self.current_states, actions]
+        terminals = self.terminals[self.current_states, actions]
+        self.current_states = self.next_states[self.current_states, actions]
 
-        self.reward_obs_term = [reward, self.get_observation(self.current_state), is_terminal]
+        self.reward_obs_term = [rewards, self.current_states.copy(), terminals]
 
         return self.reward_obs_term
 
@@ -129,32 +208,31 @@ class MazeEnvironment(BaseEnvironment):
 
 
 
-class ShortcutMazeEnvironment(BaseEnvironment):
+class ShortcutMazeEnvironment(MazeEnvironment):
     """Implements the environment for an RLGlue environment
 
+    The maze of MazeEnvironment with a wall across it, whose last block opens
+    up as a shortcut at step change_at_n. Only the transitions into the
+    opened cell are recomputed then.
+
     Note:
         env_init, env_start, env_step, env_cleanup, and env_message are required
         methods.
     """
 
     def __init__(self):
+        super().__init__()
 
         self.maze_dim = [6,9]
         self.obstacles = [[3,1],[3,2],[3,3],[3,4],[3,5],[3,6],[3,7],[3,8]]
 
         self.start_state = [5,3]
         self.end_state = [0,8]
-        self.current_state = [None, None]
 
         # a shortcut opens up after n timesteps
         self.change_at_n = 0
         self.timesteps = 0
 
-        reward = None
-        observation = None
-        termination = None
-        self.reward_obs_term = [reward, observation, termination]
-
     def env_init(self, env_info={}):
         """Setup for the environment called when the experiment first starts.
 
@@ -162,38 +240,18 @@ class ShortcutMazeEnvironment(BaseEnvironment):
             Initialize a tuple with the reward, first state observation, boolean
             indicating if it's terminal.
         """
+        super().env_init(env_info)
         self.change_at_n = env_info.get('change_at_n', 100000)
         self.timesteps = 0
-        self.reward_obs_term = [0.0, None, False]
 
-    def env_start(self):
-        """The first method called when the experiment starts, called before the
-        agent starts.
+    def open_shortcut(self):
+        """Removes the last obstacle and patches the transitions of its neighbours."""
+        row, col = self.obstacles[-1]
+        self.obstacles = self.obstacles[:-1]
 
-        Returns:
-            The first state observation from the environment.
-        """
-        self.current_state = self.start_state
-        self.reward_obs_term[1] = self.get_observation(self.current_state)
-
-        return self.reward_obs_term[1]
-
-    # check if current state is within the gridworld and return bool
-    def out_of_bounds(self, row, col):
-        if row < 0 or row > self.maze_dim[0]-1 or col < 0 or col > self.maze_dim[1]-1:
-            return True
-        else:
-            return False
-
-    # check if there is an obstacle at (row, col)
-    def is_obstacle(self, row, col):
-        if [row, col] in self.obstacles:
-            return True
-        else:
-            return False
-
-    def get_observation(self, state):
-        return state[0] * self.maze_dim[1] + state[1]
+        neighbours = [(row - d_row) * self.maze_dim[1] + col - d_col for d_row, d_col in ACTION_MOVES
+                      if not self.out_of_bounds(row - d_row, col - d_col)]
+        self.update_transitions(neighbours)
 
     def env_step(self, action):
         """A step taken by the environment.
@@ -207,54 +265,22 @@ class ShortcutMazeEnvironment(BaseEnvironment):
         """
         self.timesteps += 1
         if self.timesteps == self.change_at_n:
-            self.obstacles = self.obstacles[:-1]
-
-        reward = 0.0
-        is_terminal = False
-
-        row = self.current_state[0]
-        col = self.current_state[1]
-
-        # update current_state with the action (also check validity of action)
-        if action == 0: # up
-            if not (self.out_of_bounds(row-1, col) or self.is_obstacle(row-1, col)):
-                self.current_state = [row-1, col]
-
-        elif action == 1: # right
-            if not (self.out_of_bounds(row, col+1) or self.is_obstacle(row, col+1)):
-                self.current_state = [row, col+1]
-
-        elif action == 2: # down
-            if not (self.out_of_bounds(row+1, col) or self.is_obstacle(row+1, col)):
-                self.current_state = [row+1, col]
+            self.open_shortcut()
 
-        elif action == 3: # left
-            if not (self.out_of_bounds(row, col-1) or self.is_obstacle(row, col-1)):
-                self.current_state = [row, col-1]
+        return super().env_step(action)
 
-        if self.current_state == self.end_state: # terminate if goal is reached
-            reward = 1.0
-            is_terminal = True
-
-        self.reward_obs_term = [reward, self.get_observation(self.current_state), is_terminal]
-
-        return self.reward_obs_term
-
-    def env_cleanup(self):
-        """Cleanup done after the environment ends"""
-        current_state = None
-
-    def env_message(self, message):
-        """A message asking the environment for information
+    def env_step_batch(self, actions):
+        """Steps every agent with its own action; all of them share the step count of the shortcut.
 
         Args:
-            message (string): the message passed to the environment
+            actions (Numpy array): one action per agent
 
         Returns:
-            string: the response (or answer) to the message
+            (Numpy array, Numpy array, Numpy array): the rewards, states and
+                terminal flags of the agents
         """
-        if message == "what is the current reward?":
-            return "{}".format(self.reward_obs_term[0])
+        self.timesteps += 1
+        if self.timesteps == self.change_at_n:
+            self.open_shortcut()
 
-        # else
-        return "I don't know how to respond to your message"
+        return super().env_step_batch(actions)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+"""Reports Dyna-Q and Dyna-Q+ episodes/sec on the maze against the number of planning steps.
+
+Every planning mode ("loop", "sequential", "jacobi") is timed for every number
+of planning steps. Run from this folder with:
+
+    python planning_benchmark.py
+"""
+
+import argparse
+import time
+from functools import partial
+
+from rlglue.rl_glue import RLGlue
+from maze_env import MazeEnvironment
+from DynaQAgent import DynaQAgent, DynaQPlusAgent
+
+AGENTS = [("Dyna-Q", DynaQAgent), ("Dyna-Q+", DynaQPlusAgent)]
+PLANNING_MODES = ["loop", "sequential", "jacobi"]
+
+
+def planning_rates(agent_class, planning_steps, planning_mode, num_episodes, max_steps):
+    agent_info = {"num_states": 54, "num_actions": 4, "epsilon": 0.1, "step_size": 0.125,
+                  "discount": 0.95, "kappa": 0.001, "planning_steps": planning_steps,
+                  "planning_mode": planning_mode, "random_seed": 0, "planning_random_seed": 0}
+
+    # the agents take agent_info in their constructor, RLGlue calls agent_class()
+    rl_glue = RLGlue(MazeEnvironment, partial(agent_class, agent_info))
+    rl_glue.rl_init(agent_info, {})
+
+    total_steps = 0
+    start = time.perf_counter()
+    for _ in range(num_episodes):
+        rl_glue.rl_episode(max_steps)
+        total_steps += rl_glue.rl_num_steps()
+    elapsed = time.perf_counter() - start
+
+    return num_episodes / elapsed, total_steps / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--episodes", type=int, default=30)
+    parser.add_argument("--max-steps", type=int, default=2000)
+    parser.add_argument("--planning-steps", type=int, nargs="+", default=[0, 5, 10, 50, 100])
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="best of this many timings is reported, to filter out noise")
+    args = parser.parse_args()
+
+    # the modes learn slightly different policies, so steps/sec is reported next to episodes/sec
+    print("{:<8} {:>14} {:>12} {:>12} {:>12}".format("agent", "planning steps", "mode",
+                                                    "episodes/sec", "steps/sec"))
+    for name, agent_class in AGENTS:
+        for planning_steps in args.planning_steps:
+            for planning_mode in PLANNING_MODES:
+                episode_rate, step_rate = max(planning_rates(agent_class, planning_steps, planning_mode,
+                                                             args.episodes, args.max_steps)
+                                              for _ in range(args.repeats))
+                print("{:<8} {:>14} {:>12} {:>12.1f} {:>12,.0f}".format(
+                    name, planning_steps, planning_mode, episode_rate, step_rate))
+
+
+if __name__ == '__main__':
+    main()
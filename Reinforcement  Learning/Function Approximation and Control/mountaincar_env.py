@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 
-from environment import BaseEnvironment
+from rlglue.environment import BaseEnvironment
 
 import numpy as np
 
@@ -102,4 +102,105 @@ class Environment(BaseEnvironment):
             return 0.5
         if position < -1.2:
             return -1.2
-        return position
\ No newline at end of file
+        return position
+
+
+class BatchEnvironment:
+    """BatchEnvironment class
+
+    num_runs mountain cars with the dynamics of Environment, stepped together
+    with the batched protocol of rlglue.VectorRLGlue. The (num_runs, 2)
+    positions and velocities are updated in place with vectorized np.cos and
+    np.clip, and the start positions come from one seeded Generator.
+
+    args (in env_info):
+        num_runs (int): the number of cars (default 1)
+        seed (int): the seed of the Generator
+        auto_reset (bool): restart the cars that reach the goal within
+            env_step_batch (default False, VectorRLGlue restarts them with
+            env_start_batch)
+    """
+
+    actions = [0, 1, 2]
+
+    def __init__(self):
+        self.num_runs = None
+        self.rand_generator = None
+        self.auto_reset = None
+        self.current_states = None
+        self.reward_obs_term = (None, None, None)
+
+    def env_init(self, env_info={}):
+        """Setup for the environment called when the experiment first starts."""
+        self.num_runs = env_info.get("num_runs", 1)
+        self.rand_generator = np.random.default_rng(env_info.get("seed"))
+        self.auto_reset = env_info.get("auto_reset", False)
+        self.current_states = np.zeros((self.num_runs, 2))
+
+    def env_start_batch(self, mask=None):
+        """Starts the cars selected by mask (every car if mask is None).
+
+        Returns:
+            Numpy array: the (num_runs, 2) positions and velocities
+        """
+        if mask is None:
+            mask = np.ones(self.num_runs, dtype=bool)
+        self._reset(np.asarray(mask, dtype=bool))
+
+        return self.current_states.copy()
+
+    def _reset(self, mask):
+        """Puts the cars of mask at rest at a uniform position in [-0.6, -0.4)."""
+        self.current_states[mask, 0] = self.rand_generator.uniform(-0.6, -0.4, size=np.count_nonzero(mask))
+        self.current_states[mask, 1] = 0.0
+
+    def env_step_batch(self, actions):
+        """Steps every car with its own action.
+
+        Args:
+            actions (Numpy array): one action per car
+
+        Returns:
+            (Numpy array, Numpy array, Numpy array): the (num_runs,) rewards,
+                the (num_runs, 2) observations and the (num_runs,) terminal
+                flags. With auto_reset, the observations of the cars that
+                reached the goal are their new start states.
+        """
+        position = self.current_states[:, 0]
+        velocity = self.current_states[:, 1]
+
+        velocity += 0.001 * (np.asarray(actions) - 1)
+        velocity -= 0.0025 * np.cos(3 * position)
+        np.clip(velocity, -0.07, 0.07, out=velocity)
+        position += velocity
+        np.clip(position, -1.2, 0.5, out=position)
+
+        velocity[position == -1.2] = 0.0
+        terminals = position == 0.5
+        rewards = np.where(terminals, 0.0, -1.0)
+
+        observations = self.current_states.copy()
+        if self.auto_reset and terminals.any():
+            self._reset(terminals)
+            observations[terminals] = self.current_states[terminals]
+
+        self.reward_obs_term = (rewards, observations, terminals)
+
+        return self.reward_obs_term
+
+    def env_cleanup(self):
+        """Cleanup done after the environment ends"""
+        pass
+
+    def env_message(self, message):
+        """A message asking the environment for information
+        Args:
+            message (string): the message passed to the environment
+        Returns:
+            string: the response (or answer) to the message
+        """
+        if message == "what is the current reward?":
+            return "{}".format(self.reward_obs_term[0])
+
+        # else
+        return "I don't know how to respond to your message"
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 
-from agent import BaseAgent
+from rlglue.agent import BaseAgent
 
 import numpy as np
 
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+from rlglue.agent import BaseAgent
+from rlglue.linear import SparseLinear
+from rlglue.tiles import ArrayIHT, TileCoder
+from rlglue.utils import argmax
+
+import numpy as np
+
+# the mountain-car (position, velocity) ranges
+LOWS = [-1.2, -0.07]
+HIGHS = [0.5, 0.07]
+
+
+class SarsaAgent(BaseAgent):
+    """Tile-coded Sarsa(lambda) agent for mountain car.
+
+    The action values are a SparseLinear function of the active tiles, with
+    one weight row per action, and the tiles come from a TileCoder backed by
+    an ArrayIHT. Without trace_decay it is the Sarsa agent of the notebook,
+    and takes the same actions from the same np.random seed.
+    """
+    def __init__(self):
+        self.last_action = None
+        self.epsilon = None
+        self.gamma = None
+        self.alpha = None
+        self.num_actions = None
+        self.tc = None
+        self.q = None
+        self.previous_tiles = None
+
+    def agent_init(self, agent_info={}):
+        """Setup for the agent called when the experiment first starts.
+
+        Assume agent_info dict contains:
+        {
+            num_tilings (int): the number of tilings (default 8),
+            num_tiles (int): the number of tiles per dimension (default 8),
+            iht_size (int): the size of the index hash table (default 4096),
+            epsilon (float): the exploration rate (default 0.0),
+            gamma (float): the discount factor (default 1.0),
+            alpha (float): the step-size, divided by num_tilings (default 0.5),
+            initial_weights (float): the initial weights (default 0.0),
+            num_actions (int): the number of actions (default 3),
+            trace_decay (float): lambda, None (default) for one-step Sarsa
+        }
+        """
+        num_tilings = agent_info.get("num_tilings", 8)
+        num_tiles = agent_info.get("num_tiles", 8)
+        iht_size = agent_info.get("iht_size", 4096)
+        self.epsilon = agent_info.get("epsilon", 0.0)
+        self.gamma = agent_info.get("gamma", 1.0)
+        self.alpha = agent_info.get("alpha", 0.5) / num_tilings
+        self.num_actions = agent_info.get("num_actions", 3)
+
+        self.tc = TileCoder(ArrayIHT(iht_size), num_tilings, LOWS, HIGHS, num_tiles, memoize=True)
+        self.q = SparseLinear(iht_size, self.num_actions, agent_info.get("initial_weights", 0.0),
+                              trace_decay=agent_info.get("trace_decay"))
+
+    def select_action(self, tiles):
+        """
+        Selects an action using epsilon greedy
+        Args:
+        tiles - np.array, an array of active tiles
+        Returns:
+        (chosen_action, action_value) - (int, float), tuple of the chosen action
+                                        and it's value
+        """
+        action_values = self.q.values(tiles)
+
+        if np.random.random() < self.epsilon:
+            chosen_action = np.random.choice(self.num_actions)
+        else:
+            chosen_action = argmax(action_values)
+
+        return chosen_action, action_values[chosen_action]
+
+    def agent_start(self, state):
+        """The first method called when the experiment starts, called after
+        the environment starts.
+        Args:
+            state (Numpy array): the state observation from the
+                environment's evn_start function.
+        Returns:
+            The first action the agent takes.
+        """
+        active_tiles = self.tc.get_tiles(state)
+        self.last_action, _ = self.select_action(active_tiles)
+        self.previous_tiles = active_tiles
+        self.q.reset_traces()
+
+        return self.last_action
+
+    def agent_step(self, reward, state):
+        """A step taken by the agent.
+        Args:
+            reward (float): the reward received for taking the last action taken
+            state (Numpy array): the state observation from the
+                environment's step based, where the agent ended up after the
+                last step
+        Returns:
+            The action the agent is taking.
+        """
+        active_tiles = self.tc.get_tiles(state)
+        current_action, action_value = self.select_action(active_tiles)
+
+        self.update(reward + self.gamma * action_value)
+
+        self.last_action = current_action
+        self.previous_tiles = active_tiles
+        return self.last_action
+
+    def agent_end(self, reward):
+        """Run when the agent terminates.
+        Args:
+            reward (float): the reward the agent received for entering the
+                terminal state.
+        """
+        self.update(reward)
+
+    def update(self, target):
+        """Moves the value of the last state and action towards target."""
+        if self.q.trace_decay is None:
+            self.q.td_update(self.previous_tiles, target, self.alpha, self.last_action)
+            return
+
+        self.q.update_traces(self.previous_tiles, self.gamma, self.last_action)
+        delta = target - self.q.value(self.previous_tiles, self.last_action)
+        self.q.traced_update(self.alpha * delta)
+
+    def agent_cleanup(self):
+        """Cleanup done after the agent ends."""
+        pass
+
+    def agent_message(self, message):
+        """A function used to pass information from the agent to the experiment.
+        Args:
+            message: The message passed to the agent.
+        Returns:
+            The response (or answer) to the message.
+        """
+        pass
@@ -1,15 +1,2 @@
-import numpy as np
-
-def argmax(q_values):
-    top = float("-inf")
-    ties = []
-
-    for i in range(len(q_values)):
-        if q_values[i] > top:
-            top = q_values[i]
-            ties = []
-
-        if q_values[i] == top:
-            ties.append(i)
-
-    return np.random.choice(ties)
\ No newline at end of file
+# argmax with random tie-breaking on the global np.random state, shared with the other agents
+from rlglue.utils import argmax
@@ -2,6 +2,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pickle
 
+from rlglue.results import open_results
+from smoothing import moving_average
+
 plt_legend_dict = {"expected_sarsa_agent": "Expected SARSA with neural network",
                    "random_agent": "Random"}
 path_dict = {"expected_sarsa_agent": "results/",
@@ -10,19 +13,8 @@ path_dict = {"expected_sarsa_agent": "results/",
 plt_label_dict = {"expected_sarsa_agent": "Sum of\nreward\nduring\nepisode"}
 
 def smooth(data, k):
-    num_episodes = data.shape[1]
-    num_runs = data.shape[0]
-
-    smoothed_data = np.zeros((num_runs, num_episodes))
-
-    for i in range(num_episodes):
-        if i < k:
-            smoothed_data[:, i] = np.mean(data[:, :i+1], axis = 1)   
-        else:
-            smoothed_data[:, i] = np.mean(data[:, i-k:i+1], axis = 1)    
-        
-
-    return smoothed_data
+    """Mean of each episode and the k episodes before it, for every run; see smoothing.moving_average"""
+    return moving_average(data, k)
 
 # Function to plot result
 def plot_result(data_name_array):
@@ -34,8 +26,13 @@ def plot_result(data_name_array):
     for data_name in data_name_array:
         
         # load data
-        filename = 'sum_reward_{}'.format(data_name).replace('.','')
-        sum_reward_data = np.load('{}/{}.npy'.format(path_dict[data_name], filename))
+        # a results store written by ParameterSweep(store=True), with data_name as the configuration name
+        store = open_results(path_dict[data_name])
+        if store is not None:
+            sum_reward_data = store.get("sum_reward", name=data_name)
+        else:
+            filename = 'sum_reward_{}'.format(data_name).replace('.','')
+            sum_reward_data = np.load('{}/{}.npy'.format(path_dict[data_name], filename))
 
         # smooth data
         smoothed_sum_reward = smooth(data = sum_reward_data, k = 100)
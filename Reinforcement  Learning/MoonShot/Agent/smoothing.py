@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+
+"""Smoothing of (num_runs, num_episodes) learning curves, all runs at once.
+"""
+
+import numpy as np
+
+
+def moving_average(data, k):
+    """Trailing moving average over the last k + 1 episodes
+
+    Episode i is the mean of episodes max(0, i - k) to i, as the loop of
+    plot_script.smooth computed it, but from one cumulative sum: O(episodes)
+    for every run at once.
+
+    Args:
+        data (Numpy array): the (num_runs, num_episodes) curves
+        k (int): the number of earlier episodes in each window
+
+    Returns:
+        Numpy array: the (num_runs, num_episodes) smoothed curves
+    """
+    data = np.asarray(data, dtype=float)
+    num_episodes = data.shape[1]
+
+    # the sums of the curves minus their mean stay small, which keeps the window sums accurate
+    center = data.mean(axis=1, keepdims=True)
+    cumulative = np.zeros((data.shape[0], num_episodes + 1))
+    np.cumsum(data - center, axis=1, out=cumulative[:, 1:])
+
+    end = np.arange(1, num_episodes + 1)
+    start = np.maximum(end - (k + 1), 0)
+
+    return (cumulative[:, end] - cumulative[:, start]) / (end - start) + center
+
+
+def exponential(data, alpha, debias=True):
+    """Exponential moving average y[i] = y[i - 1] + alpha * (data[i] - y[i - 1])
+
+    Args:
+        data (Numpy array): the (num_runs, num_episodes) curves
+        alpha (float): the step-size, between 0 and 1
+        debias (bool): divide by 1 - (1 - alpha) ** (i + 1), so the average
+            does not start biased towards 0 (the exponential average reward
+            of the Actor-Critic notebook)
+
+    Returns:
+        Numpy array: the (num_runs, num_episodes) smoothed curves
+    """
+    data = np.asarray(data, dtype=float)
+    try:
+        from scipy.signal import lfilter
+        smoothed = lfilter([alpha], [1.0, alpha - 1.0], data, axis=1)
+    except ImportError:
+        smoothed = np.empty_like(data)
+        average = np.zeros(data.shape[0])
+        for i in range(data.shape[1]):
+            average += alpha * (data[:, i] - average)
+            smoothed[:, i] = average
+
+    if debias:
+        smoothed /= 1.0 - (1.0 - alpha) ** np.arange(1, data.shape[1] + 1)
+    return smoothed
+
+
+def savitzky_golay(data, window, order=2):
+    """Savitzky-Golay filter: a least-squares polynomial fit around every episode
+
+    The centred episodes are one weighted sum over a sliding window; the first
+    and last window // 2 episodes take the values of the polynomial fitted to
+    the first and last window, like the default mode of
+    scipy.signal.savgol_filter.
+
+    Args:
+        data (Numpy array): the (num_runs, num_episodes) curves
+        window (int): the odd window length, at most num_episodes
+        order (int): the order of the polynomial, less than window
+
+    Returns:
+        Numpy array: the (num_runs, num_episodes) smoothed curves
+    """
+    data = np.asarray(data, dtype=float)
+    if window % 2 == 0 or order >= window or window > data.shape[1]:
+        raise ValueError("window must be odd, larger than order and at most the number of episodes")
+
+    half = window // 2
+    vandermonde = np.vander(np.arange(-half, half + 1), order + 1, increasing=True)
+    fit = np.linalg.pinv(vandermonde)   # polynomial coefficients from the values of a window
+    projection = vandermonde.dot(fit)   # fitted values of a window from its values
+
+    smoothed = np.empty_like(data)
+    windows = np.lib.stride_tricks.sliding_window_view(data, window, axis=1)
+    smoothed[:, half:data.shape[1] - half] = windows.dot(fit[0])
+    smoothed[:, :half] = data[:, :window].dot(projection[:half].T)
+    smoothed[:, data.shape[1] - half:] = data[:, -window:].dot(projection[half + 1:].T)
+
+    return smoothed
+
+
+class IncrementalSmoother:
+    """IncrementalSmoother class
+
+    Updates the smoothed curves of every run as new episodes arrive, in O(1)
+    per episode: a running window sum for "moving_average" (same values as
+    moving_average up to rounding) or the running average for "exponential".
+
+    args:
+        num_runs (int): the number of curves
+        method (string): "moving_average" or "exponential"
+        k (int): the number of earlier episodes in a moving-average window
+        alpha (float): the step-size of the exponential average
+        debias (bool): see exponential
+    """
+
+    def __init__(self, num_runs, method="moving_average", k=100, alpha=0.01, debias=True):
+        if method not in ("moving_average", "exponential"):
+            raise ValueError("Unknown method {}".format(method))
+
+        self.method = method
+        self.k = k
+        self.alpha = alpha
+        self.debias = debias
+
+        self.window = np.zeros((k + 1, num_runs))
+        self.total = np.zeros(num_runs)
+        self.average = np.zeros(num_runs)
+        self.num_episodes = 0
+        self.smoothed = []
+
+    def update(self, values):
+        """Adds one episode of every run
+
+        Args:
+            values (Numpy array): the (num_runs,) values of the new episode
+
+        Returns:
+            Numpy array: the (num_runs,) smoothed values of the new episode
+        """
+        values = np.asarray(values, dtype=float)
+        self.num_episodes += 1
+
+        if self.method == "moving_average":
+            slot = (self.num_episodes - 1) % len(self.window)
+            self.total += values - self.window[slot]
+            self.window[slot] = values
+            if slot == len(self.window) - 1:
+                # resum once per window, so rounding errors do not build up on long runs
+                self.total = self.window.sum(axis=0)
+            smoothed = self.total / min(self.num_episodes, len(self.window))
+        else:
+            self.average += self.alpha * (values - self.average)
+            smoothed = self.average.copy()
+            if self.debias:
+                smoothed /= 1.0 - (1.0 - self.alpha) ** self.num_episodes
+
+        self.smoothed.append(smoothed)
+        return smoothed
+
+    def curves(self):
+        """The (num_runs, num_episodes) smoothed curves so far."""
+        return np.array(self.smoothed).T.reshape(len(self.total), self.num_episodes)
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 import numpy as np
-from agent import BaseAgent
+from rlglue.agent import BaseAgent
 
 class DummyAgent(BaseAgent):
     def __init__(self):
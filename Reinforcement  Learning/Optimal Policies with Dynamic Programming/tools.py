@@ -7,6 +7,8 @@ import time
 import json
 from copy import deepcopy
 
+from rlglue import mdp
+
 plt.rc('font', size=30)  # controls default text sizes
 plt.rc('axes', titlesize=25)  # fontsize of the axes title
 plt.rc('axes', labelsize=25)  # fontsize of the x and y labels
@@ -70,10 +72,34 @@ class ParkingWorld:
         self.__null_factor = null_factor
         self.__S = [num_occupied for num_occupied in range(num_spaces + 1)]
         self.__A = list(range(num_prices))
+        self.__P, self.__R = self.__transition_tensors()
+
+    def __transition_tensors(self):
+        """Builds the dense P[s, a, s'] and R[s, a, s'] tensors of the dynamics.
+
+        The sums of the emphasis are cumulative sums, so they are added in the
+        same order as the builtin sum and the probabilities are the same as
+        those p used to compute one at a time.
+        """
+        s = np.arange(self.__num_spaces + 1).reshape(-1, 1, 1)
+        a = np.arange(self.__num_prices).reshape(1, -1, 1)
+        center = (1 - self.__price_factor
+                  ) * s + self.__price_factor * self.__num_spaces * (
+                      1 - a / self.__num_prices)
+        emphasis = np.exp(
+            -abs(np.arange(2 * self.__num_spaces) - center) / 5)
+        total = np.cumsum(emphasis, axis=-1)[..., -1:]
 
+        P = emphasis[..., :self.__num_spaces + 1] / total
+        P[..., -1] = np.cumsum(emphasis[..., self.__num_spaces:], axis=-1)[..., -1] / total[..., 0]
+
+        state_rewards = np.array([self.state_reward(s_) for s_ in self.__S])
+        R = np.broadcast_to(state_rewards.reshape(-1, 1, 1) + state_rewards, P.shape)
+
+        return P, R
 
     def transitions(self, s, a):
-        return np.array([[r, self.p(s_, r, s, a)] for s_, r in self.support(s, a)])
+        return np.stack([self.__R[s, a], self.__P[s, a]], axis=1)
 
     def support(self, s, a):
         return [(s_, self.reward(s, s_)) for s_ in self.__S]
@@ -82,14 +108,7 @@ class ParkingWorld:
         if r != self.reward(s, s_):
             return 0
         else:
-            center = (1 - self.__price_factor
-                      ) * s + self.__price_factor * self.__num_spaces * (
-                          1 - a / self.__num_prices)
-            emphasis = np.exp(
-                -abs(np.arange(2 * self.__num_spaces) - center) / 5)
-            if s_ == self.__num_spaces:
-                return sum(emphasis[s_:]) / sum(emphasis)
-            return emphasis[s_] / sum(emphasis)
+            return self.__P[s, a, s_]
 
     def reward(self, s, s_):
         return self.state_reward(s) + self.state_reward(s_)
@@ -104,10 +123,7 @@ class ParkingWorld:
         return np.random.randint(self.__num_prices)
 
     def step(self, s, a):
-        probabilities = [
-            self.p(s_, self.reward(s, s_), s, a) for s_ in self.__S
-        ]
-        return np.random.choice(self.__S, p=probabilities)
+        return np.random.choice(self.__S, p=self.__P[s, a])
 
     @property
     def A(self):
@@ -119,13 +135,76 @@ class ParkingWorld:
 
     @property
     def num_prices(self):
-        return self.num_prices
+        return self.__num_prices
+
+    @property
+    def P(self):
+        """The (num_states, num_actions, num_states) transition probabilities p(s'|s, a)."""
+        return self.__P
+
+    @property
+    def R(self):
+        """The (num_states, num_actions, num_states) rewards r(s, a, s')."""
+        return self.__R
 
     @property
     def S(self):
         return list(self.__S)
 
 
+def evaluate_policy(env, pi, gamma, theta=0.1, V=None, exact=False):
+    """Evaluates ``pi`` with synchronous Bellman updates of every state at once
+
+    Args:
+        env (ParkingWorld): the environment, with its P and R tensors, or an
+            rlglue.mdp MDP such as a SparseTabularMDP
+        pi (Numpy array): the (num_states, num_actions) policy
+        gamma (float): the discount factor
+        theta (float): stop once no value changes by theta or more in a sweep
+        V (Numpy array): the initial values (default zeros)
+        exact (bool): solve the linear Bellman equations instead of sweeping
+    Returns:
+        Numpy array: the values of pi
+    """
+    method = "exact" if exact else "synchronous"
+    return mdp.policy_evaluation(mdp.as_mdp(env), pi, gamma, theta, V, method)[0]
+
+
+def greedy_policy(env, V, gamma):
+    """The deterministic policy greedy with respect to the action values of ``V``, ties to the first action."""
+    return mdp.as_mdp(env).greedy_policy(V, gamma)
+
+
+def policy_iteration(env, gamma, theta=0.1, exact=False):
+    """Alternates vectorized policy evaluation and greedification until the policy is stable
+
+    Args:
+        env (ParkingWorld): the environment, with its P and R tensors, or an
+            rlglue.mdp MDP such as a SparseTabularMDP
+        gamma (float): the discount factor
+        theta (float): the threshold of evaluate_policy
+        exact (bool): evaluate each policy with a linear solve
+    Returns:
+        (Numpy array, Numpy array): the values and the policy
+    """
+    method = "exact" if exact else "synchronous"
+    return mdp.policy_iteration(mdp.as_mdp(env), gamma, theta, method)[:2]
+
+
+def value_iteration(env, gamma, theta=0.1):
+    """Synchronous value iteration, with a Bellman optimality update of every state per sweep
+
+    Args:
+        env (ParkingWorld): the environment, with its P and R tensors, or an
+            rlglue.mdp MDP such as a SparseTabularMDP
+        gamma (float): the discount factor
+        theta (float): stop once no value changes by theta or more in a sweep
+    Returns:
+        (Numpy array, Numpy array): the values and the greedy policy
+    """
+    return mdp.value_iteration(mdp.as_mdp(env), gamma, theta)[:2]
+
+
 class Transitions(list):
     def __init__(self, transitions):
         self.__transitions = transitions
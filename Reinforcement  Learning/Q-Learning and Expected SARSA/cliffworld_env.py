@@ -1,13 +1,19 @@
 #!/usr/bin/env python
 
-from environment import BaseEnvironment
+from rlglue.environment import BaseEnvironment
 
 import numpy as np
-from copy import deepcopy
 
 class Environment(BaseEnvironment):
     """Implements the environment for an RLGlue environment
 
+    States are integer ids, and the moves of every state and action are
+    compiled into (num_states, num_actions) tables of next states, rewards and
+    terminal flags at env_init, so env_step is a table lookup.
+    env_start_batch and env_step_batch step num_runs (from env_info)
+    independent walkers at once, with the batched protocol of
+    rlglue.VectorRLGlue.
+
     Note:
         env_init, env_start, env_step, env_cleanup, and env_message are required
         methods.
@@ -19,15 +25,43 @@ class Environment(BaseEnvironment):
     def env_init(self, env_info={}):
         """Setup for the environment called when the experiment first starts.
 
-        Note:
-            Initialize a tuple with the reward, first state observation, boolean
-            indicating if it's terminal.
+        Assume env_info dict contains:
+        {
+            grid_height (int): the number of rows (default 4),
+            grid_width (int): the number of columns (default 12),
+            num_runs (int): the number of walkers of env_step_batch (default 1)
+        }
+
+        The cliff is the bottom row between the start (bottom left) and the
+        goal (bottom right) corners.
         """
-        self.rows = 4
-        self.cols = 12
+        self.rows = env_info.get("grid_height", 4)
+        self.cols = env_info.get("grid_width", 12)
         self.start = [0,0]
-        self.goal = [0,11]
+        self.goal = [0,self.cols-1]
         self.current_state = None
+        self.current_states = np.zeros(env_info.get("num_runs", 1), dtype=int)
+
+        self.compile()
+
+    def compile(self):
+        """Builds the next state, reward and terminal tables of the grid."""
+        num_states = self.rows * self.cols
+        row, col = np.divmod(np.arange(num_states), self.cols)
+
+        # right, down, left and up, clipped to the grid
+        next_rows = np.stack([row, np.maximum(row - 1, 0), row, np.minimum(row + 1, self.rows - 1)], axis=1)
+        next_cols = np.stack([np.minimum(col + 1, self.cols - 1), col, np.maximum(col - 1, 0), col], axis=1)
+
+        cliff = (next_rows == 0) & (next_cols > 0) & (next_cols < self.cols - 1)
+        self.next_states = np.where(cliff, self.observation(self.start), next_rows * self.cols + next_cols)
+        self.rewards = np.where(cliff, -100.0, -1.0)
+        self.terminals = self.next_states == self.observation(self.goal)
+
+        # the tuples env_step returns, with Python floats, ints and bools
+        self.transitions = [list(zip(*outcome)) for outcome in zip(self.rewards.tolist(),
+                                                                    self.next_states.tolist(),
+                                                                    self.terminals.tolist())]
 
     def env_start(self):
         """The first method called when the episode starts, called before the
@@ -36,9 +70,9 @@ class Environment(BaseEnvironment):
         Returns:
             The first state observation from the environment.
         """
-        self.current_state = self.start  # An empty NumPy array
+        self.current_state = self.observation(self.start)
 
-        self.reward_obs_term = (0.0, self.observation(self.current_state), False)
+        self.reward_obs_term = (0.0, self.current_state, False)
 
         return self.reward_obs_term[1]
 
@@ -52,31 +86,45 @@ class Environment(BaseEnvironment):
             (float, state, Boolean): a tuple of the reward, state observation,
                 and boolean indicating if it's terminal.
         """
+        # the actions are 0 (right), 1 (down), 2 (left) and 3 (up), compared by
+        # value as before, so 1.0 is down and -1 is invalid
+        if action not in (0, 1, 2, 3):
+            raise Exception("Invalid action.")
+        self.reward_obs_term = self.transitions[self.current_state][int(action)]
+        self.current_state = self.reward_obs_term[1]
+
+        return self.reward_obs_term
+
+    def env_start_batch(self, mask):
+        """Puts the walkers selected by mask at the start.
 
-        new_state = deepcopy(self.current_state)
-
-        if action == 0: #right
-            new_state[1] = min(new_state[1]+1, self.cols-1)
-        elif action == 1: #down
-            new_state[0] = max(new_state[0]-1, 0)
-        elif action == 2: #left
-            new_state[1] = max(new_state[1]-1, 0)
-        elif action == 3: #up
-            new_state[0] = min(new_state[0]+1, self.rows-1)
-        else:
+        Returns:
+            Numpy array: the state of every walker
+        """
+        self.current_states[mask] = self.observation(self.start)
+
+        return self.current_states.copy()
+
+    def env_step_batch(self, actions):
+        """Steps every walker with its own action.
+
+        Args:
+            actions (Numpy array): one action per walker
+
+        Returns:
+            (Numpy array, Numpy array, Numpy array): the rewards, states and
+                terminal flags of the walkers
+        """
+        # every action must be 0, 1, 2 or 3 by value, as in env_step
+        int_actions = np.asarray(actions).astype(int)
+        if ((int_actions < 0) | (int_actions > 3) | (int_actions != actions)).any():
             raise Exception("Invalid action.")
-        self.current_state = new_state
-
-        reward = -1.0
-        is_terminal = False
-        if self.current_state[0] == 0 and self.current_state[1] > 0:
-            if self.current_state[1] < self.cols - 1:
-                reward = -100.0
-                self.current_state = deepcopy(self.start)
-            else:
-                is_terminal = True
-
-        self.reward_obs_term = (reward, self.observation(self.current_state), is_terminal)
+        actions = int_actions
+        rewards = self.rewards[self.current_states, actions]
+        terminals = self.terminals[self.current_states, actions]
+        self.current_states = self.next_states[self.current_states, actions]
+
+        self.reward_obs_term = (rewards, self.current_states.copy(), terminals)
 
         return self.reward_obs_term
 
@@ -1,6 +1,11 @@
+import os
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+from rlglue.results import open_results
+from rlglue.stats import load_summary
+
 plt1_legend_dict = {"td_agent": "approximate values learned by\n TD with neural network", 
                     "td_agent_5000_episodes": "approximate values learned by\n TD with neural network",
                     "td_agent_tilecoding": "approximate values learned by\n TD with tile-coding"}
@@ -21,6 +26,11 @@ def plot_result(data_name_array):
     
     true_V = np.load('data/true_V.npy')
 
+    # a results store written to results/ by ParameterSweep(store=True), whose configurations are
+    # named by data_name (name_format) and whose experiment returns the final "V" and the "rmsve"
+    # of every evaluation; the evaluation schedule comes from its experiment_parameters
+    store = open_results('results')
+
     plt1_agent_sweeps = []
     plt2_agent_sweeps = []
     
@@ -30,9 +40,12 @@ def plot_result(data_name_array):
     for data_name in data_name_array:
 
         # plot1
-        filename = 'V_{}'.format(data_name).replace('.','')
-        current_agent_V = np.load('results/{}.npy'.format(filename))
-        current_agent_V = current_agent_V[-1, :]
+        if store is not None:
+            current_agent_V = store.get("V", name=data_name)[-1]
+        else:
+            filename = 'V_{}'.format(data_name).replace('.','')
+            current_agent_V = np.load('results/{}.npy'.format(filename))
+            current_agent_V = current_agent_V[-1, :]
 
 
         plt1_x_legend = range(1,len(current_agent_V[:]) + 1)
@@ -40,9 +53,22 @@ def plot_result(data_name_array):
         plt1_agent_sweeps.append(graph_current_agent_V)
         
         # plot2
-        filename = 'RMSVE_{}'.format(data_name).replace('.','')
-        RMSVE_data = np.load('results/{}.npz'.format(filename))
-        current_agent_RMSVE = np.mean(RMSVE_data["rmsve"], axis = 0)
+        # the summary a ParameterSweep(summaries=True) named data_name saves for its "rmsve" file type,
+        # with the experiment parameters num_episodes and episode_eval_frequency as attributes
+        summary_path = 'results/{}_rmsve_summary.npz'.format(data_name)
+        if os.path.exists(summary_path):
+            summary = load_summary(summary_path)
+            current_agent_RMSVE = summary["mean"]
+            RMSVE_data = {"num_episodes": summary["num_episodes"], "eval_freq": summary["episode_eval_frequency"]}
+        elif store is not None:
+            current_agent_RMSVE = np.mean(store.get("rmsve", name=data_name), axis = 0)
+            experiment_parameters = store.attributes["experiment_parameters"]
+            RMSVE_data = {"num_episodes": experiment_parameters["num_episodes"],
+                          "eval_freq": experiment_parameters["episode_eval_frequency"]}
+        else:
+            filename = 'RMSVE_{}'.format(data_name).replace('.','')
+            RMSVE_data = np.load('results/{}.npz'.format(filename))
+            current_agent_RMSVE = np.mean(RMSVE_data["rmsve"], axis = 0)
 
         plt2_x_legend = np.arange(0, RMSVE_data["num_episodes"]+1, RMSVE_data["eval_freq"])
         graph_current_agent_RMSVE, = ax[1].plot(plt2_x_legend, current_agent_RMSVE[:], label=plt2_legend_dict[data_name])
@@ -3,7 +3,7 @@
 """RandomWalk environment class for RL-Glue-py.
 """
 
-from environment import BaseEnvironment
+from rlglue.environment import BaseEnvironment
 import numpy as np
 
 class RandomWalkEnvironment(BaseEnvironment):
@@ -118,4 +118,137 @@ class RandomWalkEnvironment(BaseEnvironment):
         
         self.reward_obs_term = (reward, current_state, is_terminal)
         
-        return self.reward_obs_term
\ No newline at end of file
+        return self.reward_obs_term
+
+
+class BatchRandomWalkEnvironment:
+    """BatchRandomWalkEnvironment class
+
+    num_runs random walks with the dynamics of RandomWalkEnvironment, stepped
+    together with the batched protocol of rlglue.VectorRLGlue. The jumps of
+    every walker are drawn with a single Generator.integers call per step, and
+    moves past either end are clipped to the terminal states with array ops.
+
+    generate_episodes also samples the uniform random policy itself, and
+    returns whole episodes as arrays for offline TD evaluation.
+
+    args (in env_info, besides those of RandomWalkEnvironment):
+        num_runs (int): the number of walkers (default 1)
+        action_range (int): the largest jump (default 100)
+        auto_reset (bool): restart the walkers that terminate within
+            env_step_batch (default False, VectorRLGlue restarts them with
+            env_start_batch)
+    """
+
+    def __init__(self):
+        self.rand_generator = None
+        self.num_runs = None
+        self.num_states = None
+        self.start_state = None
+        self.left_terminal_state = None
+        self.right_terminal_state = None
+        self.action_range = None
+        self.auto_reset = None
+        self.current_states = None
+        self.reward_obs_term = (None, None, None)
+
+    def env_init(self, env_info={}):
+        """Setup for the environment called when the experiment first starts."""
+        self.rand_generator = np.random.default_rng(env_info.get("seed"))
+        self.num_runs = env_info.get("num_runs", 1)
+
+        self.num_states = env_info["num_states"]
+        self.start_state = env_info["start_state"]
+        self.left_terminal_state = env_info["left_terminal_state"]
+        self.right_terminal_state = env_info["right_terminal_state"]
+        self.action_range = env_info.get("action_range", 100)
+        self.auto_reset = env_info.get("auto_reset", False)
+
+        self.current_states = np.full(self.num_runs, self.start_state)
+
+    def env_start_batch(self, mask=None):
+        """Puts the walkers selected by mask (every one if mask is None) at the start state.
+
+        Returns:
+            Numpy array: the state of every walker
+        """
+        if mask is None:
+            mask = np.ones(self.num_runs, dtype=bool)
+        self.current_states[mask] = self.start_state
+
+        return self.current_states.copy()
+
+    def _step(self, states, actions):
+        """The next states, rewards and terminal flags of walkers in states taking actions (0 left, 1 right)."""
+        jumps = self.rand_generator.integers(1, self.action_range + 1, size=len(states))
+        next_states = np.where(actions == 1, states + jumps, states - jumps)
+        np.clip(next_states, self.left_terminal_state, self.right_terminal_state, out=next_states)
+
+        rewards = np.zeros(len(states))
+        rewards[next_states == self.left_terminal_state] = -1.0
+        rewards[next_states == self.right_terminal_state] = 1.0
+
+        return next_states, rewards, rewards != 0.0
+
+    def env_step_batch(self, actions):
+        """Steps every walker with its own action.
+
+        Args:
+            actions (Numpy array): one action (0 left, 1 right) per walker
+
+        Returns:
+            (Numpy array, Numpy array, Numpy array): the rewards, states and
+                terminal flags of the walkers. With auto_reset, the states of
+                the walkers that terminated are the start state.
+        """
+        actions = np.asarray(actions)
+        if np.any((actions != 0) & (actions != 1)):
+            raise ValueError("Wrong action value")
+
+        self.current_states, rewards, terminals = self._step(self.current_states, actions)
+
+        observations = self.current_states.copy()
+        if self.auto_reset:
+            self.current_states[terminals] = self.start_state
+
+        self.reward_obs_term = (rewards, observations, terminals)
+
+        return self.reward_obs_term
+
+    def generate_episodes(self, num_episodes):
+        """Runs num_episodes episodes of the uniform random policy, all in parallel
+
+        Returns:
+            dict: the "states", "actions", "rewards", "next_states" and
+                "terminals" of every step, episode after episode, and the
+                (num_episodes + 1,) "episode_offsets": episode i is
+                steps episode_offsets[i] to episode_offsets[i + 1]
+        """
+        states = np.full(num_episodes, self.start_state)
+        active = np.arange(num_episodes)
+        steps = {key: [] for key in ("episodes", "states", "actions", "rewards", "next_states", "terminals")}
+
+        while len(active):
+            actions = self.rand_generator.integers(0, 2, size=len(active))
+            next_states, rewards, terminals = self._step(states[active], actions)
+
+            for key, value in zip(steps, (active, states[active], actions, rewards, next_states, terminals)):
+                steps[key].append(value)
+
+            states[active] = next_states
+            active = active[~terminals]
+
+        episodes = np.concatenate(steps.pop("episodes"))
+        order = np.argsort(episodes, kind="stable")
+        trajectories = {key: np.concatenate(value)[order] for key, value in steps.items()}
+        trajectories["episode_offsets"] = np.concatenate([[0], np.cumsum(np.bincount(episodes, minlength=num_episodes))])
+
+        return trajectories
+
+    def env_cleanup(self):
+        """Cleanup done after the environment ends"""
+        pass
+
+    def env_message(self, message):
+        """A message asking the environment for information"""
+        pass
@@ -1,11 +1,16 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from rlglue.results import open_results
+
 # Function to plot result
 def plot_result(agent_parameters, directory):
     
     true_V = np.load('data/true_V.npy')
 
+    # a results store keeps every run: plot the values of the last run and the RMSVE averaged over runs
+    store = open_results(directory)
+
     for num_g in agent_parameters["num_groups"]:
         plt1_agent_sweeps = []
         plt2_agent_sweeps = []
@@ -16,16 +21,22 @@ def plot_result(agent_parameters, directory):
         for step_size in agent_parameters["step_size"]:
             
             # plot1
-            filename = 'V_TD_agent_agg_states_{}_step_size_{}'.format(num_g, step_size).replace('.','')
-            current_agent_V = np.load('{}/{}.npy'.format(directory, filename))
+            if store is not None:
+                current_agent_V = store.get("V", num_groups=num_g, step_size=step_size)[-1]
+            else:
+                filename = 'V_TD_agent_agg_states_{}_step_size_{}'.format(num_g, step_size).replace('.','')
+                current_agent_V = np.load('{}/{}.npy'.format(directory, filename))
 
             plt1_x_legend = range(1,len(current_agent_V[:]) + 1)
             graph_current_agent_V, = ax[0].plot(plt1_x_legend, current_agent_V[:], label="approximate values: state aggregation: {}, step-size: {}".format(num_g, step_size))
             plt1_agent_sweeps.append(graph_current_agent_V)
             
             # plot2
-            filename = 'RMSVE_TD_agent_agg_states_{}_step_size_{}'.format(num_g, step_size).replace('.','')
-            current_agent_RMSVE = np.load('{}/{}.npy'.format(directory, filename))
+            if store is not None:
+                current_agent_RMSVE = np.mean(store.get("RMSVE", num_groups=num_g, step_size=step_size), axis=0)
+            else:
+                filename = 'RMSVE_TD_agent_agg_states_{}_step_size_{}'.format(num_g, step_size).replace('.','')
+                current_agent_RMSVE = np.load('{}/{}.npy'.format(directory, filename))
 
             plt2_x_legend = range(1,len(current_agent_RMSVE[:]) + 1)
             graph_current_agent_RMSVE, = ax[1].plot(plt2_x_legend, current_agent_RMSVE[:], label="approximate values: state aggregation: {}, step-size: {}".format(num_g, step_size))
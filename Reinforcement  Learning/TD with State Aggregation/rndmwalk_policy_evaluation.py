@@ -1,54 +1,153 @@
+import os
+
 import numpy as np
-import matplotlib.pyplot as plt
+
+from rlglue.mdp import random_walk_mdp, policy_evaluation
 
 
-def compute_value_function(num_states, action_range):
+def bellman_band(num_states, action_range):
     """
-    Computes the value function for the 1000 state random walk as described in Sutton and Barto (2017).
-    :return: The value function for states 1 to 1000. Index 0 is not used in this array (i.e. should remain 0).
+    Builds the Bellman equations (I - P) V = r of the random walk in banded form.
+    From every state the walk jumps to one of the action_range states on either side with probability
+    0.5 / action_range, so P is banded with action_range diagonals above and below the main one.
+    :return: (ab, r) where ab is the (2 * action_range + 1, num_states) band of I - P, with
+             ab[action_range + i - j, j] = (I - P)[i, j] as in scipy.linalg.solve_banded, and r is the
+             expected reward of every state (the jumps past either end).
+    """
+    state_prob = 0.5 / float(action_range)
+
+    ab = np.full((2 * action_range + 1, num_states), -state_prob)
+    ab[action_range] = 1.0
+
+    s = np.arange(1, num_states + 1)
+    right_exits = np.maximum(s + action_range - num_states, 0).clip(max=action_range)
+    left_exits = np.maximum(action_range - s + 1, 0).clip(max=action_range)
+    r = state_prob * (right_exits - left_exits)
+
+    return ab, r
+
+
+def solve_banded(ab, b):
+    """
+    Solves the banded system A x = b, with the band of A stored as for scipy.linalg.solve_banded and
+    as many diagonals above as below the main one. Uses scipy when it is installed, and otherwise
+    Gaussian elimination without pivoting restricted to the band, which is stable for the diagonally
+    dominant I - P.
+    :return: x
+    """
+    u = (ab.shape[0] - 1) // 2
+    try:
+        from scipy.linalg import solve_banded as scipy_solve_banded
+        return scipy_solve_banded((u, u), ab, b)
+    except ImportError:
+        pass
+
+    n = ab.shape[1]
+    # pad with u decoupled unknowns, so no step of the elimination leaves the band
+    band = np.zeros((2 * u + 1, n + u))
+    band[:, :n] = ab
+    band[u, n:] = 1.0
+    for d in range(1, u + 1):
+        band[u + d, n - d:n] = 0.0
+    b = np.concatenate([np.asarray(b, dtype=float), np.zeros(u)])
+
+    offsets = np.arange(1, u + 1)
+    rows = u + offsets.reshape(-1, 1) - offsets
+    upper = u - offsets
+    for k in range(n):
+        factors = band[u + 1:, k] / band[u, k]
+        band[rows, k + offsets] -= factors.reshape(-1, 1) * band[upper, k + offsets]
+        b[k + 1:k + u + 1] -= factors * b[k]
+
+    x = np.zeros(n + u)
+    for k in range(n - 1, -1, -1):
+        x[k] = (b[k] - band[upper, k + offsets].dot(x[k + 1:k + u + 1])) / band[u, k]
+
+    return x[:n]
+
+
+def value_sweeps(num_states, action_range, theta=0.000001):
+    """
+    Synchronous policy evaluation of the random walk, where each sweep computes the sums over the
+    2 * action_range neighbours of every state at once from a cumulative sum of V.
+    :return: The value function for states 1 to num_states.
     """
     state_prob = 0.5 / float(action_range)
-    gamma = 1
-    theta = 0.000001
+    _, r = bellman_band(num_states, action_range)
 
-    V = np.zeros(num_states+1)
+    s = np.arange(1, num_states + 1)
+    right_end = np.minimum(s + action_range, num_states)
+    left_start = np.maximum(s - action_range, 1)
 
-    delta = np.infty
-    i = 0
+    V = np.zeros(num_states + 1)  # V[0] is the terminal state
+    delta = np.inf
     while delta > theta:
-        i += 1
-        delta = 0.0
-        for s in range(1, num_states+1):
-            v = V[s]
-            value_sum = 0.0
-            for transition in range(1, action_range+1):
-                right = s + transition
-                right_reward = 0
-                if right > num_states:
-                    right_reward = 1
-                    right = 0
-
-                left = s - transition
-                left_reward = 0
-                if left < 1:
-                    left_reward = -1
-                    left = 0
-
-                value_sum += state_prob * ((right_reward + gamma * V[right]) + (left_reward + gamma * V[left]))
-
-            V[s] = value_sum
-            delta = max(delta, np.abs(v-V[s]))
-    
-    np.save("data/true_V", V[1:])
+        cumulative = np.cumsum(V)
+        neighbours = (cumulative[right_end] - cumulative[s]) + (cumulative[s - 1] - cumulative[left_start - 1])
+        V_new = r + state_prob * neighbours
+        delta = np.max(np.abs(V_new - V[1:]))
+        V[1:] = V_new
+
     return V[1:]
 
+
+def sparse_value_sweeps(num_states, action_range, theta=0.000001):
+    """
+    Synchronous policy evaluation of the random walk as a SparseTabularMDP, whose one action has a
+    CSR transition matrix with 2 * action_range entries per state.
+    :return: The value function for states 1 to num_states.
+    """
+    mdp = random_walk_mdp(num_states, action_range, sparse=True)
+    V, _ = policy_evaluation(mdp, np.ones((num_states + 1, 1)), 1.0, theta)
+
+    return V[1:]
+
+
+def compute_value_function(num_states, action_range, method="solve", cache_dir="data", save_as=None):
+    """
+    Computes the value function for the 1000 state random walk as described in Sutton and Barto (2017).
+    :param method: "solve" for a direct solve of the banded Bellman equations, "sweeps" for
+                   vectorized policy evaluation sweeps until delta < 1e-6, or "sparse" for the same
+                   sweeps on the CSR transition matrix of rlglue.mdp.random_walk_mdp(sparse=True).
+    :param cache_dir: the values are cached there as true_V_{num_states}_{action_range}_{method}.npy and
+                      reused on later calls (None to always recompute).
+    :param save_as: also save the values to this file, e.g. "data/true_V.npy", the values of the
+                    500 state, action_range 100 walk that the notebook and plot_script.py read.
+    :return: The value function for states 1 to num_states.
+    """
+    if method not in ("solve", "sweeps", "sparse"):
+        raise ValueError("Unknown method {}".format(method))
+
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, "true_V_{}_{}_{}.npy".format(num_states, action_range, method))
+
+    if cache_path is not None and os.path.exists(cache_path):
+        V = np.load(cache_path)
+    else:
+        if method == "solve":
+            V = solve_banded(*bellman_band(num_states, action_range))
+        elif method == "sweeps":
+            V = value_sweeps(num_states, action_range)
+        else:
+            V = sparse_value_sweeps(num_states, action_range)
+
+        if cache_path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.save(cache_path, V)
+
+    if save_as is not None:
+        np.save(save_as, V)
+    return V
+
 if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
     num_states = 500
     action_range = 100
-    V = compute_value_function(num_states, action_range)
-    
-    np.save("true_V", V)
-    plt.plot(range(1, num_states+1), V[1:])
+    V = compute_value_function(num_states, action_range, save_as="data/true_V.npy")
+
+    plt.plot(range(1, num_states+1), V)
     plt.xlabel('State')
     plt.ylabel('Value')
     plt.show()
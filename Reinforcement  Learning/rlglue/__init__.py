@@ -0,0 +1,10 @@
+from rlglue.agent import BaseAgent
+from rlglue.environment import BaseEnvironment
+from rlglue.rl_glue import RLGlue, SlotsRLGlue
+from rlglue.vector_rl_glue import VectorRLGlue
+from rlglue.sweep import ParameterSweep, parameter_grid, run_sweep
+from rlglue.profiling import Profiler
+from rlglue.results import ResultsStore, open_results
+from rlglue.stats import RunningStats, load_summary
+from rlglue.trajectory import TrajectoryRecorder, load_trajectories, replay_episodes, save_trajectories, td_replay
+from rlglue.utils import argmax, batch_argmax
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+"""Reports RLGlue steps/sec on the cliff world, maze and mountain-car environments.
+
+Run from a source checkout with:
+
+    python -m rlglue.benchmark
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+import numpy as np
+
+from rlglue.agent import BaseAgent
+from rlglue.rl_glue import RLGlue, SlotsRLGlue
+
+COURSE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, folder, module, environment class, number of actions, env_info)
+ENVIRONMENTS = [
+    ("cliff world", "Q-Learning and Expected SARSA", "cliffworld_env", "Environment", 4, {}),
+    ("maze", "Dyna Q", "maze_env", "MazeEnvironment", 4, {}),
+    ("mountain car", "Function Approximation and Control", "mountaincar_env", "Environment", 3, {}),
+]
+
+
+class RandomAgent(BaseAgent):
+    """Picks uniformly random actions, so the benchmark measures the glue and the environment."""
+
+    def agent_init(self, agent_info={}):
+        self.num_actions = agent_info.get("num_actions", 4)
+        self.rand_generator = np.random.RandomState(agent_info.get("seed"))
+
+    def agent_start(self, observation):
+        return self.rand_generator.randint(self.num_actions)
+
+    def agent_step(self, reward, observation):
+        return self.rand_generator.randint(self.num_actions)
+
+    def agent_end(self, reward):
+        pass
+
+    def agent_cleanup(self):
+        pass
+
+    def agent_message(self, message):
+        pass
+
+
+def load_module(folder, module_name):
+    """Imports a module from one of the assignment folders.
+
+    The folder is on sys.path while the module runs, so its imports of the
+    modules next to it (e.g. "from dyna_model import TabularModel") resolve
+    as they do in the folder's notebooks.
+    """
+    directory = os.path.join(COURSE_DIRECTORY, folder)
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(directory, module_name + ".py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, directory)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(directory)
+
+    return module
+
+
+def load_environment(folder, module_name, class_name):
+    """Imports an environment class from one of the assignment folders."""
+    return getattr(load_module(folder, module_name), class_name)
+
+
+def rl_step_episode(rl_glue, max_steps_this_episode):
+    """The episode loop the per-folder rl_glue.py copies used: one rl_step call per step."""
+    is_terminal = False
+
+    rl_glue.rl_start()
+
+    while (not is_terminal) and ((max_steps_this_episode == 0) or
+                                 (rl_glue.num_steps < max_steps_this_episode)):
+        rl_step_result = rl_glue.rl_step()
+        is_terminal = rl_step_result[3]
+
+    return is_terminal
+
+
+def steps_per_second(glue_class, env_class, num_actions, env_info, num_episodes, max_steps, episode):
+    rl_glue = glue_class(env_class, RandomAgent)
+    rl_glue.rl_init({"num_actions": num_actions, "seed": 0}, dict(env_info, seed=0))
+
+    total_steps = 0
+    start = time.perf_counter()
+    for _ in range(num_episodes):
+        episode(rl_glue, max_steps)
+        total_steps += rl_glue.rl_num_steps()
+    elapsed = time.perf_counter() - start
+
+    return total_steps / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--episodes", type=int, default=50)
+    parser.add_argument("--max-steps", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="best of this many timings is reported, to filter out noise")
+    args = parser.parse_args()
+
+    variants = [
+        ("rl_step loop", RLGlue, rl_step_episode),
+        ("RLGlue.rl_episode", RLGlue, RLGlue.rl_episode),
+        ("SlotsRLGlue.rl_episode", SlotsRLGlue, SlotsRLGlue.rl_episode),
+    ]
+
+    print("{:<14} {:<24} {:>12}".format("environment", "episode loop", "steps/sec"))
+    for name, folder, module_name, class_name, num_actions, env_info in ENVIRONMENTS:
+        env_class = load_environment(folder, module_name, class_name)
+        for variant, glue_class, episode in variants:
+            rate = max(steps_per_second(glue_class, env_class, num_actions, env_info,
+                                        args.episodes, args.max_steps, episode)
+                       for _ in range(args.repeats))
+            print("{:<14} {:<24} {:>12,.0f}".format(name, variant, rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+"""Linear functions of sparse binary features, such as the active tiles of a tile coder.
+"""
+
+import numpy as np
+
+
+class SparseLinear:
+    """SparseLinear class
+
+    Keeps one weight row per output (e.g. per action), and the value of an
+    output is the sum of its weights at the active features. All outputs are
+    evaluated with a single (num_outputs, num_active) gather, and updates
+    write the active weights with a single in-place scatter, through flat
+    indices into the weight matrix.
+
+    As with w[tiles] += step, a feature listed twice in the same update is
+    written once.
+
+    args:
+        num_features (int): the number of features, e.g. the IHT size
+        num_outputs (int): the number of weight rows, e.g. the number of actions
+        initial_weights (float): the initial value of every weight
+        trace_decay (float): lambda of the eligibility traces, None for no traces
+        replacing_traces (bool): set the traces of active features to 1 instead of adding 1
+        trace_threshold (float): traces below this are dropped
+    """
+
+    def __init__(self, num_features, num_outputs=1, initial_weights=0.0, trace_decay=None,
+                 replacing_traces=True, trace_threshold=1e-4):
+        self.num_features = num_features
+        self.num_outputs = num_outputs
+        self.weights = np.full((num_outputs, num_features), initial_weights, dtype=float)
+        self.flat_weights = self.weights.reshape(-1)
+
+        self.trace_decay = trace_decay
+        self.replacing_traces = replacing_traces
+        self.trace_threshold = trace_threshold
+        self.reset_traces()
+
+    def values(self, tiles):
+        """The value of every output
+
+        Args:
+            tiles (Numpy array): the (num_active,) active features of one
+                state, or a (B, num_active) batch of them
+        Returns:
+            Numpy array: the (num_outputs,) or (B, num_outputs) values
+        """
+        tiles = np.asarray(tiles)
+        if tiles.ndim == 1:
+            return self.weights[:, tiles].sum(axis=1)
+        return self.weights[:, tiles].sum(axis=-1).T
+
+    def value(self, tiles, output=0):
+        """The value of one output at the active features."""
+        return self.flat_weights[output * self.num_features + np.asarray(tiles)].sum()
+
+    def update(self, tiles, step, output=None):
+        """Adds step to the weights of the active features
+
+        Args:
+            tiles (Numpy array): the active features
+            step (float or Numpy array): the amount added to every active
+                weight, one per output if output is None
+            output (int): the output to update, None for all of them
+        """
+        if output is None:
+            self.weights[:, tiles] += np.reshape(step, (-1, 1))
+        else:
+            self.flat_weights[output * self.num_features + np.asarray(tiles)] += step
+
+    def td_update(self, tiles, target, step_size, output=0):
+        """Moves the value of one output towards target, with a single index computation
+
+        Args:
+            tiles (Numpy array): the active features
+            target (float): the TD target, e.g. reward + gamma * next value
+            step_size (float): the step-size (already divided by the number of tilings)
+            output (int): the output to update
+        Returns:
+            float: the TD error target - value
+        """
+        index = output * self.num_features + np.asarray(tiles)
+        delta = target - self.flat_weights[index].sum()
+        self.flat_weights[index] += step_size * delta
+
+        return delta
+
+    def reset_traces(self):
+        """Clears the eligibility traces, e.g. at the start of an episode."""
+        self.trace_indices = np.zeros(0, dtype=np.int64)
+        self.trace_values = np.zeros(0)
+
+    def update_traces(self, tiles, discount, output=0):
+        """Decays the traces by discount * trace_decay and marks the active features
+
+        The traces are stored sparsely as the sorted flat indices of the
+        traced weights and their values.
+
+        Args:
+            tiles (Numpy array): the active features
+            discount (float): the discount factor
+            output (int): the output the active features belong to
+        """
+        active = np.unique(output * self.num_features + np.asarray(tiles))
+        indices = np.union1d(self.trace_indices, active)
+
+        values = np.zeros(len(indices))
+        values[np.searchsorted(indices, self.trace_indices)] = self.trace_values * (discount * self.trace_decay)
+        active_positions = np.searchsorted(indices, active)
+        if self.replacing_traces:
+            values[active_positions] = 1.0
+        else:
+            values[active_positions] += 1.0
+
+        kept = values >= self.trace_threshold
+        self.trace_indices = indices[kept]
+        self.trace_values = values[kept]
+
+    def traced_update(self, step):
+        """Adds step times the eligibility trace to every traced weight, e.g. step_size * delta."""
+        self.flat_weights[self.trace_indices] += step * self.trace_values
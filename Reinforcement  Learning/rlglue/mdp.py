@@ -0,0 +1,640 @@
+#!/usr/bin/env python
+
+"""Finite MDPs as transition tensors, and the dynamic programming algorithms that solve them.
+
+Every algorithm backs up all the actions of a state with one matrix-vector
+product over P[s]. They differ in the order of the backups:
+
+- "synchronous": every state at once, from the values of the previous sweep
+- "gauss-seidel": one state at a time, in place, so later states of a sweep
+  already see the new values of earlier ones
+- "prioritized": the state with the largest Bellman error first, updating
+  the action values of its predecessors only (value iteration only, best
+  suited to models where each state has few predecessors)
+
+and each returns a ConvergenceReport with the number of sweeps and backups
+it took.
+
+TabularMDP keeps dense tensors. SparseTabularMDP keeps one CSR matrix per
+action instead, so memory is O(nnz) and every backup is a sparse
+matrix-vector product; scipy is only needed for its exact policy evaluation.
+"""
+
+import heapq
+
+import numpy as np
+
+
+class TabularMDP:
+    """TabularMDP class
+
+    A finite MDP given by its transition probabilities P[s, a, s'] and its
+    rewards, either R[s, a, s'] or the expected rewards R[s, a]. The values
+    of terminal states stay 0: their transitions and rewards are zeroed.
+
+    args:
+        P (Numpy array): the (num_states, num_actions, num_states) transition probabilities
+        R (Numpy array): the (num_states, num_actions, num_states) rewards or
+            the (num_states, num_actions) expected rewards
+        terminal (Numpy array): a boolean mask or the indices of the terminal states
+    """
+
+    def __init__(self, P, R, terminal=None):
+        P = np.asarray(P, dtype=float)
+        R = np.asarray(R, dtype=float)
+        if R.ndim == 3:
+            R = np.einsum('ijk,ijk->ij', P, R)
+
+        self.terminal = np.zeros(P.shape[0], dtype=bool)
+        if terminal is not None:
+            self.terminal[terminal] = True
+        if self.terminal.any():
+            P = P.copy()
+            R = R.copy()
+            P[self.terminal] = 0.0
+            R[self.terminal] = 0.0
+
+        self.P = P
+        self.rewards = R
+        self._predecessors = None
+
+    @classmethod
+    def from_transitions(cls, num_states, num_actions, transitions, terminal=None):
+        """Builds the tensors of a model given one state and action at a time
+
+        Args:
+            num_states (int): the number of states
+            num_actions (int): the number of actions
+            transitions (function): transitions(s, a) returns an iterable of
+                (next state, reward, probability) triples
+            terminal (Numpy array): see TabularMDP
+        Returns:
+            TabularMDP: the MDP
+        """
+        P = np.zeros((num_states, num_actions, num_states))
+        R = np.zeros((num_states, num_actions))
+        for s in range(num_states):
+            for a in range(num_actions):
+                for next_state, reward, probability in transitions(s, a):
+                    P[s, a, next_state] += probability
+                    R[s, a] += probability * reward
+
+        return cls(P, R, terminal)
+
+    @property
+    def num_states(self):
+        return self.P.shape[0]
+
+    @property
+    def num_actions(self):
+        return self.P.shape[1]
+
+    def q_values(self, V, gamma):
+        """The (num_states, num_actions) action values of V."""
+        return self.rewards + gamma * self.P.dot(V)
+
+    def policy_model(self, pi):
+        """The (num_states, num_states) transitions and (num_states,) expected rewards of following pi."""
+        return np.einsum('ij,ijk->ik', pi, self.P), np.einsum('ij,ij->i', pi, self.rewards)
+
+    def state_q_values(self, s, V, gamma):
+        """The (num_actions,) action values of V in state s."""
+        return self.rewards[s] + gamma * self.P[s].dot(V)
+
+    def greedy_policy(self, V, gamma):
+        """The deterministic policy greedy with respect to the action values of V, ties to the first action."""
+        return np.eye(self.num_actions)[np.argmax(self.q_values(V, gamma), axis=1)]
+
+    def predecessors(self):
+        """The states that can lead to each state, under any action."""
+        if self._predecessors is None:
+            reachable = self.P.any(axis=1)
+            self._predecessors = [np.flatnonzero(reachable[:, s]) for s in range(self.num_states)]
+        return self._predecessors
+
+    def predecessor_probabilities(self, s):
+        """The predecessors p of s and the (num_predecessors, num_actions) probabilities P[p, a, s]."""
+        states = self.predecessors()[s]
+        return states, self.P[states, :, s]
+
+    def to_sparse(self):
+        """The same MDP as a SparseTabularMDP."""
+        return SparseTabularMDP([self.P[:, a] for a in range(self.num_actions)], self.rewards, self.terminal)
+
+
+class CSRMatrix:
+    """CSRMatrix class
+
+    A sparse matrix in compressed sparse row format, with the operations the
+    dynamic programming algorithms need (matrix-vector products and rows) in
+    plain Numpy.
+
+    args:
+        data (Numpy array): the nonzero values, row by row
+        indices (Numpy array): the column of each value
+        indptr (Numpy array): row i is data[indptr[i]:indptr[i + 1]]
+        shape (tuple): the shape of the matrix
+    """
+
+    def __init__(self, data, indices, indptr, shape):
+        self.data = np.asarray(data, dtype=float)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.shape = tuple(shape)
+        self.rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    @classmethod
+    def from_coo(cls, rows, cols, data, shape):
+        """Builds the matrix from (row, col, value) triples, summing duplicates."""
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        data = np.asarray(data, dtype=float)
+
+        order = np.lexsort((cols, rows))
+        rows, cols, data = rows[order], cols[order], data[order]
+        if len(rows):
+            first = np.ones(len(rows), dtype=bool)
+            first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+            starts = np.flatnonzero(first)
+            rows, cols, data = rows[starts], cols[starts], np.add.reduceat(data, starts)
+
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=shape[0]), out=indptr[1:])
+
+        return cls(data, cols, indptr, shape)
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """Converts a CSRMatrix (returned as is), a scipy.sparse matrix or a dense array."""
+        if isinstance(matrix, cls):
+            return matrix
+        if hasattr(matrix, "tocsr"):
+            matrix = matrix.tocsr()
+            return cls(matrix.data, matrix.indices, matrix.indptr, matrix.shape)
+
+        matrix = np.asarray(matrix, dtype=float)
+        rows, cols = np.nonzero(matrix)
+        return cls.from_coo(rows, cols, matrix[rows, cols], matrix.shape)
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    def dot(self, V):
+        """The matrix-vector product, in O(nnz)."""
+        return np.bincount(self.rows, weights=self.data * V[self.indices], minlength=self.shape[0])
+
+    def __getitem__(self, i):
+        """Row i, as a sparse vector with a dot method."""
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return _SparseRow(self.data[start:end], self.indices[start:end])
+
+    def toarray(self):
+        dense = np.zeros(self.shape)
+        dense[self.rows, self.indices] = self.data
+        return dense
+
+    def to_scipy(self):
+        """The matrix as a scipy.sparse.csr_matrix (needs scipy)."""
+        from scipy.sparse import csr_matrix
+        return csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+
+class _SparseRow:
+    """One row of a CSRMatrix."""
+
+    def __init__(self, data, indices):
+        self.data = data
+        self.indices = indices
+
+    def dot(self, V):
+        return self.data.dot(V[self.indices])
+
+
+class SparseTabularMDP(TabularMDP):
+    """SparseTabularMDP class
+
+    A finite MDP given by one sparse (num_states, num_states) transition
+    matrix per action, for problems where each state has a handful of
+    successors. Works with every algorithm of this module.
+
+    args:
+        P (list): the num_actions transition matrices P[a][s, s'], as
+            CSRMatrix, scipy.sparse matrices or dense arrays
+        R (Numpy array): the (num_states, num_actions) expected rewards
+        terminal (Numpy array): a boolean mask or the indices of the terminal states
+    """
+
+    def __init__(self, P, R, terminal=None):
+        P = [CSRMatrix.from_matrix(P_a) for P_a in P]
+        R = np.array(R, dtype=float)
+
+        self.terminal = np.zeros(P[0].shape[0], dtype=bool)
+        if terminal is not None:
+            self.terminal[terminal] = True
+        if self.terminal.any():
+            R[self.terminal] = 0.0
+            P = [CSRMatrix.from_coo(P_a.rows[keep], P_a.indices[keep], P_a.data[keep], P_a.shape)
+                 for P_a, keep in ((P_a, ~self.terminal[P_a.rows]) for P_a in P)]
+
+        self.P = P
+        self.rewards = R
+        self._predecessors = None
+
+    @property
+    def num_states(self):
+        return self.P[0].shape[0]
+
+    @property
+    def num_actions(self):
+        return len(self.P)
+
+    @property
+    def nnz(self):
+        return sum(P_a.nnz for P_a in self.P)
+
+    def q_values(self, V, gamma):
+        """The (num_states, num_actions) action values of V."""
+        return self.rewards + gamma * np.stack([P_a.dot(V) for P_a in self.P], axis=1)
+
+    def state_q_values(self, s, V, gamma):
+        """The (num_actions,) action values of V in state s."""
+        return self.rewards[s] + gamma * np.array([P_a[s].dot(V) for P_a in self.P])
+
+    def policy_model(self, pi):
+        """The sparse (num_states, num_states) transitions and (num_states,) expected rewards of following pi."""
+        P_pi = CSRMatrix.from_coo(np.concatenate([P_a.rows for P_a in self.P]),
+                                  np.concatenate([P_a.indices for P_a in self.P]),
+                                  np.concatenate([P_a.data * pi[P_a.rows, a] for a, P_a in enumerate(self.P)]),
+                                  self.P[0].shape)
+        return P_pi, np.einsum('ij,ij->i', pi, self.rewards)
+
+    def predecessors(self):
+        """The states that can lead to each state, under any action."""
+        if self._predecessors is None:
+            self._build_predecessors()
+        return self._predecessors
+
+    def _build_predecessors(self):
+        """Groups the transitions by next state, through the transpose of the stacked actions."""
+        num_states, num_actions = self.num_states, self.num_actions
+        rows = np.concatenate([P_a.rows for P_a in self.P])
+        cols = np.concatenate([P_a.indices for P_a in self.P])
+        actions = np.concatenate([np.full(P_a.nnz, a) for a, P_a in enumerate(self.P)])
+        data = np.concatenate([P_a.data for P_a in self.P])
+
+        # one (predecessor, action) column per entry
+        P_T = CSRMatrix.from_coo(cols, rows * num_actions + actions, data, (num_states, num_states * num_actions))
+        self._predecessors = []
+        self._predecessor_probabilities = []
+        for s in range(num_states):
+            start, end = P_T.indptr[s], P_T.indptr[s + 1]
+            states, inverse = np.unique(P_T.indices[start:end] // num_actions, return_inverse=True)
+            probabilities = np.zeros((len(states), num_actions))
+            probabilities[inverse, P_T.indices[start:end] % num_actions] = P_T.data[start:end]
+            self._predecessors.append(states)
+            self._predecessor_probabilities.append((states, probabilities))
+
+    def predecessor_probabilities(self, s):
+        """The predecessors p of s and the (num_predecessors, num_actions) probabilities P[p, a, s]."""
+        if self._predecessors is None:
+            self._build_predecessors()
+        return self._predecessor_probabilities[s]
+
+    def to_sparse(self):
+        return self
+
+
+def as_mdp(model, terminal=None, sparse=False):
+    """Adapts a model to a TabularMDP
+
+    Args:
+        model: a TabularMDP or SparseTabularMDP, which is returned as is, or
+            any object with P and R tensors (e.g. tools.ParkingWorld)
+        terminal (Numpy array): see TabularMDP, when model is not a TabularMDP
+        sparse (bool): convert a model with P and R tensors to a SparseTabularMDP
+    Returns:
+        TabularMDP: the MDP
+    """
+    if isinstance(model, TabularMDP):
+        return model
+    mdp = TabularMDP(model.P, model.R, terminal)
+    return mdp.to_sparse() if sparse else mdp
+
+
+class ConvergenceReport:
+    """ConvergenceReport class
+
+    How a dynamic programming algorithm converged.
+
+    args:
+        method (str): the algorithm and backup order
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self.iterations = 0
+        self.backups = 0
+        self.deltas = []
+        self.converged = False
+
+    def add(self, delta, backups):
+        """Books one iteration: its largest value change and its number of state backups."""
+        self.iterations += 1
+        self.backups += backups
+        self.deltas.append(delta)
+
+    def __repr__(self):
+        return "{}: {} after {} iterations ({} backups), last delta {:.3g}".format(
+            self.method, "converged" if self.converged else "stopped", self.iterations,
+            self.backups, self.deltas[-1] if self.deltas else float('nan'))
+
+
+def policy_evaluation(mdp, pi, gamma, theta=1e-6, V=None, method="synchronous", max_sweeps=None):
+    """Computes the values of pi
+
+    Args:
+        mdp (TabularMDP): the MDP
+        pi (Numpy array): the (num_states, num_actions) policy
+        gamma (float): the discount factor
+        theta (float): stop once a sweep changes no value by theta or more
+        V (Numpy array): the initial values (default zeros)
+        method (str): "synchronous", "gauss-seidel", or "exact" for a linear solve
+        max_sweeps (int): stop after this many sweeps, converged or not
+    Returns:
+        (Numpy array, ConvergenceReport): the values and how they converged
+    """
+    report = ConvergenceReport("policy evaluation ({})".format(method))
+    P_pi, r_pi = mdp.policy_model(pi)
+
+    if method == "exact":
+        V = _solve_policy(P_pi, r_pi, gamma)
+        report.converged = True
+        return V, report
+
+    if method not in ("synchronous", "gauss-seidel"):
+        raise ValueError("Unknown policy evaluation method {}".format(method))
+
+    V = np.zeros(len(r_pi)) if V is None else np.array(V, dtype=float)
+    while max_sweeps is None or report.iterations < max_sweeps:
+        if method == "synchronous":
+            V_new = r_pi + gamma * P_pi.dot(V)
+            delta = np.max(np.abs(V_new - V))
+            V = V_new
+        else:
+            delta = 0.0
+            for s in range(len(V)):
+                v = r_pi[s] + gamma * P_pi[s].dot(V)
+                delta = max(delta, abs(v - V[s]))
+                V[s] = v
+        report.add(delta, len(V))
+
+        if delta < theta:
+            report.converged = True
+            break
+
+    return V, report
+
+
+def _solve_policy(P_pi, r_pi, gamma):
+    """Solves the linear Bellman equations (I - gamma P_pi) V = r_pi."""
+    if not isinstance(P_pi, CSRMatrix):
+        return np.linalg.solve(np.eye(len(r_pi)) - gamma * P_pi, r_pi)
+
+    try:
+        from scipy.sparse import identity
+        from scipy.sparse.linalg import spsolve
+    except ImportError:
+        raise ImportError("The exact evaluation of a SparseTabularMDP needs scipy; "
+                          "use method=\"synchronous\" or \"gauss-seidel\" without it")
+    return spsolve((identity(len(r_pi), format="csr") - gamma * P_pi.to_scipy()).tocsc(), r_pi)
+
+
+def value_iteration(mdp, gamma, theta=1e-6, V=None, method="synchronous", max_backups=None):
+    """Computes the optimal values with Bellman optimality backups
+
+    Args:
+        mdp (TabularMDP): the MDP
+        gamma (float): the discount factor
+        theta (float): stop once a sweep changes no value by theta or more
+            (for "prioritized": once no state has a Bellman error of theta or more)
+        V (Numpy array): the initial values (default zeros)
+        method (str): "synchronous", "gauss-seidel" or "prioritized"
+        max_backups (int): stop after about this many state backups, converged or not
+    Returns:
+        (Numpy array, Numpy array, ConvergenceReport): the values, the greedy
+            policy and how they converged
+    """
+    report = ConvergenceReport("value iteration ({})".format(method))
+    V = np.zeros(mdp.num_states) if V is None else np.array(V, dtype=float)
+
+    if method == "prioritized":
+        _prioritized_sweeps(mdp, V, gamma, theta, max_backups, report)
+    elif method in ("synchronous", "gauss-seidel"):
+        while max_backups is None or report.backups < max_backups:
+            if method == "synchronous":
+                V_new = mdp.q_values(V, gamma).max(axis=1)
+                delta = np.max(np.abs(V_new - V))
+                V = V_new
+            else:
+                delta = 0.0
+                for s in range(len(V)):
+                    v = np.max(mdp.state_q_values(s, V, gamma))
+                    delta = max(delta, abs(v - V[s]))
+                    V[s] = v
+            report.add(delta, len(V))
+
+            if delta < theta:
+                report.converged = True
+                break
+    else:
+        raise ValueError("Unknown value iteration method {}".format(method))
+
+    return V, mdp.greedy_policy(V, gamma), report
+
+
+def _prioritized_sweeps(mdp, V, gamma, theta, max_backups, report):
+    """Backs up, in place, the state with the largest Bellman error until every error is below theta.
+
+    Every backup is one iteration of the report. The action values are kept
+    up to date incrementally: a change dv of V[s] changes q[p, a] by
+    gamma * P[p, a, s] * dv for the predecessors p of s only. The queue holds
+    (-error, state) pairs; entries whose error is no longer the current
+    error of their state are stale and skipped.
+    """
+    q = mdp.q_values(V, gamma)
+    errors = np.abs(q.max(axis=1) - V)
+    queue = [(-error, s) for s, error in enumerate(errors) if error >= theta]
+    heapq.heapify(queue)
+
+    while queue and (max_backups is None or report.backups < max_backups):
+        error, s = heapq.heappop(queue)
+        if -error != errors[s]:
+            continue
+
+        dv = q[s].max() - V[s]
+        report.add(abs(dv), 1)
+        V[s] += dv
+        errors[s] = 0.0
+
+        states, probabilities = mdp.predecessor_probabilities(s)
+        q[states] += gamma * dv * probabilities
+        errors[states] = np.abs(q[states].max(axis=1) - V[states])
+        for p in states[errors[states] >= theta]:
+            heapq.heappush(queue, (-errors[p], p))
+
+    report.converged = not queue
+
+
+def policy_iteration(mdp, gamma, theta=1e-6, method="exact", max_iterations=1000):
+    """Alternates policy evaluation and greedification, from the uniform policy, until the policy is stable
+
+    Args:
+        mdp (TabularMDP): the MDP
+        gamma (float): the discount factor
+        theta (float): the threshold of the policy evaluations
+        method (str): the policy evaluation method, see policy_evaluation
+        max_iterations (int): raise a RuntimeError if the policy is still
+            changing after this many improvements (e.g. when greedy ties are
+            broken differently from one evaluation to the next)
+    Returns:
+        (Numpy array, Numpy array, ConvergenceReport): the values, the policy
+            and how they converged, with one iteration per improvement
+    """
+    report = ConvergenceReport("policy iteration ({} evaluation)".format(method))
+    V = np.zeros(mdp.num_states)
+    pi = np.ones((mdp.num_states, mdp.num_actions)) / mdp.num_actions
+
+    while report.iterations < max_iterations:
+        V_old = V
+        V, evaluation = policy_evaluation(mdp, pi, gamma, theta, V, method)
+        new_pi = mdp.greedy_policy(V, gamma)
+        report.add(np.max(np.abs(V - V_old)), evaluation.backups + mdp.num_states)
+
+        if np.array_equal(new_pi, pi):
+            report.converged = True
+            return V, pi, report
+        pi = new_pi
+
+    raise RuntimeError("{} without a stable policy".format(report))
+
+
+def modified_policy_iteration(mdp, gamma, theta=1e-6, evaluation_sweeps=5, V=None, max_iterations=None):
+    """Policy iteration with a few synchronous evaluation sweeps per policy
+
+    Every iteration is one Bellman optimality backup of every state, which
+    also picks the greedy policy, followed by evaluation_sweeps - 1 sweeps of
+    that policy. evaluation_sweeps=1 is value iteration, and many sweeps
+    approach policy iteration.
+
+    Args:
+        mdp (TabularMDP): the MDP
+        gamma (float): the discount factor
+        theta (float): stop once an optimality backup changes no value by theta or more
+        evaluation_sweeps (int): the number of backups per policy
+        V (Numpy array): the initial values (default zeros)
+        max_iterations (int): stop after this many policies, converged or not
+    Returns:
+        (Numpy array, Numpy array, ConvergenceReport): the values, the greedy
+            policy and how they converged
+    """
+    report = ConvergenceReport("modified policy iteration ({} sweeps)".format(evaluation_sweeps))
+    V = np.zeros(mdp.num_states) if V is None else np.array(V, dtype=float)
+
+    while max_iterations is None or report.iterations < max_iterations:
+        q = mdp.q_values(V, gamma)
+        V_new = q.max(axis=1)
+        delta = np.max(np.abs(V_new - V))
+        V = V_new
+
+        if delta < theta:
+            report.add(delta, mdp.num_states)
+            report.converged = True
+            break
+
+        P_pi, r_pi = mdp.policy_model(np.eye(mdp.num_actions)[np.argmax(q, axis=1)])
+        for _ in range(evaluation_sweeps - 1):
+            V = r_pi + gamma * P_pi.dot(V)
+        report.add(delta, mdp.num_states * evaluation_sweeps)
+
+    return V, mdp.greedy_policy(V, gamma), report
+
+
+def grid_world_mdp(shape, terminals=((0, 0),), rewards=-1.0, sparse=False):
+    """The grid worlds of the Dynamic Programming notebooks
+
+    The actions move up, right, down and left; moves off the grid leave the
+    agent where it is.
+
+    Args:
+        shape (tuple): the (height, width) of the grid
+        terminals (list): the (row, col) of the terminal cells
+        rewards (float or Numpy array): the reward of every move, or the
+            (height, width) rewards of moving into each cell
+        sparse (bool): build a SparseTabularMDP, for large grids
+    Returns:
+        TabularMDP: the MDP, with state row * width + col
+    """
+    height, width = shape
+    row, col = np.divmod(np.arange(height * width), width)
+
+    next_rows = np.stack([np.maximum(row - 1, 0), row, np.minimum(row + 1, height - 1), row], axis=1)
+    next_cols = np.stack([col, np.minimum(col + 1, width - 1), col, np.maximum(col - 1, 0)], axis=1)
+    next_states = next_rows * width + next_cols
+
+    num_states = height * width
+    R = np.broadcast_to(np.asarray(rewards, dtype=float), shape).reshape(-1)[next_states]
+    terminal = [r * width + c for r, c in terminals]
+
+    if sparse:
+        indptr = np.arange(num_states + 1)
+        P = [CSRMatrix(np.ones(num_states), next_states[:, a], indptr, (num_states, num_states))
+             for a in range(4)]
+        return SparseTabularMDP(P, R, terminal)
+
+    P = np.zeros((num_states, 4, num_states))
+    np.put_along_axis(P, next_states[..., np.newaxis], 1.0, axis=2)
+
+    return TabularMDP(P, R, terminal)
+
+
+def random_walk_mdp(num_states, action_range, sparse=False):
+    """The random walk of the TD with State Aggregation assignment, as a one-action MDP
+
+    From every state the walk jumps to one of the action_range states on
+    either side with equal probability. Jumping past state num_states ends
+    the episode with reward 1, and past state 1 with reward -1.
+
+    Args:
+        num_states (int): the number of non-terminal states
+        action_range (int): the largest jump
+        sparse (bool): build a SparseTabularMDP, with O(num_states * action_range) memory
+    Returns:
+        TabularMDP: the MDP, with the terminal state 0 and states 1..num_states
+    """
+    state_prob = 0.5 / float(action_range)
+    s = np.arange(1, num_states + 1).reshape(-1, 1)
+    jumps = np.arange(1, action_range + 1)
+
+    right = s + jumps
+    left = s - jumps
+    right_rewards = np.where(right > num_states, 1.0, 0.0)
+    left_rewards = np.where(left < 1, -1.0, 0.0)
+    right = np.where(right > num_states, 0, right)
+    left = np.where(left < 1, 0, left)
+
+    R = np.zeros((num_states + 1, 1))
+    R[1:, 0] = state_prob * (right_rewards + left_rewards).sum(axis=1)
+
+    rows = np.broadcast_to(s, right.shape)
+    if sparse:
+        P = CSRMatrix.from_coo(np.concatenate([rows.ravel(), rows.ravel()]),
+                               np.concatenate([right.ravel(), left.ravel()]),
+                               np.full(2 * rows.size, state_prob), (num_states + 1, num_states + 1))
+        return SparseTabularMDP([P], R, terminal=[0])
+
+    P = np.zeros((num_states + 1, 1, num_states + 1))
+    np.add.at(P[:, 0], (rows, right), state_prob)
+    np.add.at(P[:, 0], (rows, left), state_prob)
+
+    return TabularMDP(P, R, terminal=[0])
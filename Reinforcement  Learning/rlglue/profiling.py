@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+
+"""Opt-in timing of the environment, agent and agent sub-phase calls made by RLGlue.
+
+A Profiler replaces the methods it times with timing wrappers stored on the
+instance, so nothing is added to the step loop while profiling is disabled.
+Timings are inclusive: a planning_step called from agent_step is also counted
+in agent_step.
+
+Example:
+
+    # DynaQAgent takes agent_info in its constructor, RLGlue calls agent_class()
+    rl_glue = RLGlue(MazeEnvironment, partial(DynaQAgent, agent_info))
+    profiler = rl_glue.rl_enable_profiling(agent_phases=["planning_step"])
+    rl_glue.rl_init(agent_info, env_info)
+    rl_glue.rl_episode(0)
+    print(profiler.report())
+    profiler.export_chrome_trace("maze_trace.json")
+"""
+
+import json
+import time
+
+ENVIRONMENT_METHODS = ("env_start", "env_step")
+AGENT_METHODS = ("agent_start", "agent_step", "agent_end")
+
+
+class MethodPatch:
+    """Replaces a method of an instance with a wrapper, in a way that can be undone in any order
+
+    The wrapper is stored on the instance, over whatever was there before
+    (the class method, or the wrapper of another patch). remove() puts the
+    previous attribute back when this patch is the outermost one; when another
+    patch has wrapped it since, this wrapper just passes calls through from
+    then on, and is skipped when that outer patch is removed.
+
+    args:
+        obj: the instance
+        method_name (string): the method to replace
+        make_wrapper (callable): make_wrapper(method) returns the wrapper of
+            the current method
+    """
+
+    def __init__(self, obj, method_name, make_wrapper):
+        self.obj = obj
+        self.method_name = method_name
+        self.had_attribute = method_name in vars(obj)
+        self.previous = vars(obj).get(method_name)
+        self.active = True
+
+        method = getattr(obj, method_name)
+        wrapper = make_wrapper(method)
+        patch = self
+
+        def dispatch(*args, **kwargs):
+            if patch.active:
+                return wrapper(*args, **kwargs)
+            return method(*args, **kwargs)
+
+        dispatch.patch = self
+        self.wrapper = dispatch
+        setattr(obj, method_name, dispatch)
+
+    def remove(self):
+        """Undoes the patch; removing it twice does nothing."""
+        if not self.active:
+            return
+        self.active = False
+
+        if vars(self.obj).get(self.method_name) is not self.wrapper:
+            return
+
+        # skip the patches below this one that were removed while wrapped
+        had_attribute, previous = self.had_attribute, self.previous
+        while had_attribute and getattr(previous, "patch", None) is not None and not previous.patch.active:
+            had_attribute, previous = previous.patch.had_attribute, previous.patch.previous
+
+        if had_attribute:
+            setattr(self.obj, self.method_name, previous)
+        else:
+            delattr(self.obj, self.method_name)
+
+
+class Profiler:
+    """Profiler class
+
+    args:
+        record_trace (bool): keep every call as an event for export_chrome_trace,
+            instead of only the cumulative time and call count
+    """
+
+    def __init__(self, record_trace=False):
+        self.record_trace = record_trace
+        self.stats = {}
+        self.events = []
+        self.wrapped = []
+        self.start_time = time.perf_counter()
+
+    def wrap(self, obj, method_name, name=None):
+        """Times every call to obj.method_name under the given name
+
+        Args:
+            obj: the environment or agent instance
+            method_name (string): the method to time, e.g. "planning_step"
+            name (string): the label used in the report, defaults to method_name
+        """
+        name = name or method_name
+        stat = self.stats.setdefault(name, [0, 0.0])
+        events = self.events if self.record_trace else None
+        clock = time.perf_counter
+
+        def make_timed(method):
+            def timed(*args, **kwargs):
+                start = clock()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    elapsed = clock() - start
+                    stat[0] += 1
+                    stat[1] += elapsed
+                    if events is not None:
+                        events.append((name, start, elapsed))
+
+            return timed
+
+        self.wrapped.append(MethodPatch(obj, method_name, make_timed))
+
+    def unwrap(self):
+        """Restores every wrapped method; the collected timings are kept."""
+        for patch in reversed(self.wrapped):
+            patch.remove()
+        self.wrapped = []
+
+    def reset(self):
+        """Clears the collected timings, e.g. between runs."""
+        for stat in self.stats.values():
+            stat[0] = 0
+            stat[1] = 0.0
+        self.events.clear()
+        self.start_time = time.perf_counter()
+
+    def summary(self):
+        """The cumulative timings
+
+        Returns:
+            dict: {name: {"calls": int, "total_time": float, "mean_time": float}},
+                with times in seconds
+        """
+        return {name: {"calls": calls,
+                       "total_time": total_time,
+                       "mean_time": total_time / calls if calls else 0.0}
+                for name, (calls, total_time) in self.stats.items()}
+
+    def report(self):
+        """A table of the cumulative timings, slowest first
+
+        Returns:
+            string: one line per timed method
+        """
+        wall_time = time.perf_counter() - self.start_time
+        lines = ["{:<20} {:>10} {:>12} {:>12} {:>8}".format(
+            "name", "calls", "total (s)", "mean (us)", "% wall")]
+
+        stats = sorted(self.summary().items(), key=lambda item: -item[1]["total_time"])
+        for name, stat in stats:
+            lines.append("{:<20} {:>10} {:>12.4f} {:>12.2f} {:>8.1f}".format(
+                name, stat["calls"], stat["total_time"], stat["mean_time"] * 1e6,
+                100.0 * stat["total_time"] / wall_time))
+
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path):
+        """Writes the timings as a Chrome trace (chrome://tracing, Perfetto)
+
+        Every recorded call becomes a complete ("X") event; the cumulative
+        summary is stored under "otherData".
+
+        Args:
+            path (string): the JSON file to write
+        """
+        trace_events = [{"name": name, "ph": "X", "pid": 0, "tid": 0,
+                         "ts": (start - self.start_time) * 1e6, "dur": elapsed * 1e6}
+                        for name, start, elapsed in self.events]
+
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events,
+                       "displayTimeUnit": "ms",
+                       "otherData": self.summary()}, f)
+
+
+def profile_rl_glue(rl_glue, agent_phases=(), record_trace=False):
+    """Times the environment and agent calls made by an RLGlue
+
+    Args:
+        rl_glue: the RLGlue whose environment and agent are timed
+        agent_phases (list): names of extra agent methods to time, e.g. ["planning_step"]
+        record_trace (bool): see Profiler
+
+    Returns:
+        Profiler: the profiler collecting the timings
+    """
+    profiler = Profiler(record_trace)
+
+    for method_name in ENVIRONMENT_METHODS:
+        profiler.wrap(rl_glue.environment, method_name)
+    for method_name in AGENT_METHODS + tuple(agent_phases):
+        profiler.wrap(rl_glue.agent, method_name)
+
+    return profiler
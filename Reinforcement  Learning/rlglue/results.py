@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+
+"""A results store: one memory-mapped array per metric, indexed by a table of configurations.
+
+A store is a directory holding
+    table.json       the configurations, the number of runs and extra attributes
+    completed.npy    the (num_configs, num_runs) flags of the runs written so far
+    {metric}.npy     the (num_configs, num_runs, ...) values of every metric
+The metric arrays are plain .npy files created on the first write of the
+metric, so runs can be added one at a time while a sweep is going, and a
+reader memory-maps them and only pages in the configurations, runs and
+x-range it slices.
+
+Example:
+
+    store = ResultsStore("results", configs=parameter_grid(agent_parameters), num_runs=50)
+    store.write(store.index(step_size=0.1), run - 1, {"total_return": return_per_step})
+
+    data = open_results("results").get("total_return", x_range=20000, step_size=0.1)
+"""
+
+import json
+import os
+
+import numpy as np
+
+TABLE_FILE = "table.json"
+COMPLETED_FILE = "completed.npy"
+
+
+def _json_value(value):
+    """Numpy scalars and arrays (e.g. swept with np.arange) as JSON values."""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError("{!r} cannot be stored in a results table".format(value))
+
+
+def open_results(directory):
+    """The ResultsStore in directory, or None if there is none (e.g. only per-configuration .npy files)."""
+    if ResultsStore.exists(directory):
+        return ResultsStore(directory, read_only=True)
+    return None
+
+
+class ResultsStore:
+    """ResultsStore class
+
+    args:
+        directory (string): the directory of the store
+        configs (list): the configurations (dicts of JSON values) of a new
+            store; None opens the existing store in directory
+        num_runs (int): the number of runs per configuration of a new store
+        attributes (dict): JSON values kept with the table, e.g. the
+            evaluation frequency of a learning curve
+        read_only (bool): map the arrays of an existing store read-only
+    """
+
+    def __init__(self, directory, configs=None, num_runs=None, attributes={}, read_only=False):
+        self.directory = directory
+        self.mmap_mode = "r" if read_only else "r+"
+        self.arrays = {}
+
+        table_path = os.path.join(directory, TABLE_FILE)
+        if configs is None:
+            with open(table_path) as f:
+                table = json.load(f)
+            self.configs = table["configs"]
+            self.num_runs = table["num_runs"]
+            self.attributes = table["attributes"]
+            self.completed = np.load(os.path.join(directory, COMPLETED_FILE), mmap_mode=self.mmap_mode)
+            return
+
+        # round trip through JSON, so the table compares equal to the one read back from disk
+        table = json.loads(json.dumps({"configs": list(configs), "num_runs": num_runs,
+                                       "attributes": attributes}, default=_json_value))
+        self.configs = table["configs"]
+        self.num_runs = num_runs
+        self.attributes = table["attributes"]
+
+        if os.path.exists(table_path):
+            # reopening the store of an interrupted sweep keeps the runs written so far
+            with open(table_path) as f:
+                if json.load(f) != table:
+                    raise ValueError("{} holds a store with other configurations".format(directory))
+            self.completed = np.load(os.path.join(directory, COMPLETED_FILE), mmap_mode="r+")
+            return
+
+        os.makedirs(directory, exist_ok=True)
+        self.completed = np.lib.format.open_memmap(os.path.join(directory, COMPLETED_FILE), mode="w+",
+                                                   dtype=bool, shape=(len(self.configs), num_runs))
+        with open(table_path, "w") as f:
+            json.dump(table, f, indent=1)
+
+    @staticmethod
+    def exists(directory):
+        return os.path.exists(os.path.join(directory, TABLE_FILE))
+
+    def metric_path(self, metric):
+        return os.path.join(self.directory, "{}.npy".format(metric))
+
+    def metrics(self):
+        """The names of the metrics written so far."""
+        return sorted(name[:-len(".npy")] for name in os.listdir(self.directory)
+                      if name.endswith(".npy") and name != COMPLETED_FILE)
+
+    def array(self, metric):
+        """The memory-mapped (num_configs, num_runs, ...) array of metric."""
+        if metric not in self.arrays:
+            self.arrays[metric] = np.load(self.metric_path(metric), mmap_mode=self.mmap_mode)
+        return self.arrays[metric]
+
+    def find(self, **config):
+        """The indices of the configurations whose values match every given one."""
+        return [i for i, c in enumerate(self.configs)
+                if all(key in c and c[key] == value for key, value in config.items())]
+
+    def index(self, **config):
+        """The index of the single configuration matching the given values."""
+        indices = self.find(**config)
+        if len(indices) != 1:
+            raise KeyError("{} configurations match {}".format(len(indices), config))
+        return indices[0]
+
+    def name_index(self, name):
+        """The index of the configuration named name in the "names" attribute (ParameterSweep stores)."""
+        if name not in self.attributes.get("names", []):
+            raise KeyError("No configuration is named {}".format(name))
+        return self.attributes["names"].index(name)
+
+    def write(self, config_index, run, results):
+        """Stores the results of one run of a configuration
+
+        Args:
+            config_index (int): the index of the configuration in the table
+            run (int): the run, from 0 to num_runs - 1
+            results (dict): {metric: value}; a metric seen for the first time
+                gets an array shaped after its value
+        """
+        for metric, value in results.items():
+            value = np.asarray(value)
+            if metric not in self.arrays and not os.path.exists(self.metric_path(metric)):
+                self.arrays[metric] = np.lib.format.open_memmap(
+                    self.metric_path(metric), mode="w+", dtype=value.dtype,
+                    shape=(len(self.configs), self.num_runs) + value.shape)
+
+            data = self.array(metric)
+            data[config_index, run] = value
+            data.flush()
+
+        self.completed[config_index, run] = True
+        self.completed.flush()
+
+    def completed_runs(self, config_index):
+        """The runs of a configuration written so far."""
+        return np.flatnonzero(self.completed[config_index])
+
+    def select(self, metric, configs=None, runs=None, x_range=None):
+        """Reads a slice of a metric
+
+        Args:
+            metric (string): the metric
+            configs (list): configuration indices, all of them by default
+            runs (list): run indices, all of them by default
+            x_range (int or slice): the steps or episodes to read along the
+                first axis of a run, e.g. 20000 for the first 20000
+
+        Returns:
+            Numpy array: (len(configs), len(runs), ...) values
+        """
+        data = self.array(metric)
+        # slice the x-range first: it is a view, so only the selected pages are read
+        if x_range is not None:
+            data = data[:, :, x_range if isinstance(x_range, slice) else slice(x_range)]
+        if configs is not None:
+            data = data[np.asarray(configs, dtype=np.intp)]
+        if runs is not None:
+            data = data[:, np.asarray(runs, dtype=np.intp)]
+
+        return np.asarray(data)
+
+    def get(self, metric, x_range=None, name=None, **config):
+        """The completed runs of one configuration
+
+        Args:
+            metric (string): the metric
+            x_range (int or slice): see select
+            name (string): the name of the configuration, see name_index
+            config: otherwise, values that match a single configuration
+
+        Returns:
+            Numpy array: (num_completed_runs, ...) values, cut to x_range as in select
+        """
+        i = self.name_index(name) if name is not None else self.index(**config)
+        return self.select(metric, [i], self.completed_runs(i), x_range)[0]
@@ -5,14 +5,14 @@
 
 from __future__ import print_function
 
+from rlglue.profiling import profile_rl_glue
+from rlglue.trajectory import TrajectoryRecorder
 
-class RLGlue:
-    """RLGlue class
 
-    args:
-        env_name (string): the name of the module where the Environment class can be found
-        agent_name (string): the name of the module where the Agent class can be found
-    """
+class _RLGlueMethods:
+    """The RLGlue methods, shared by RLGlue and SlotsRLGlue."""
+
+    __slots__ = ()
 
     def __init__(self, env_class, agent_class):
         self.environment = env_class()
@@ -22,6 +22,8 @@ class RLGlue:
         self.last_action = None
         self.num_steps = None
         self.num_episodes = None
+        self.profiler = None
+        self.recorder = None
 
     def rl_init(self, agent_init_info={}, env_init_info={}):
         """Initial method called when RLGlue experiment is created"""
@@ -38,7 +40,13 @@ class RLGlue:
         Returns:
             tuple: (state, action)
         """
-        
+
+        # rl_return and rl_num_steps are per episode. Only the Actor-Critic,
+        # Function Approximation and Control, MoonShot Agent and Q-Learning
+        # copies of RL-Glue reset them here; in the other folders (Bandits,
+        # Dyna Q, Parameter Study, Optimal Policies, Semi-gradient TD, TD with
+        # State Aggregation, Time Difference) they used to add up over every
+        # episode since rl_init.
         self.total_reward = 0.0
         self.num_steps = 1
 
@@ -129,7 +137,7 @@ class RLGlue:
 
         (reward, last_state, term) = self.environment.env_step(self.last_action)
 
-        self.total_reward += reward;
+        self.total_reward += reward
 
         if term:
             self.num_episodes += 1
@@ -181,17 +189,75 @@ class RLGlue:
         Returns:
             Boolean: if the episode should terminate
         """
-        is_terminal = False
-
         self.rl_start()
 
+        # same bookkeeping as rl_step, with the counters and bound methods kept in locals
+        env_step = self.environment.env_step
+        agent_step = self.agent.agent_step
+        action = self.last_action
+        total_reward = self.total_reward
+        num_steps = self.num_steps
+        is_terminal = False
+
         while (not is_terminal) and ((max_steps_this_episode == 0) or
-                                     (self.num_steps < max_steps_this_episode)):
-            rl_step_result = self.rl_step()
-            is_terminal = rl_step_result[3]
+                                     (num_steps < max_steps_this_episode)):
+            reward, state, is_terminal = env_step(action)
+            total_reward += reward
+
+            if is_terminal:
+                self.num_episodes += 1
+                self.agent.agent_end(reward)
+            else:
+                num_steps += 1
+                action = agent_step(reward, state)
+
+        self.last_action = action
+        self.total_reward = total_reward
+        self.num_steps = num_steps
 
         return is_terminal
 
+    def rl_enable_profiling(self, agent_phases=(), record_trace=False):
+        """Starts timing the environment and agent calls
+
+        Args:
+            agent_phases (list): names of extra agent methods to time, e.g.
+                ["planning_step"] for the Dyna-Q agents
+            record_trace (bool): keep every call for Profiler.export_chrome_trace
+
+        Returns:
+            Profiler: collects the cumulative time and call count of env_start,
+                env_step, agent_start, agent_step, agent_end and agent_phases
+        """
+        self.rl_disable_profiling()
+        self.profiler = profile_rl_glue(self, agent_phases, record_trace)
+
+        return self.profiler
+
+    def rl_disable_profiling(self):
+        """Stops timing; the last profiler keeps the timings collected so far"""
+        if self.profiler is not None:
+            self.profiler.unwrap()
+
+    def rl_enable_recording(self):
+        """Starts recording the (s, a, r, s', done) steps of the environment
+
+        Recording and profiling can be enabled and disabled in any order.
+
+        Returns:
+            TrajectoryRecorder: trajectories() gives the recorded episodes,
+                see rlglue.trajectory
+        """
+        self.rl_disable_recording()
+        self.recorder = TrajectoryRecorder(self.environment)
+
+        return self.recorder
+
+    def rl_disable_recording(self):
+        """Stops recording; the last recorder keeps the episodes recorded so far"""
+        if self.recorder is not None:
+            self.recorder.unwrap()
+
     def rl_return(self):
         """The total reward
 
@@ -216,3 +282,24 @@ class RLGlue:
 
         """
         return self.num_episodes
+
+
+class RLGlue(_RLGlueMethods):
+    """RLGlue class
+
+    args:
+        env_class: the Environment class, instantiated without arguments
+        agent_class: the Agent class, instantiated without arguments
+    """
+
+
+class SlotsRLGlue(_RLGlueMethods):
+    """RLGlue without a per-instance __dict__
+
+    Same API as RLGlue, with the attributes stored in __slots__ so the
+    attribute lookups done on every step are a little cheaper. New attributes
+    cannot be added to an instance.
+    """
+
+    __slots__ = ("environment", "agent", "total_reward", "last_action", "num_steps", "num_episodes",
+                 "profiler", "recorder")
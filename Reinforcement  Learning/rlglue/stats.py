@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+
+"""Streaming statistics of learning curves over runs.
+
+RunningStats keeps the per-step count, mean and sum of squared deviations of
+the curves added to it (Welford's algorithm), so the mean and standard error
+over any number of runs take O(steps) memory; an optional fixed-bin histogram
+per step also gives approximate quantiles. The plot scripts read the saved
+summary instead of every run.
+
+Example:
+
+    stats = RunningStats(max_steps)
+    for run in range(1, num_runs + 1):
+        ...
+        for step in range(max_steps):
+            ...
+            stats.add(total_return, start=step)
+    stats.save("results/{}_total_return_summary.npz".format(save_name))
+"""
+
+import numpy as np
+
+
+class RunningStats:
+    """RunningStats class
+
+    args:
+        shape (int or tuple): the shape of one curve, e.g. the number of steps
+        quantile_range ((float, float)): the (low, high) range of the quantile
+            histogram; None (the default) keeps no histogram. Values outside
+            the range are counted in the first or last bin.
+        num_bins (int): the number of histogram bins per element
+    """
+
+    def __init__(self, shape, quantile_range=None, num_bins=200):
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+        self.quantile_range = quantile_range
+        self.histogram = None
+        if quantile_range is not None:
+            self.histogram = np.zeros(self.count.shape + (num_bins,), dtype=np.int64)
+
+    def add(self, values, start=0):
+        """Adds one run
+
+        Args:
+            values (Numpy array): a whole curve, or the values of a run from
+                element start along the first axis on (a single step's value
+                with start=step, to feed the statistics while the run goes)
+            start (int): the first element of the curve that values covers
+        """
+        values = np.asarray(values, dtype=float)
+        if values.ndim < self.count.ndim:
+            values = values.reshape((1,) + values.shape)
+        index = slice(start, start + len(values))
+
+        count = self.count[index]
+        count += 1
+        delta = values - self.mean[index]
+        self.mean[index] += delta / count
+        self.m2[index] += delta * (values - self.mean[index])
+
+        if self.histogram is not None:
+            low, high = self.quantile_range
+            num_bins = self.histogram.shape[-1]
+            bins = ((values - low) * (num_bins / (high - low))).astype(np.int64)
+            np.clip(bins, 0, num_bins - 1, out=bins)
+            histogram = self.histogram[index].reshape(-1, num_bins)
+            histogram[np.arange(len(histogram)), bins.ravel()] += 1
+            self.histogram[index] = histogram.reshape(self.histogram[index].shape)
+
+    def merge(self, other):
+        """Adds the runs summarized by another RunningStats of the same shape (e.g. from a worker)."""
+        count = self.count + other.count
+        safe_count = np.maximum(count, 1)
+        delta = other.mean - self.mean
+
+        self.mean = self.mean + delta * (other.count / safe_count)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / safe_count)
+        self.count = count
+
+        if self.histogram is not None:
+            self.histogram += other.histogram
+
+    def variance(self):
+        """The per-element variance over runs (ddof=0, as np.var), nan where no run was added."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.m2 / self.count
+
+    def std(self):
+        return np.sqrt(self.variance())
+
+    def std_err(self):
+        """The standard error of the mean, np.std / sqrt(runs) as in the plot scripts."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.std() / np.sqrt(self.count)
+
+    def quantiles(self, q):
+        """Approximate quantiles from the histogram, interpolated within a bin
+
+        Args:
+            q (list): quantiles between 0 and 1
+
+        Returns:
+            Numpy array: (len(q), *shape) values
+        """
+        if self.histogram is None:
+            raise ValueError("RunningStats was created without a quantile_range")
+
+        low, high = self.quantile_range
+        num_bins = self.histogram.shape[-1]
+        cumulative = np.cumsum(self.histogram, axis=-1)
+
+        quantiles = []
+        for quantile in np.atleast_1d(q):
+            target = quantile * self.count[..., np.newaxis]
+            bins = np.minimum(np.sum(cumulative < target, axis=-1), num_bins - 1)
+            in_bin = np.take_along_axis(self.histogram, bins[..., np.newaxis], -1)[..., 0]
+            below = np.take_along_axis(cumulative, bins[..., np.newaxis], -1)[..., 0] - in_bin
+            with np.errstate(invalid="ignore", divide="ignore"):
+                fraction = np.clip((target[..., 0] - below) / in_bin, 0.0, 1.0)
+            quantiles.append(low + (bins + np.nan_to_num(fraction)) * ((high - low) / num_bins))
+
+        return np.array(quantiles)
+
+    def summary(self, q=()):
+        """The per-element statistics
+
+        Args:
+            q (list): quantiles to add, see quantiles
+
+        Returns:
+            dict: "count", "mean", "std", "std_err" (and "quantiles", "q") arrays
+        """
+        summary = {"count": self.count, "mean": self.mean, "std": self.std(), "std_err": self.std_err()}
+        if len(q):
+            summary["q"] = np.asarray(q)
+            summary["quantiles"] = self.quantiles(q)
+        return summary
+
+    def state(self):
+        """The running sums, as a dict of arrays, from which from_state rebuilds the statistics."""
+        state = {"count": self.count, "mean": self.mean, "m2": self.m2}
+        if self.histogram is not None:
+            state["histogram"] = self.histogram
+            state["quantile_range"] = np.asarray(self.quantile_range)
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """The RunningStats of the running sums returned by state (or read back from a summary)."""
+        quantile_range = tuple(state["quantile_range"]) if "histogram" in state else None
+        stats = cls(np.shape(state["count"]), quantile_range)
+        stats.count = np.array(state["count"])
+        stats.mean = np.array(state["mean"])
+        stats.m2 = np.array(state["m2"])
+        if quantile_range is not None:
+            stats.histogram = np.array(state["histogram"])
+        return stats
+
+    def save(self, path, q=(), **attributes):
+        """Writes the summary (and the running sums, to keep adding runs later) as a .npz file
+
+        Args:
+            path (string): the file
+            q (list): quantiles to store in the summary
+            attributes: extra values to store, e.g. eval_freq=10
+        """
+        np.savez(path, **dict(self.summary(q), **self.state()), **attributes)
+
+    @classmethod
+    def load(cls, path):
+        """The RunningStats saved at path, to add more runs to it."""
+        with np.load(path) as data:
+            return cls.from_state({key: data[key] for key in data.files})
+
+
+def load_summary(path, x_range=None):
+    """The summary saved by RunningStats.save, with the per-element arrays cut to x_range
+
+    Returns:
+        dict: the arrays of RunningStats.summary and the extra attributes
+    """
+    with np.load(path) as data:
+        summary = {key: data[key] for key in data.files}
+
+    if x_range is not None:
+        for key in ("count", "mean", "std", "std_err", "m2", "histogram"):
+            if key in summary:
+                summary[key] = summary[key][:x_range]
+        if "quantiles" in summary:
+            summary["quantiles"] = summary["quantiles"][:, :x_range]
+    return summary
@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+
+"""Runs a parameter sweep of RLGlue experiments on a process pool.
+
+Every (configuration, run) cell is an independent task with a deterministic
+seed, so results do not depend on the order in which workers finish. Finished
+cells are checkpointed to disk, which lets an interrupted sweep resume where it
+stopped. Once every run of a configuration is done, its results are written as
+"{directory}/{name}_{file_type}.npy" arrays of shape (num_runs, ...), the layout
+the plot scripts already read. With store=True every finished cell is instead
+written straight into a rlglue.results.ResultsStore in directory, which is also
+what lets the sweep resume. With summaries=True, the runs of every completed
+configuration are also aggregated by rlglue.stats.RunningStats into
+"{directory}/{name}_{file_type}_summary.npz" (mean, std and standard error
+over runs), the summaries the plot scripts read first. With keep_runs=False as
+well, only the summaries are kept: every cell returns RunningStats (filled by
+the experiment as it runs, or built from its arrays), and the finished cells
+of a configuration are merged into one checkpointed RunningStats per file type.
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from rlglue.results import ResultsStore
+from rlglue.stats import RunningStats
+from rlglue.rl_glue import RLGlue
+
+
+def parameter_grid(agent_parameters):
+    """Expands a dict of parameter values into every combination.
+
+    Args:
+        agent_parameters (dict): values that are lists, tuples or 1D Numpy
+            arrays are swept over; any other value is shared by every
+            configuration
+
+    Returns:
+        list: one agent_info dict per configuration, in the same nesting order
+            as the keys of agent_parameters
+    """
+    swept = [key for key, value in agent_parameters.items()
+             if isinstance(value, (list, tuple, np.ndarray))]
+    fixed = {key: value for key, value in agent_parameters.items() if key not in swept}
+
+    configs = []
+    for values in itertools.product(*(agent_parameters[key] for key in swept)):
+        config = dict(fixed)
+        config.update(zip(swept, values))
+        configs.append(config)
+
+    return configs
+
+
+def run_episodes(rl_glue, experiment_parameters):
+    """Default experiment: runs "num_episodes" episodes of at most "max_steps" steps.
+
+    Returns:
+        dict: the "episode_return" and "episode_steps" of every episode
+    """
+    num_episodes = experiment_parameters["num_episodes"]
+    max_steps = experiment_parameters.get("max_steps", 0)
+
+    episode_return = np.zeros(num_episodes)
+    episode_steps = np.zeros(num_episodes, dtype=int)
+    for episode in range(num_episodes):
+        rl_glue.rl_episode(max_steps)
+        episode_return[episode] = rl_glue.rl_return()
+        episode_steps[episode] = rl_glue.rl_num_steps()
+
+    return {"episode_return": episode_return, "episode_steps": episode_steps}
+
+
+def _run_cell(env_class, agent_class, agent_info, env_info, experiment, experiment_parameters, keep_runs=True):
+    """Runs one (configuration, run) cell. Executed inside a worker process.
+
+    Returns:
+        dict: {file_type: array} of the run, or with keep_runs=False
+            {file_type: RunningStats} of the run alone
+    """
+    rl_glue = RLGlue(env_class, agent_class)
+    rl_glue.rl_init(agent_info, env_info)
+    results = experiment(rl_glue, experiment_parameters)
+    rl_glue.rl_cleanup()
+
+    if keep_runs:
+        for file_type, data in results.items():
+            if isinstance(data, RunningStats):
+                raise ValueError("The {} RunningStats of the experiment need a sweep with "
+                                 "keep_runs=False".format(file_type))
+        return {file_type: np.asarray(data) for file_type, data in results.items()}
+
+    cell_stats = {}
+    for file_type, data in results.items():
+        if isinstance(data, RunningStats):
+            cell_stats[file_type] = data
+        else:
+            cell_stats[file_type] = RunningStats(np.shape(data))
+            cell_stats[file_type].add(data)
+    return cell_stats
+
+
+def _save_atomic(path, save, data):
+    """Writes through a temporary file so an interrupted write never leaves a partial file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        save(f, data)
+    os.replace(tmp_path, path)
+
+
+def _save_npz(f, data):
+    np.savez(f, **data)
+
+
+def _save_stats_checkpoint(f, data):
+    runs, stats = data
+    states = {"{}/{}".format(file_type, key): value
+              for file_type, file_stats in stats.items() for key, value in file_stats.state().items()}
+    np.savez(f, runs=np.asarray(runs, dtype=np.int64), **states)
+
+
+def _load_stats_checkpoint(path):
+    """The runs merged so far and their {file_type: RunningStats}, from _save_stats_checkpoint."""
+    with np.load(path) as data:
+        states = {}
+        for key in data.files:
+            if key != "runs":
+                file_type, name = key.rsplit("/", 1)
+                states.setdefault(file_type, {})[name] = data[key]
+        runs = data["runs"].tolist()
+
+    return runs, {file_type: RunningStats.from_state(state) for file_type, state in states.items()}
+
+
+class ParameterSweep:
+    """ParameterSweep class
+
+    args:
+        env_class: the Environment class
+        agent_class: the Agent class
+        agent_parameters (dict): the grid of agent parameters, see parameter_grid
+        experiment_parameters (dict): must contain "num_runs"; passed to experiment
+        name_format (string): formatted with each configuration to name its
+            result files, e.g. "TD_agent_step_size_{step_size}"
+        experiment (callable): experiment(rl_glue, experiment_parameters) runs
+            one initialized RLGlue and returns a dict of {file_type: array}
+        environment_parameters (dict): env_info shared by every cell
+        directory (string): where result files are written
+        seed_offset (int): run r (counting from 1) is seeded with seed_offset + r
+        store (bool): write the results into one ResultsStore (one
+            memory-mapped array per file type, indexed by the configurations)
+            instead of checkpoints and per-configuration .npy files. Its
+            attributes hold the "names" of the configurations, the
+            "seed_offset" and the scalar "experiment_parameters"
+        summaries (bool): save a RunningStats summary of every file type of
+            a configuration once all its runs are done, with the scalar
+            experiment_parameters (e.g. "num_episodes") as attributes
+        keep_runs (bool): False (with summaries=True and no store) keeps
+            only the summaries: the experiment may then return RunningStats
+            it fed while running, and the runs are merged as they finish,
+            so the summaries can differ from those of keep_runs=True by
+            rounding errors
+    """
+
+    def __init__(self, env_class, agent_class, agent_parameters, experiment_parameters,
+                 name_format, experiment=run_episodes, environment_parameters={},
+                 directory="results", seed_offset=0, store=False, summaries=False, keep_runs=True):
+        self.env_class = env_class
+        self.agent_class = agent_class
+        self.configs = parameter_grid(agent_parameters)
+        self.experiment_parameters = experiment_parameters
+        self.name_format = name_format
+        self.experiment = experiment
+        self.environment_parameters = environment_parameters
+        self.directory = directory
+        self.checkpoint_directory = os.path.join(directory, "checkpoints")
+        self.seed_offset = seed_offset
+        self.store = None
+        self.summaries = summaries
+        self.keep_runs = keep_runs
+        if not keep_runs and (store or not summaries):
+            raise ValueError("keep_runs=False needs summaries=True and no store")
+        # the runs merged so far and their {file_type: RunningStats} of every configuration (keep_runs=False)
+        self.merged = {}
+
+        self.num_runs = experiment_parameters["num_runs"]
+        self.names = [name_format.format(**config) for config in self.configs]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("name_format must give every configuration a different name")
+
+        if store:
+            self.store = ResultsStore(directory, self.configs, self.num_runs,
+                                      attributes={"names": self.names, "seed_offset": seed_offset,
+                                                  "experiment_parameters": self.scalar_parameters()})
+
+    def scalar_parameters(self):
+        """The experiment_parameters with a number value (e.g. "num_episodes"), kept with the results."""
+        return {key: value for key, value in self.experiment_parameters.items()
+                if isinstance(value, (bool, int, float, np.number))}
+
+    def seed(self, run):
+        """The seed of the given run (counting from 1), shared by all configurations."""
+        return self.seed_offset + run
+
+    def checkpoint_path(self, name, run):
+        return os.path.join(self.checkpoint_directory, "{}_run_{}.npz".format(name, run))
+
+    def result_path(self, name, file_type):
+        return os.path.join(self.directory, "{}_{}.npy".format(name, file_type))
+
+    def summary_path(self, name, file_type):
+        return os.path.join(self.directory, "{}_{}_summary.npz".format(name, file_type))
+
+    def stats_checkpoint_path(self, name):
+        return os.path.join(self.checkpoint_directory, "{}_stats.npz".format(name))
+
+    def pending_cells(self):
+        """The (config index, run) cells that do not have a checkpoint yet."""
+        if self.store is not None:
+            return [(i, run) for i in range(len(self.configs))
+                    for run in range(1, self.num_runs + 1) if not self.store.completed[i, run - 1]]
+
+        if not self.keep_runs:
+            return [(i, run) for i in range(len(self.configs))
+                    for run in range(1, self.num_runs + 1) if run not in self._merged(i)[0]]
+
+        return [(i, run) for i, name in enumerate(self.names)
+                for run in range(1, self.num_runs + 1)
+                if not os.path.exists(self.checkpoint_path(name, run))]
+
+    def run(self, max_workers=None):
+        """Runs every pending cell and writes the results of completed configurations
+
+        Args:
+            max_workers (int): the number of worker processes (None for one
+                per CPU, 0 to run every cell in this process)
+
+        Returns:
+            list: the names of all configurations
+        """
+        pending = self.pending_cells()
+        remaining = [0] * len(self.configs)
+        for i, _ in pending:
+            remaining[i] += 1
+
+        if self.store is None:
+            os.makedirs(self.checkpoint_directory, exist_ok=True)
+        # configurations whose runs were all done by an earlier, interrupted sweep
+        for i, count in enumerate(remaining):
+            if count == 0:
+                self._complete(i)
+
+        if max_workers == 0:
+            for i, run in pending:
+                self._finish_cell(i, run, _run_cell(*self._cell_args(i, run)), remaining)
+            return self.names
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_run_cell, *self._cell_args(i, run)): (i, run) for i, run in pending}
+            for future in as_completed(futures):
+                i, run = futures[future]
+                self._finish_cell(i, run, future.result(), remaining)
+
+        return self.names
+
+    def _cell_args(self, i, run):
+        seed = self.seed(run)
+        agent_info = dict(self.configs[i], seed=seed)
+        env_info = dict(self.environment_parameters, seed=seed)
+
+        return (self.env_class, self.agent_class, agent_info, env_info,
+                self.experiment, self.experiment_parameters, self.keep_runs)
+
+    def _merged(self, i):
+        """The runs merged so far and their {file_type: RunningStats} of configuration i (keep_runs=False)."""
+        if i not in self.merged:
+            path = self.stats_checkpoint_path(self.names[i])
+            self.merged[i] = _load_stats_checkpoint(path) if os.path.exists(path) else ([], {})
+        return self.merged[i]
+
+    def _finish_cell(self, i, run, results, remaining):
+        if self.store is not None:
+            self.store.write(i, run - 1, results)
+        elif not self.keep_runs:
+            runs, stats = self._merged(i)
+            for file_type, cell_stats in results.items():
+                if file_type in stats:
+                    stats[file_type].merge(cell_stats)
+                else:
+                    stats[file_type] = cell_stats
+            runs.append(run)
+            _save_atomic(self.stats_checkpoint_path(self.names[i]), _save_stats_checkpoint, (runs, stats))
+        else:
+            _save_atomic(self.checkpoint_path(self.names[i], run), _save_npz, results)
+
+        remaining[i] -= 1
+        if remaining[i] == 0:
+            self._complete(i)
+
+    def _complete(self, i):
+        """Writes the results and summaries of configuration i, whose runs are all done."""
+        if self.store is None and self.keep_runs:
+            self._write_results(i)
+        if self.summaries:
+            self._write_summaries(i)
+
+    def _run_results(self, i, run):
+        """The {file_type: array} results of one finished cell."""
+        if self.store is not None:
+            return {file_type: self.store.array(file_type)[i, run - 1] for file_type in self.store.metrics()}
+
+        with np.load(self.checkpoint_path(self.names[i], run)) as cell:
+            return {file_type: cell[file_type] for file_type in cell.files}
+
+    def _write_results(self, i):
+        """Stacks the checkpointed runs of configuration i into one array per file type."""
+        runs = [self._run_results(i, run) for run in range(1, self.num_runs + 1)]
+
+        for file_type in runs[0]:
+            data = np.stack([cell[file_type] for cell in runs])
+            _save_atomic(self.result_path(self.names[i], file_type), np.save, data)
+
+    def _write_summaries(self, i):
+        """Saves the RunningStats of configuration i: the merged ones, or the runs added one at a time in run order."""
+        if not self.keep_runs:
+            stats = self._merged(i)[1]
+        else:
+            stats = {}
+            for run in range(1, self.num_runs + 1):
+                for file_type, data in self._run_results(i, run).items():
+                    if file_type not in stats:
+                        stats[file_type] = RunningStats(np.shape(data))
+                    stats[file_type].add(data)
+
+        attributes = self.scalar_parameters()
+        for file_type, file_stats in stats.items():
+            _save_atomic(self.summary_path(self.names[i], file_type),
+                         lambda f, data: data.save(f, **attributes), file_stats)
+
+
+def run_sweep(env_class, agent_class, agent_parameters, experiment_parameters, name_format,
+              max_workers=None, **kwargs):
+    """Builds a ParameterSweep and runs it. See ParameterSweep for the arguments.
+
+    Returns:
+        list: the names of all configurations
+    """
+    sweep = ParameterSweep(env_class, agent_class, agent_parameters, experiment_parameters,
+                           name_format, **kwargs)
+    return sweep.run(max_workers)
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from rlglue.benchmark import load_module
+
+mountaincar_env = load_module("Function Approximation and Control", "mountaincar_env")
+pendulum_env = load_module("Average Reward Softmax Actor-Critic", "pendulum_env")
+
+
+@pytest.mark.parametrize("auto_reset", [False, True])
+def test_batch_mountain_car_matches_the_scalar_cars(auto_reset):
+    num_runs = 16
+    batch = mountaincar_env.BatchEnvironment()
+    batch.env_init({"num_runs": num_runs, "seed": 0, "auto_reset": auto_reset})
+    states = batch.env_start_batch()
+
+    # the scalar cars start where the batch ones do
+    cars = [mountaincar_env.Environment() for _ in range(num_runs)]
+    for car, state in zip(cars, states):
+        car.env_init()
+        car.current_state = state.copy()
+
+    # pushing in the direction of the velocity reaches the goal within a few hundred steps
+    rand_generator = np.random.RandomState(1)
+    num_terminals = 0
+    for _ in range(1000):
+        actions = np.where(batch.current_states[:, 1] >= 0, 2, 0)
+        actions[rand_generator.rand(num_runs) < 0.2] = 1
+        rewards, observations, terminals = batch.env_step_batch(actions)
+
+        for i, car in enumerate(cars):
+            reward, state, terminal = car.env_step(actions[i])
+            assert (rewards[i], terminals[i]) == (reward, terminal)
+            if not (auto_reset and terminal):
+                np.testing.assert_array_equal(observations[i], state)
+
+        num_terminals += terminals.sum()
+        if not auto_reset:
+            batch.env_start_batch(terminals)
+        for i in np.flatnonzero(terminals):
+            if auto_reset:
+                # the observation of a car that reached the goal is its new start, at rest
+                np.testing.assert_array_equal(observations[i], batch.current_states[i])
+            assert batch.current_states[i, 1] == 0.0 and -0.6 <= batch.current_states[i, 0] < -0.4
+            cars[i].current_state = batch.current_states[i].copy()
+    assert num_terminals > num_runs
+
+
+def test_batch_pendulum_matches_the_scalar_pendulums():
+    num_runs = 16
+    batch = pendulum_env.BatchPendulumEnvironment()
+    batch.env_init({"num_runs": num_runs})
+    states = batch.env_start_batch()
+
+    pendulums = [pendulum_env.PendulumEnvironment() for _ in range(num_runs)]
+    for i, pendulum in enumerate(pendulums):
+        pendulum.env_init({"seed": i})
+        np.testing.assert_array_equal(pendulum.env_start(), states[i])
+
+    # torques mostly along the angular velocity, which swings the pendulums up until they spin
+    # too fast and reset, and otherwise random
+    rand_generator = np.random.RandomState(0)
+    num_resets = 0
+    for _ in range(2000):
+        actions = np.where(batch.current_states[:, 1] >= 0, 2, 0)
+        random_actions = rand_generator.rand(num_runs) < 0.3
+        actions[random_actions] = rand_generator.randint(3, size=random_actions.sum())
+        rewards, observations, terminals = batch.env_step_batch(actions)
+        assert not terminals.any()
+
+        for i, pendulum in enumerate(pendulums):
+            reward, state, terminal = pendulum.env_step(actions[i])
+            assert rewards[i] == reward and not terminal
+            np.testing.assert_array_equal(observations[i], state)
+        num_resets += np.sum(np.all(observations == [-np.pi, 0.], axis=1))
+    assert num_resets > 0
@@ -0,0 +1,104 @@
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+from rlglue.benchmark import load_module
+
+Environment = load_module("Q-Learning and Expected SARSA", "cliffworld_env").Environment
+
+
+class LoopCliffWorld:
+    """The step logic of the cliff world before its moves were compiled into tables."""
+
+    rows = 4
+    cols = 12
+    start = [0, 0]
+
+    def env_start(self):
+        self.current_state = self.start
+        return self.observation(self.current_state)
+
+    def env_step(self, action):
+        new_state = deepcopy(self.current_state)
+
+        if action == 0: #right
+            new_state[1] = min(new_state[1]+1, self.cols-1)
+        elif action == 1: #down
+            new_state[0] = max(new_state[0]-1, 0)
+        elif action == 2: #left
+            new_state[1] = max(new_state[1]-1, 0)
+        elif action == 3: #up
+            new_state[0] = min(new_state[0]+1, self.rows-1)
+        else:
+            raise Exception("Invalid action.")
+        self.current_state = new_state
+
+        reward = -1.0
+        is_terminal = False
+        if self.current_state[0] == 0 and self.current_state[1] > 0:
+            if self.current_state[1] < self.cols - 1:
+                reward = -100.0
+                self.current_state = deepcopy(self.start)
+            else:
+                is_terminal = True
+
+        return (reward, self.observation(self.current_state), is_terminal)
+
+    def observation(self, state):
+        return state[0] * self.cols + state[1]
+
+
+# mostly right and down, so the walks fall off the cliff and reach the goal
+ACTIONS = np.random.RandomState(0).choice(4, size=20000, p=[0.4, 0.3, 0.1, 0.2])
+
+
+def test_tables_match_the_step_loop():
+    environment, loop = Environment(), LoopCliffWorld()
+    environment.env_init({})
+
+    assert environment.env_start() == loop.env_start()
+    outcomes = []
+    for action in ACTIONS.tolist():
+        outcomes.append(loop.env_step(action))
+        assert environment.env_step(action) == outcomes[-1]
+        if outcomes[-1][2]:
+            assert environment.env_start() == loop.env_start()
+
+    rewards, _, terminals = zip(*outcomes)
+    assert rewards.count(-100.0) > 10 and sum(terminals) > 10
+
+
+def test_batch_step_matches_the_step_loop():
+    environment = Environment()
+    environment.env_init({"num_runs": 8})
+    loops = [LoopCliffWorld() for _ in range(8)]
+
+    states = environment.env_start_batch(np.ones(8, dtype=bool))
+    assert states.tolist() == [loop.env_start() for loop in loops]
+    for step_actions in ACTIONS.reshape(-1, 8):
+        rewards, states, terminals = environment.env_step_batch(step_actions)
+        expected = [loop.env_step(action) for loop, action in zip(loops, step_actions.tolist())]
+        assert list(zip(rewards.tolist(), states.tolist(), terminals.tolist())) == expected
+
+        environment.env_start_batch(terminals)
+        for loop, terminal in zip(loops, terminals):
+            if terminal:
+                loop.env_start()
+
+
+@pytest.mark.parametrize("action", [4, -1, 1.5, None])
+def test_invalid_actions_are_rejected(action):
+    environment = Environment()
+    environment.env_init({"num_runs": 2})
+    environment.env_start()
+    environment.env_start_batch(np.ones(2, dtype=bool))
+
+    with pytest.raises(Exception, match="Invalid action"):
+        environment.env_step(action)
+    with pytest.raises(Exception):
+        environment.env_step_batch(np.array([0, action]))
+
+    # float actions with an integer value are taken as before: 3.0 is up
+    assert environment.env_step(3.0) == (-1.0, 12, False)
+    assert environment.env_step_batch(np.array([3.0, 2.0]))[1].tolist() == [12, 0]
@@ -0,0 +1,214 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from rlglue.benchmark import load_module
+from rlglue.rl_glue import RLGlue
+
+dyna_model = load_module("Dyna Q", "dyna_model")
+
+NUM_STATES = 12
+NUM_ACTIONS = 4
+
+
+def random_transitions(rand_generator, num_transitions=60):
+    """Random (s, a, s', r) transitions over few states, so pairs are revisited with new outcomes."""
+    return [(rand_generator.randint(NUM_STATES), rand_generator.randint(NUM_ACTIONS),
+             rand_generator.randint(-1, NUM_STATES), rand_generator.randn())
+            for _ in range(num_transitions)]
+
+
+def dict_model(transitions):
+    """The dictionary-of-dictionaries model the agents used before TabularModel."""
+    model = {}
+    for s, a, next_s, r in transitions:
+        model.setdefault(s, {})[a] = (next_s, r)
+    return model
+
+
+@pytest.fixture(params=[0, 1, 2])
+def transitions(request):
+    return random_transitions(np.random.RandomState(request.param))
+
+
+def test_update_matches_dict_model(transitions):
+    model = dyna_model.TabularModel(NUM_STATES, NUM_ACTIONS)
+    for i, transition in enumerate(transitions):
+        model.update(*transition)
+        expected = dict_model(transitions[:i + 1])
+        # as_dict keeps the first-visit order of the states and of their actions
+        assert list(model.as_dict().items()) == [(s, expected[s]) for s in expected]
+        assert [list(actions) for actions in model.as_dict().values()] == [list(actions) for actions in expected.values()]
+
+    observed = [(s, a) for s in expected for a in expected[s]]
+    assert model.num_pairs == len(observed)
+    assert sorted(map(tuple, model.pairs[:model.num_pairs].tolist())) == sorted(observed)
+    assert [model.pair_index[s, a] for s, a in map(tuple, model.pairs[:model.num_pairs].tolist())] \
+        == list(range(model.num_pairs))
+    assert model.observed.sum() == len(observed)
+    assert model.num_observed_states == len(expected)
+    assert model.num_observed_actions.tolist() == [len(expected.get(s, {})) for s in range(NUM_STATES)]
+
+
+def test_predecessors_follow_overwritten_outcomes(transitions):
+    model = dyna_model.TabularModel(NUM_STATES, NUM_ACTIONS)
+    for transition in transitions:
+        model.update(*transition)
+        expected = [set() for _ in range(NUM_STATES)]
+        for s, actions in model.as_dict().items():
+            for a, (next_s, _) in actions.items():
+                if next_s != dyna_model.TERMINAL:
+                    expected[next_s].add((s, a))
+        assert model.predecessors == expected
+
+
+def test_predecessors_of_a_changed_outcome():
+    model = dyna_model.TabularModel(3, 2)
+    model.update(0, 1, 2, 1.0)
+    model.update(1, 0, 2, 0.0)
+    assert model.predecessors[2] == {(0, 1), (1, 0)}
+    model.update(0, 1, dyna_model.TERMINAL, 5.0)
+    assert model.predecessors == [set(), set(), {(1, 0)}]
+    model.update(0, 1, 1, 5.0)
+    assert model.predecessors == [set(), {(0, 1)}, {(1, 0)}]
+    assert (model.next_state[0, 1], model.reward[0, 1]) == (1, 5.0)
+
+
+def test_sample_draws_like_the_dict_model(transitions):
+    model = dyna_model.TabularModel(NUM_STATES, NUM_ACTIONS)
+    for transition in transitions:
+        model.update(*transition)
+    expected = dict_model(transitions)
+
+    rand_generator, dict_generator = np.random.RandomState(3), np.random.RandomState(3)
+    for _ in range(500):
+        s = dict_generator.choice(list(expected.keys()))
+        a = dict_generator.choice(list(expected[s].keys()))
+        assert model.sample(rand_generator) == (s, a)
+
+
+@pytest.mark.parametrize("sampling", ["state_then_action", "pair"])
+def test_samples_are_observed_pairs(sampling):
+    model = dyna_model.TabularModel(NUM_STATES, NUM_ACTIONS)
+    # a few pairs of a few states only, so unobserved pairs would be drawn if sampling leaked
+    for s, a, next_s, r in [(3, 1, 4, 0.0), (3, 2, -1, 1.0), (7, 0, 3, 0.5), (10, 3, 10, 0.0), (3, 1, 7, 2.0)]:
+        model.update(s, a, next_s, r)
+    observed = {(3, 1), (3, 2), (7, 0), (10, 3)}
+
+    rand_generator = np.random.RandomState(0)
+    sample = model.sample if sampling == "state_then_action" else model.sample_pair
+    drawn = [tuple(map(int, sample(rand_generator))) for _ in range(2000)]
+    assert set(drawn) == observed
+    states, actions = model.sample_batch(rand_generator, 2000, sampling)
+    assert set(zip(states.tolist(), actions.tolist())) == observed
+
+    counts = {pair: drawn.count(pair) / len(drawn) for pair in observed}
+    if sampling == "pair":
+        expected = {pair: 1 / 4 for pair in observed}
+    else:
+        # a state uniformly, then one of its actions uniformly
+        expected = {(3, 1): 1 / 6, (3, 2): 1 / 6, (7, 0): 1 / 3, (10, 3): 1 / 3}
+    for pair in observed:
+        assert counts[pair] == pytest.approx(expected[pair], abs=0.04)
+
+
+def check_heap(queue):
+    """Every queued item sits at its recorded position, below a parent with at least its priority."""
+    for position, item in enumerate(queue.heap):
+        assert queue.positions[item] == position
+        if position > 0:
+            assert queue.priorities[queue.heap[(position - 1) // 2]] >= queue.priorities[item]
+    assert sum(position != -1 for position in queue.positions) == len(queue.heap)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_priority_queue_pops_the_highest_priority(seed):
+    rand_generator = np.random.RandomState(seed)
+    size = 20
+    queue = dyna_model.PriorityQueue(size)
+    # the queued items and their priorities; pushing a queued item only ever raises its priority
+    expected = {}
+
+    for _ in range(400):
+        if expected and rand_generator.rand() < 0.3:
+            item, priority = queue.pop()
+            best = max(expected, key=expected.get)
+            assert (item, priority) == (best, expected.pop(best))
+        else:
+            item = rand_generator.randint(size)
+            priority = rand_generator.rand()
+            queue.push(item, priority)
+            expected[item] = max(expected.get(item, priority), priority)
+        check_heap(queue)
+        assert len(queue) == len(expected)
+        assert all((item in queue) == (item in expected) for item in range(size))
+
+    popped = [queue.pop() for _ in range(len(queue))]
+    assert popped == sorted(expected.items(), key=lambda pair: -pair[1])
+
+
+def test_priority_queue_increase_and_decrease():
+    queue = dyna_model.PriorityQueue(5)
+    for item, priority in enumerate([0.5, 0.1, 0.4, 0.3, 0.2]):
+        queue.push(item, priority)
+
+    queue.push(1, 0.9)  # raised to the top
+    queue.push(0, 0.05)  # a lower priority is ignored
+    queue.push(4, 0.45)
+    check_heap(queue)
+    assert [queue.pop() for _ in range(3)] == [(1, 0.9), (0, 0.5), (4, 0.45)]
+
+    # a popped item is queued again with its new priority, however low
+    queue.push(1, 0.01)
+    assert [queue.pop() for _ in range(len(queue))] == [(2, 0.4), (3, 0.3), (1, 0.01)]
+
+    queue.push(2, 1.0)
+    queue.push(3, 2.0)
+    queue.clear()
+    assert len(queue) == 0 and 2 not in queue and 3 not in queue
+    queue.push(2, 0.3)
+    assert queue.pop() == (2, 0.3)
+
+
+def prioritized_sweeping_agent(planning_steps, **agent_info):
+    agent_info = dict({"num_states": 54, "num_actions": 4, "epsilon": 0.1, "step_size": 0.5, "discount": 0.95,
+                       "planning_steps": planning_steps, "random_seed": 0, "planning_random_seed": 0}, **agent_info)
+    return agent_info, partial(load_module("Dyna Q", "DynaQAgent").PrioritizedSweepingAgent, agent_info)
+
+
+def test_prioritized_sweeping_propagates_backwards():
+    agent_info, agent_class = prioritized_sweeping_agent(10, num_states=4, step_size=0.5, discount=0.9)
+    agent = agent_class()
+    agent.agent_init(agent_info)
+
+    # a corridor 0 -> 1 -> 2 -> 3 -> end, with a reward of 1 at the end only
+    actions = [agent.agent_start(0)]
+    for state in (1, 2, 3):
+        actions.append(agent.agent_step(0.0, state))
+    assert agent.num_planning_updates == 0 and not agent.queue
+    agent.agent_end(1.0)
+
+    # one sweep from the end back to the start, one update per transition, and then an empty queue
+    assert agent.num_planning_updates == 4 and not agent.queue
+    expected = 0.5
+    for state in (3, 2, 1, 0):
+        assert agent.q_values[state, actions[state]] == pytest.approx(expected)
+        expected *= 0.5 * 0.9
+    assert np.count_nonzero(agent.q_values) == 4
+
+
+def test_prioritized_sweeping_needs_fewer_planning_updates_than_dyna_q():
+    maze_env = load_module("Dyna Q", "maze_env")
+    agent_info, agent_class = prioritized_sweeping_agent(5)
+    rl_glue = RLGlue(maze_env.MazeEnvironment, agent_class)
+    rl_glue.rl_init(agent_info, {})
+    steps = []
+    for _ in range(30):
+        rl_glue.rl_episode(0)
+        steps.append(rl_glue.rl_num_steps())
+
+    # the shortest path of the maze takes 14 steps
+    assert np.mean(steps[-10:]) < 20
+    # Dyna-Q spends planning_steps updates on every step
+    assert rl_glue.agent.num_planning_updates < 0.6 * 5 * sum(steps)
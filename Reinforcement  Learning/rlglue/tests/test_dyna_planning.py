@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from rlglue.benchmark import load_module
+
+dyna_model = load_module("Dyna Q", "dyna_model")
+
+
+def random_model(rand_generator, num_states=12, num_actions=4, num_transitions=40):
+    model = dyna_model.TabularModel(num_states, num_actions)
+    for _ in range(num_transitions):
+        next_state = rand_generator.randint(-1, num_states)
+        model.update(rand_generator.randint(num_states), rand_generator.randint(num_actions),
+                     next_state, rand_generator.randn())
+    return model
+
+
+def loop_planning(q_values, model, states, actions, step_size, gamma, bonus):
+    """The planning loop of DynaQAgent, on given samples."""
+    for s, a in zip(states, actions):
+        next_s = model.next_state[s, a]
+        reward = model.reward[s, a] + bonus
+        q_values[s, a] += step_size * (reward + gamma * (np.max(q_values[next_s, :]) if next_s != -1 else 0)
+                                       - q_values[s, a])
+
+
+@pytest.mark.parametrize("sampling", ["state_then_action", "pair"])
+@pytest.mark.parametrize("dyna_q_plus", [False, True])
+def test_sequential_planning_matches_the_loop(sampling, dyna_q_plus):
+    rand_generator = np.random.RandomState(0)
+    model = random_model(rand_generator)
+    q_values = rand_generator.randn(model.num_states, model.num_actions)
+    states, actions = model.sample_batch(rand_generator, 200, sampling)
+    # the Dyna-Q+ bonus kappa * sqrt(tau) of the last real transition
+    bonus = 0.001 * np.sqrt(37) if dyna_q_plus else 0.0
+
+    expected = q_values.copy()
+    loop_planning(expected, model, states, actions, 0.125, 0.95, bonus)
+    dyna_model.batch_planning_update(q_values, model, states, actions, 0.125, 0.95, bonus, mode="sequential")
+
+    np.testing.assert_allclose(q_values, expected, rtol=0, atol=1e-12)
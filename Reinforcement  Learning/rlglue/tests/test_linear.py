@@ -0,0 +1,228 @@
+import numpy as np
+import pytest
+
+from rlglue.benchmark import load_module
+from rlglue.linear import SparseLinear
+from rlglue.utils import argmax
+
+sarsa_agent = load_module("Function Approximation and Control", "sarsa_agent")
+actor_critic_agent = load_module("Average Reward Softmax Actor-Critic", "actor_critic_agent")
+
+NUM_FEATURES = 64
+NUM_TILINGS = 8
+
+
+def random_tiles(rand_generator, size):
+    """size sets of active tiles, drawn from few features so that the sets overlap."""
+    return [rand_generator.choice(NUM_FEATURES, NUM_TILINGS, replace=False) for _ in range(size)]
+
+
+class FixedTiles:
+    """A tile coder whose "states" are already the active tiles."""
+
+    def get_tiles(self, state):
+        return np.asarray(state)
+
+
+def test_values_and_updates_match_dense_weights():
+    rand_generator = np.random.RandomState(0)
+    q = SparseLinear(NUM_FEATURES, 3, initial_weights=0.5)
+    w = np.ones((3, NUM_FEATURES)) * 0.5
+
+    for tiles in random_tiles(rand_generator, 50):
+        np.testing.assert_allclose(q.values(tiles), [sum(w[a][tiles]) for a in range(3)], rtol=1e-12)
+        output = rand_generator.randint(3)
+        assert q.value(tiles, output) == pytest.approx(sum(w[output][tiles]), rel=1e-12)
+
+        steps = rand_generator.randn(3)
+        q.update(tiles, steps)
+        for a in range(3):
+            w[a][tiles] += steps[a]
+
+        target = rand_generator.randn()
+        delta = target - sum(w[output][tiles])
+        assert q.td_update(tiles, target, 0.1, output) == pytest.approx(delta, rel=1e-9)
+        w[output][tiles] += 0.1 * delta
+
+        q.update(tiles, -0.05, output=output)
+        w[output][tiles] += -0.05
+        np.testing.assert_allclose(q.weights, w, rtol=1e-12, atol=1e-12)
+
+    batch = np.array(random_tiles(rand_generator, 5))
+    np.testing.assert_allclose(q.values(batch), [[sum(w[a][tiles]) for a in range(3)] for tiles in batch], rtol=1e-12)
+
+
+def test_repeated_feature_is_written_once():
+    q = SparseLinear(8, 2)
+    w = np.zeros((2, 8))
+    tiles = np.array([1, 3, 3, 5])
+
+    q.update(tiles, [1.0, 2.0])
+    for a, step in enumerate([1.0, 2.0]):
+        w[a][tiles] += step
+    q.td_update(tiles, 10.0, 0.5, output=1)
+    w[1][tiles] += 0.5 * (10.0 - w[1][tiles].sum())
+
+    np.testing.assert_array_equal(q.weights, w)
+
+
+@pytest.mark.parametrize("replacing_traces", [True, False])
+def test_sparse_traces_match_dense_traces(replacing_traces):
+    rand_generator = np.random.RandomState(1)
+    gamma, trace_decay, step_size = 0.9, 0.8, 0.05
+    # trace_threshold=0 keeps every trace, as the dense traces do
+    q = SparseLinear(NUM_FEATURES, 3, trace_decay=trace_decay, replacing_traces=replacing_traces,
+                     trace_threshold=0)
+    w = np.zeros((3, NUM_FEATURES))
+    z = np.zeros((3, NUM_FEATURES))
+
+    for tiles in random_tiles(rand_generator, 60):
+        output = rand_generator.randint(3)
+        q.update_traces(tiles, gamma, output)
+        z *= gamma * trace_decay
+        if replacing_traces:
+            z[output][tiles] = 1.0
+        else:
+            z[output][tiles] += 1.0
+
+        delta = rand_generator.randn() - sum(w[output][tiles])
+        assert q.value(tiles, output) == pytest.approx(sum(w[output][tiles]), rel=1e-12, abs=1e-12)
+        q.traced_update(step_size * delta)
+        w += step_size * delta * z
+
+        dense_traces = np.zeros(3 * NUM_FEATURES)
+        dense_traces[q.trace_indices] = q.trace_values
+        np.testing.assert_allclose(dense_traces.reshape(3, NUM_FEATURES), z, rtol=1e-12, atol=1e-15)
+        np.testing.assert_allclose(q.weights, w, rtol=1e-12, atol=1e-12)
+
+    q.reset_traces()
+    assert len(q.trace_indices) == 0
+
+
+class LoopSarsaAgent:
+    """The Sarsa agent of the notebook, with its dense (num_actions, iht_size) weights, on given tiles."""
+
+    def __init__(self, agent_info):
+        self.epsilon = agent_info["epsilon"]
+        self.gamma = agent_info["gamma"]
+        self.alpha = agent_info["alpha"] / agent_info["num_tilings"]
+        self.num_actions = agent_info["num_actions"]
+        self.w = np.ones((self.num_actions, agent_info["iht_size"])) * agent_info["initial_weights"]
+
+    def select_action(self, tiles):
+        action_values = []
+        for action_value in self.w:
+            action_values.append(sum(action_value[tiles]))
+
+        if np.random.random() < self.epsilon:
+            chosen_action = np.random.choice(self.num_actions)
+        else:
+            chosen_action = argmax(action_values)
+
+        return chosen_action, action_values[chosen_action]
+
+    def agent_start(self, active_tiles):
+        self.last_action, _ = self.select_action(active_tiles)
+        self.previous_tiles = np.copy(active_tiles)
+        return self.last_action
+
+    def agent_step(self, reward, active_tiles):
+        current_action, action_value = self.select_action(active_tiles)
+        delta = reward + self.gamma * action_value - sum(self.w[self.last_action][self.previous_tiles])
+        self.w[self.last_action][self.previous_tiles] += self.alpha * delta
+        self.last_action = current_action
+        self.previous_tiles = np.copy(active_tiles)
+        return self.last_action
+
+    def agent_end(self, reward):
+        delta = reward - sum(self.w[self.last_action][self.previous_tiles])
+        self.w[self.last_action][self.previous_tiles] += self.alpha * delta
+
+
+def test_sarsa_agent_matches_dense_loop():
+    agent_info = {"num_tilings": NUM_TILINGS, "num_tiles": 8, "iht_size": NUM_FEATURES, "epsilon": 0.1,
+                  "gamma": 0.9, "alpha": 0.5, "initial_weights": 0.0, "num_actions": 3}
+    agent = sarsa_agent.SarsaAgent()
+    agent.agent_init(agent_info)
+    agent.tc = FixedTiles()
+    expected = LoopSarsaAgent(agent_info)
+
+    rand_generator = np.random.RandomState(2)
+    for episode in range(20):
+        episode_tiles = random_tiles(rand_generator, rand_generator.randint(2, 15))
+        rewards = rand_generator.randn(len(episode_tiles))
+
+        actions = []
+        for module_agent in (agent, expected):
+            np.random.seed(episode)
+            actions.append([module_agent.agent_start(episode_tiles[0])])
+            for tiles, reward in zip(episode_tiles[1:], rewards):
+                actions[-1].append(module_agent.agent_step(reward, tiles))
+            module_agent.agent_end(rewards[-1])
+
+        assert actions[0] == actions[1]
+        np.testing.assert_allclose(agent.q.weights, expected.w, rtol=1e-12, atol=1e-12)
+    assert np.count_nonzero(expected.w) > NUM_FEATURES
+
+
+class LoopActorCriticAgent:
+    """The Actor-Critic agent of the notebook, with dense actor and critic weights, on given tiles."""
+
+    def __init__(self, agent_info):
+        self.rand_generator = np.random.RandomState(agent_info["seed"])
+        self.actor_step_size = agent_info["actor_step_size"] / agent_info["num_tilings"]
+        self.critic_step_size = agent_info["critic_step_size"] / agent_info["num_tilings"]
+        self.avg_reward_step_size = agent_info["avg_reward_step_size"]
+        self.actions = list(range(agent_info["num_actions"]))
+        self.avg_reward = 0.0
+        self.actor_w = np.zeros((len(self.actions), agent_info["iht_size"]))
+        self.critic_w = np.zeros(agent_info["iht_size"])
+
+    def agent_policy(self, active_tiles):
+        state_action_preferences = np.array([self.actor_w[action][active_tiles].sum()
+                                             for action in range(self.actor_w.shape[0])])
+        numerator = np.exp(state_action_preferences - np.max(state_action_preferences))
+        self.softmax_prob = numerator / numerator.sum()
+        return self.rand_generator.choice(self.actions, p=self.softmax_prob)
+
+    def agent_start(self, active_tiles):
+        self.last_action = self.agent_policy(active_tiles)
+        self.prev_tiles = np.copy(active_tiles)
+        return self.last_action
+
+    def agent_step(self, reward, active_tiles):
+        delta = reward - self.avg_reward + self.critic_w[active_tiles].sum() - self.critic_w[self.prev_tiles].sum()
+        self.avg_reward += self.avg_reward_step_size * delta
+        self.critic_w[self.prev_tiles] += self.critic_step_size * delta
+        for a in self.actions:
+            if a == self.last_action:
+                self.actor_w[a][self.prev_tiles] += self.actor_step_size * delta * (1 - self.softmax_prob[a])
+            else:
+                self.actor_w[a][self.prev_tiles] += self.actor_step_size * delta * (0 - self.softmax_prob[a])
+
+        self.last_action = self.agent_policy(active_tiles)
+        self.prev_tiles = active_tiles
+        return self.last_action
+
+
+def test_actor_critic_agent_matches_dense_loop():
+    agent_info = {"iht_size": NUM_FEATURES, "num_tilings": NUM_TILINGS, "num_tiles": 8, "actor_step_size": 0.25,
+                  "critic_step_size": 2.0, "avg_reward_step_size": 2 ** -6, "num_actions": 3, "seed": 3}
+    agent = actor_critic_agent.ActorCriticSoftmaxAgent()
+    agent.agent_init(agent_info)
+    agent.tc = FixedTiles()
+    expected = LoopActorCriticAgent(agent_info)
+
+    rand_generator = np.random.RandomState(4)
+    all_tiles = random_tiles(rand_generator, 300)
+    rewards = rand_generator.randn(len(all_tiles))
+
+    assert agent.agent_start(all_tiles[0]) == expected.agent_start(all_tiles[0])
+    for tiles, reward in zip(all_tiles[1:], rewards):
+        assert agent.agent_step(reward, tiles) == expected.agent_step(reward, tiles)
+        np.testing.assert_allclose(agent.softmax_prob, expected.softmax_prob, rtol=1e-10)
+
+    assert agent.agent_message('get avg reward') == pytest.approx(expected.avg_reward, rel=1e-10)
+    np.testing.assert_allclose(agent.critic_w, expected.critic_w, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(agent.actor_w, expected.actor_w, rtol=1e-10, atol=1e-12)
+    assert np.count_nonzero(expected.actor_w) > NUM_FEATURES
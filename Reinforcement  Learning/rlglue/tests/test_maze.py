@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from rlglue.benchmark import load_module
+
+maze_env = load_module("Dyna Q", "maze_env")
+
+
+class LoopMaze:
+    """The step logic of the maze environments before their moves were compiled into tables."""
+
+    def __init__(self, maze, change_at_n=None):
+        self.maze_dim = maze.maze_dim
+        self.obstacles = list(maze.obstacles)
+        self.start_state = maze.start_state
+        self.end_state = maze.end_state
+        self.change_at_n = change_at_n
+        self.timesteps = 0
+
+    def start(self):
+        self.current_state = self.start_state
+        return self.get_observation(self.current_state)
+
+    def out_of_bounds(self, row, col):
+        return row < 0 or row > self.maze_dim[0]-1 or col < 0 or col > self.maze_dim[1]-1
+
+    def is_obstacle(self, row, col):
+        return [row, col] in self.obstacles
+
+    def get_observation(self, state):
+        return state[0] * self.maze_dim[1] + state[1]
+
+    def step(self, action):
+        self.timesteps += 1
+        if self.timesteps == self.change_at_n:
+            self.obstacles = self.obstacles[:-1]
+
+        reward = 0.0
+        is_terminal = False
+
+        row = self.current_state[0]
+        col = self.current_state[1]
+
+        if action == 0: # up
+            if not (self.out_of_bounds(row-1, col) or self.is_obstacle(row-1, col)):
+                self.current_state = [row-1, col]
+        elif action == 1: # right
+            if not (self.out_of_bounds(row, col+1) or self.is_obstacle(row, col+1)):
+                self.current_state = [row, col+1]
+        elif action == 2: # down
+            if not (self.out_of_bounds(row+1, col) or self.is_obstacle(row+1, col)):
+                self.current_state = [row+1, col]
+        elif action == 3: # left
+            if not (self.out_of_bounds(row, col-1) or self.is_obstacle(row, col-1)):
+                self.current_state = [row, col-1]
+
+        if self.current_state == self.end_state:
+            reward = 1.0
+            is_terminal = True
+
+        return [reward, self.get_observation(self.current_state), is_terminal]
+
+
+def make_environments(shortcut):
+    environment = maze_env.ShortcutMazeEnvironment() if shortcut else maze_env.MazeEnvironment()
+    env_info = {"change_at_n": 3000} if shortcut else {}
+    loop = LoopMaze(environment, env_info.get("change_at_n"))
+    environment.env_init(env_info)
+    return environment, loop
+
+
+@pytest.mark.parametrize("shortcut", [False, True])
+def test_tables_match_the_step_loop(shortcut):
+    environment, loop = make_environments(shortcut)
+    actions = np.random.RandomState(0).randint(4, size=20000)
+
+    assert environment.env_start() == loop.start()
+    num_episodes = 0
+    for action in actions.tolist():
+        expected = loop.step(action)
+        assert environment.env_step(action) == expected
+        if expected[2]:
+            num_episodes += 1
+            assert environment.env_start() == loop.start()
+    assert num_episodes > 10
+
+
+@pytest.mark.parametrize("shortcut", [False, True])
+def test_batch_step_matches_the_step_loop(shortcut):
+    environment, _ = make_environments(shortcut)
+    environment.env_init({"change_at_n": 3000, "num_runs": 8} if shortcut else {"num_runs": 8})
+    loops = [make_environments(shortcut)[1] for _ in range(8)]
+    actions = np.random.RandomState(1).randint(4, size=(5000, 8))
+
+    states = environment.env_start_batch(np.ones(8, dtype=bool))
+    assert states.tolist() == [loop.start() for loop in loops]
+    for step_actions in actions:
+        rewards, states, terminals = environment.env_step_batch(step_actions)
+        expected = [loop.step(action) for loop, action in zip(loops, step_actions.tolist())]
+        assert [list(outcome) for outcome in zip(rewards.tolist(), states.tolist(), terminals.tolist())] == expected
+
+        environment.env_start_batch(terminals)
+        for loop, terminal in zip(loops, terminals):
+            if terminal:
+                loop.start()
+
+
+@pytest.mark.parametrize("action", [4, -1, 1.5, None])
+def test_invalid_actions_are_rejected(action):
+    environment, _ = make_environments(False)
+    environment.env_start()
+    with pytest.raises(ValueError):
+        environment.env_step(action)
+    with pytest.raises((ValueError, TypeError)):
+        environment.env_step_batch(np.array([0, action]))
+
+    # float actions with an integer value are taken as before
+    assert environment.env_step(1.0) == [0.0, 19, False]
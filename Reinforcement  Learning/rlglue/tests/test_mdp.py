@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from rlglue import mdp
+
+
+def test_policy_iteration_stops_after_max_iterations():
+    grid = mdp.grid_world_mdp((4, 4), terminals=[(0, 0), (3, 3)])
+    V, pi, report = mdp.policy_iteration(grid, 1.0)
+    assert report.converged
+
+    with pytest.raises(RuntimeError):
+        mdp.policy_iteration(grid, 1.0, max_iterations=report.iterations - 1)
+
+
+@pytest.mark.parametrize("method", ["synchronous", "gauss-seidel", "prioritized"])
+def test_dense_and_sparse_value_iteration_agree(method):
+    dense = mdp.grid_world_mdp((4, 4), terminals=[(0, 0), (3, 3)])
+    sparse = mdp.grid_world_mdp((4, 4), terminals=[(0, 0), (3, 3)], sparse=True)
+
+    V, pi, _ = mdp.value_iteration(dense, 1.0, 1e-10, method=method)
+    sparse_V, sparse_pi, _ = mdp.value_iteration(sparse, 1.0, 1e-10, method=method)
+    np.testing.assert_allclose(sparse_V, V, atol=1e-9)
+    np.testing.assert_array_equal(sparse_pi, pi)
+
+
+@pytest.mark.parametrize("method", ["synchronous", "gauss-seidel"])
+def test_dense_and_sparse_policy_evaluation_agree(method):
+    dense = mdp.grid_world_mdp((4, 4), terminals=[(0, 0), (3, 3)])
+    sparse = dense.to_sparse()
+    pi = np.ones((16, 4)) / 4
+
+    V, _ = mdp.policy_evaluation(dense, pi, 1.0, 1e-10, method=method)
+    sparse_V, _ = mdp.policy_evaluation(sparse, pi, 1.0, 1e-10, method=method)
+    np.testing.assert_allclose(sparse_V, V, atol=1e-8)
+    # the values of the equiprobable policy in Sutton and Barto's example 4.1
+    np.testing.assert_allclose(V[[1, 5, 6]], [-14, -18, -20], atol=1e-6)
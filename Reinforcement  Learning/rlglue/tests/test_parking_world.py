@@ -0,0 +1,151 @@
+import numpy as np
+import pytest
+
+from rlglue.benchmark import load_module
+
+# tools.py sets up its plots at import
+pytest.importorskip("matplotlib")
+pytest.importorskip("IPython")
+tools = load_module("Optimal Policies with Dynamic Programming", "tools")
+
+GAMMA = 0.9
+THETA = 1e-10
+
+
+class LoopParkingWorld:
+    """The per-state transitions of ParkingWorld before they were built into P and R tensors."""
+
+    def __init__(self, num_spaces=10, num_prices=4, price_factor=0.1, occupants_factor=1.0, null_factor=1 / 3):
+        self.num_spaces = num_spaces
+        self.num_prices = num_prices
+        self.occupants_factor = occupants_factor
+        self.price_factor = price_factor
+        self.null_factor = null_factor
+        self.S = list(range(num_spaces + 1))
+        self.A = list(range(num_prices))
+
+    def transitions(self, s, a):
+        return np.array([[r, self.p(s_, r, s, a)] for s_, r in self.support(s, a)])
+
+    def support(self, s, a):
+        return [(s_, self.reward(s, s_)) for s_ in self.S]
+
+    def p(self, s_, r, s, a):
+        if r != self.reward(s, s_):
+            return 0
+        center = (1 - self.price_factor) * s + self.price_factor * self.num_spaces * (1 - a / self.num_prices)
+        emphasis = np.exp(-abs(np.arange(2 * self.num_spaces) - center) / 5)
+        if s_ == self.num_spaces:
+            return sum(emphasis[s_:]) / sum(emphasis)
+        return emphasis[s_] / sum(emphasis)
+
+    def reward(self, s, s_):
+        return self.state_reward(s) + self.state_reward(s_)
+
+    def state_reward(self, s):
+        if s == self.num_spaces:
+            return self.null_factor * s * self.occupants_factor
+        return s * self.occupants_factor
+
+
+# the notebook's in-place solvers, which read the environment one transitions(s, a) at a time
+def loop_action_values(env, V, s, gamma):
+    q = np.zeros(len(env.A))
+    for a in env.A:
+        for next_state, (reward, probability) in enumerate(env.transitions(s, a)):
+            q[a] += probability * (reward + gamma * V[next_state])
+    return q
+
+
+def loop_evaluate_policy(env, pi, gamma, theta):
+    V = np.zeros(len(env.S))
+    delta = float('inf')
+    while delta > theta:
+        delta = 0
+        for s in env.S:
+            v = V[s]
+            V[s] = pi[s].dot(loop_action_values(env, V, s, gamma))
+            delta = max(delta, abs(v - V[s]))
+    return V
+
+
+def loop_greedy_policy(env, V, gamma):
+    pi = np.zeros((len(env.S), len(env.A)))
+    for s in env.S:
+        pi[s, np.argmax(loop_action_values(env, V, s, gamma))] = 1
+    return pi
+
+
+def loop_policy_iteration(env, gamma, theta):
+    pi = np.ones((len(env.S), len(env.A))) / len(env.A)
+    while True:
+        V = loop_evaluate_policy(env, pi, gamma, theta)
+        new_pi = loop_greedy_policy(env, V, gamma)
+        if np.array_equal(new_pi, pi):
+            return V, pi
+        pi = new_pi
+
+
+def loop_value_iteration(env, gamma, theta):
+    V = np.zeros(len(env.S))
+    while True:
+        delta = 0
+        for s in env.S:
+            v = V[s]
+            V[s] = np.max(loop_action_values(env, V, s, gamma))
+            delta = max(delta, abs(v - V[s]))
+        if delta < theta:
+            break
+    return V, loop_greedy_policy(env, V, gamma)
+
+
+@pytest.fixture(params=[{}, {"num_spaces": 5, "num_prices": 3}, {"num_spaces": 4, "num_prices": 2, "price_factor": 0.3}])
+def worlds(request):
+    return tools.ParkingWorld(**request.param), LoopParkingWorld(**request.param)
+
+
+def test_tensors_match_loop_transitions(worlds):
+    env, loop = worlds
+    assert env.S == loop.S and env.A == loop.A
+    for s in loop.S:
+        for a in loop.A:
+            expected = loop.transitions(s, a)
+            np.testing.assert_allclose(env.P[s, a], expected[:, 1], rtol=1e-12, atol=1e-15)
+            np.testing.assert_array_equal(env.R[s, a], expected[:, 0])
+            np.testing.assert_allclose(env.transitions(s, a), expected, rtol=1e-12, atol=1e-15)
+            for s_, r in loop.support(s, a):
+                assert env.p(s_, r, s, a) == pytest.approx(loop.p(s_, r, s, a), rel=1e-12, abs=1e-15)
+                assert env.p(s_, r + 1, s, a) == 0
+    np.testing.assert_allclose(env.P.sum(axis=2), 1.0)
+
+
+def test_evaluate_policy_matches_loop(worlds):
+    env, loop = worlds
+    rng = np.random.RandomState(0)
+    pi = rng.dirichlet(np.ones(len(loop.A)), size=len(loop.S))
+    expected = loop_evaluate_policy(loop, pi, GAMMA, THETA)
+    np.testing.assert_allclose(tools.evaluate_policy(env, pi, GAMMA, THETA), expected, atol=1e-6)
+    np.testing.assert_allclose(tools.evaluate_policy(env, pi, GAMMA, exact=True), expected, atol=1e-6)
+
+
+def test_greedy_policy_matches_loop(worlds):
+    env, loop = worlds
+    V = np.random.RandomState(1).uniform(0, 10, len(loop.S))
+    np.testing.assert_array_equal(tools.greedy_policy(env, V, GAMMA), loop_greedy_policy(loop, V, GAMMA))
+
+
+def test_policy_iteration_matches_loop(worlds):
+    env, loop = worlds
+    V_loop, pi_loop = loop_policy_iteration(loop, GAMMA, THETA)
+    for exact in (False, True):
+        V, pi = tools.policy_iteration(env, GAMMA, THETA, exact=exact)
+        np.testing.assert_allclose(V, V_loop, atol=1e-6)
+        np.testing.assert_array_equal(pi, pi_loop)
+
+
+def test_value_iteration_matches_loop(worlds):
+    env, loop = worlds
+    V_loop, pi_loop = loop_value_iteration(loop, GAMMA, THETA)
+    V, pi = tools.value_iteration(env, GAMMA, THETA)
+    np.testing.assert_allclose(V, V_loop, atol=1e-6)
+    np.testing.assert_array_equal(pi, pi_loop)
@@ -0,0 +1,30 @@
+import os
+
+import numpy as np
+import pytest
+
+from rlglue.benchmark import COURSE_DIRECTORY, load_module
+
+FOLDER = "TD with State Aggregation"
+evaluation = load_module(FOLDER, "rndmwalk_policy_evaluation")
+
+
+@pytest.mark.parametrize("method", ["solve", "sweeps", "sparse"])
+def test_values_match_the_shipped_true_values(method):
+    true_V = np.load(os.path.join(COURSE_DIRECTORY, FOLDER, "data", "true_V.npy"))
+    V = evaluation.compute_value_function(500, 100, method, cache_dir=None)
+    np.testing.assert_allclose(V, true_V, atol=2e-5)
+
+
+def test_cache_is_per_problem_and_method(tmp_path):
+    cache_dir = str(tmp_path)
+    solved = evaluation.compute_value_function(50, 10, "solve", cache_dir)
+    swept = evaluation.compute_value_function(50, 10, "sweeps", cache_dir)
+    assert sorted(os.listdir(cache_dir)) == ["true_V_50_10_solve.npy", "true_V_50_10_sweeps.npy"]
+
+    # a cache hit reads the file and does not write it again
+    path = os.path.join(cache_dir, "true_V_50_10_solve.npy")
+    os.utime(path, (0, 0))
+    np.testing.assert_array_equal(evaluation.compute_value_function(50, 10, "solve", cache_dir), solved)
+    assert os.path.getmtime(path) == 0
+    np.testing.assert_allclose(swept, solved, atol=1e-5)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from rlglue.results import ResultsStore, open_results
+from rlglue.sweep import ParameterSweep
+
+from test_stats import NoiseEnvironment, FixedActionAgent
+
+
+def test_store_reopens_with_written_runs(tmp_path):
+    configs = [{"step_size": 0.1}, {"step_size": 0.5}]
+    store = ResultsStore(str(tmp_path), configs, num_runs=3)
+    store.write(store.index(step_size=0.5), 1, {"total_return": np.arange(5.0)})
+
+    # the same table keeps the written runs, another one is refused
+    reopened = ResultsStore(str(tmp_path), configs, num_runs=3)
+    assert reopened.completed_runs(1).tolist() == [1]
+    with pytest.raises(ValueError):
+        ResultsStore(str(tmp_path), configs[:1], num_runs=3)
+
+    data = open_results(str(tmp_path)).get("total_return", x_range=3, step_size=0.5)
+    assert data.tolist() == [[0.0, 1.0, 2.0]]
+
+
+def test_sweep_store_resumes_and_names_configurations(tmp_path):
+    experiment_parameters = {"num_runs": 4, "num_episodes": 3}
+
+    def make_sweep():
+        return ParameterSweep(NoiseEnvironment, FixedActionAgent, {"action": [0, 1]}, experiment_parameters,
+                              "agent_{action}", directory=str(tmp_path), store=True)
+
+    # an interrupted sweep: only the first two runs of agent_1 were written
+    sweep = make_sweep()
+    for i, run in sweep.pending_cells()[4:6]:
+        sweep._finish_cell(i, run, {"episode_return": np.full(3, -1.0)}, [2] * 2)
+    assert len(sweep.pending_cells()) == 6
+
+    make_sweep().run(max_workers=0)
+    assert make_sweep().pending_cells() == []
+
+    store = open_results(str(tmp_path))
+    assert store.attributes["names"] == ["agent_0", "agent_1"]
+    assert store.attributes["experiment_parameters"] == experiment_parameters
+    returns = store.get("episode_return", name="agent_1")
+    assert returns.shape == (4, 3)
+    assert (returns[:2] == -1.0).all() and (returns[2:] != -1.0).all()
+    with pytest.raises(KeyError):
+        store.get("episode_return", name="agent_2")
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from rlglue.benchmark import load_module
+
+smoothing = load_module("MoonShot/Agent", "smoothing")
+
+
+def loop_smooth(data, k):
+    """The loop of plot_script.smooth before it used smoothing.moving_average."""
+    num_episodes = data.shape[1]
+    num_runs = data.shape[0]
+
+    smoothed_data = np.zeros((num_runs, num_episodes))
+
+    for i in range(num_episodes):
+        if i < k:
+            smoothed_data[:, i] = np.mean(data[:, :i+1], axis = 1)
+        else:
+            smoothed_data[:, i] = np.mean(data[:, i-k:i+1], axis = 1)
+
+    return smoothed_data
+
+
+# sum rewards of lunar lander episodes are in the hundreds, with a large offset
+DATA = np.random.RandomState(0).normal(-150, 80, size=(5, 700))
+
+
+@pytest.mark.parametrize("k", [0, 1, 10, 100, 699, 1000])
+def test_moving_average_matches_the_smooth_loop(k):
+    np.testing.assert_allclose(smoothing.moving_average(DATA, k), loop_smooth(DATA, k), rtol=1e-10, atol=1e-9)
+
+
+def test_incremental_smoother_matches_the_batch_functions():
+    average = smoothing.IncrementalSmoother(len(DATA), "moving_average", k=100)
+    exponential = smoothing.IncrementalSmoother(len(DATA), "exponential", alpha=0.05)
+    for values in DATA.T:
+        average.update(values)
+        exponential.update(values)
+
+    np.testing.assert_allclose(average.curves(), loop_smooth(DATA, 100), rtol=1e-10, atol=1e-9)
+    np.testing.assert_allclose(exponential.curves(), smoothing.exponential(DATA, 0.05), rtol=1e-10)
+
+
+def test_savitzky_golay_keeps_polynomials():
+    x = np.arange(50.0)
+    curves = np.stack([1 + 2 * x - 0.1 * x ** 2, 3 - x])
+    np.testing.assert_allclose(smoothing.savitzky_golay(curves, 11, order=2), curves, atol=1e-8)
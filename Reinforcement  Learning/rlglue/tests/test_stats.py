@@ -0,0 +1,160 @@
+import os
+
+import numpy as np
+
+from rlglue.benchmark import load_module
+from rlglue.environment import BaseEnvironment
+from rlglue.agent import BaseAgent
+from rlglue.stats import RunningStats, load_summary
+from rlglue.sweep import ParameterSweep, _run_cell
+
+
+def test_running_stats_match_numpy():
+    data = np.random.default_rng(0).normal(3.0, 2.0, size=(40, 500)).cumsum(axis=1)
+    stats = RunningStats(500)
+    for run in data:
+        stats.add(run)
+
+    np.testing.assert_allclose(stats.mean, data.mean(axis=0), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(stats.std(), data.std(axis=0), rtol=1e-10)
+    np.testing.assert_allclose(stats.std_err(), data.std(axis=0) / np.sqrt(len(data)), rtol=1e-10)
+
+
+def test_step_by_step_and_merge_match_whole_curves():
+    data = np.random.default_rng(1).normal(size=(20, 50))
+    whole = RunningStats(50)
+    for run in data:
+        whole.add(run)
+
+    first, second = RunningStats(50), RunningStats(50)
+    for run in data[:7]:
+        first.add(run)
+    for run in data[7:]:
+        for step, value in enumerate(run):
+            second.add(value, start=step)
+    first.merge(second)
+
+    np.testing.assert_array_equal(first.count, whole.count)
+    np.testing.assert_allclose(first.mean, whole.mean, atol=1e-12)
+    np.testing.assert_allclose(first.variance(), whole.variance(), rtol=1e-10)
+
+
+def test_quantiles_from_histogram():
+    data = np.random.default_rng(2).normal(size=(20000, 5))
+    stats = RunningStats(5, quantile_range=(-5, 5), num_bins=1000)
+    for run in data:
+        stats.add(run)
+
+    expected = np.quantile(data, [0.1, 0.5, 0.9], axis=0)
+    np.testing.assert_allclose(stats.quantiles([0.1, 0.5, 0.9]), expected, atol=0.02)
+
+
+def test_save_load_and_x_range(tmp_path):
+    stats = RunningStats(10)
+    stats.add(np.arange(10.0))
+    stats.save(str(tmp_path / "stats.npz"), eval_freq=5)
+
+    summary = load_summary(str(tmp_path / "stats.npz"), x_range=4)
+    assert summary["mean"].tolist() == [0.0, 1.0, 2.0, 3.0]
+    assert int(summary["eval_freq"]) == 5
+
+    reloaded = RunningStats.load(str(tmp_path / "stats.npz"))
+    reloaded.add(np.zeros(10))
+    assert reloaded.count.tolist() == [2] * 10
+
+
+class NoiseEnvironment(BaseEnvironment):
+    """Episodes of 4 steps with seeded Gaussian rewards."""
+
+    def env_init(self, env_info={}):
+        self.rand_generator = np.random.RandomState(env_info.get("seed"))
+
+    def env_start(self):
+        self.t = 0
+        return self.t
+
+    def env_step(self, action):
+        self.t += 1
+        return (self.rand_generator.randn() + action, self.t, self.t == 4)
+
+
+class FixedActionAgent(BaseAgent):
+
+    def agent_init(self, agent_info={}):
+        self.action = agent_info["action"]
+
+    def agent_start(self, state):
+        return self.action
+
+    def agent_step(self, reward, state):
+        return self.action
+
+    def agent_end(self, reward):
+        pass
+
+
+def test_sweep_writes_summaries(tmp_path):
+    experiment_parameters = {"num_runs": 5, "num_episodes": 6}
+    sweep = ParameterSweep(NoiseEnvironment, FixedActionAgent, {"action": [0, 1]}, experiment_parameters,
+                           "agent_{action}", directory=str(tmp_path), summaries=True)
+    sweep.run(max_workers=0)
+
+    for name in sweep.names:
+        runs = np.load(sweep.result_path(name, "episode_return"))
+        summary = load_summary(sweep.summary_path(name, "episode_return"))
+        np.testing.assert_allclose(summary["mean"], runs.mean(axis=0), atol=1e-12)
+        np.testing.assert_allclose(summary["std_err"], runs.std(axis=0) / np.sqrt(len(runs)), atol=1e-12)
+        assert int(summary["num_episodes"]) == 6
+
+
+def test_sweep_summaries_without_runs_match_kept_runs(tmp_path):
+    experiment_parameters = {"num_runs": 6, "num_episodes": 5}
+    kept = ParameterSweep(NoiseEnvironment, FixedActionAgent, {"action": [0, 1]}, experiment_parameters,
+                          "agent_{action}", directory=str(tmp_path / "kept"), summaries=True)
+    kept.run(max_workers=0)
+
+    # an interrupted sweep, resumed: the merged runs are checkpointed
+    directory = str(tmp_path / "streamed")
+    streamed = ParameterSweep(NoiseEnvironment, FixedActionAgent, {"action": [0, 1]}, experiment_parameters,
+                              "agent_{action}", directory=directory, summaries=True, keep_runs=False)
+    interrupted = [cell for cell in streamed.pending_cells() if cell[1] <= 2]
+    os.makedirs(streamed.checkpoint_directory)
+    for i, run in interrupted:
+        streamed._finish_cell(i, run, _run_cell(*streamed._cell_args(i, run)), [experiment_parameters["num_runs"]] * 2)
+    streamed = ParameterSweep(NoiseEnvironment, FixedActionAgent, {"action": [0, 1]}, experiment_parameters,
+                              "agent_{action}", directory=directory, summaries=True, keep_runs=False)
+    assert len(streamed.pending_cells()) == 8
+    streamed.run(max_workers=0)
+
+    for name in kept.names:
+        assert not os.path.exists(streamed.result_path(name, "episode_return"))
+        expected = load_summary(kept.summary_path(name, "episode_return"))
+        summary = load_summary(streamed.summary_path(name, "episode_return"))
+        assert summary["count"].tolist() == [6] * 5
+        np.testing.assert_allclose(summary["mean"], expected["mean"], atol=1e-12)
+        np.testing.assert_allclose(summary["std_err"], expected["std_err"], atol=1e-12)
+
+
+def test_actor_critic_summaries_experiment(tmp_path):
+    environment = load_module("Average Reward Softmax Actor-Critic", "pendulum_env").PendulumEnvironment
+    agent = load_module("Average Reward Softmax Actor-Critic", "actor_critic_agent").ActorCriticSoftmaxAgent
+    experiment = load_module("Average Reward Softmax Actor-Critic", "experiment")
+    agent_parameters = {"num_tilings": 8, "num_tiles": 8, "actor_step_size": 0.25, "critic_step_size": 2,
+                        "avg_reward_step_size": [2 ** -6], "num_actions": 3, "iht_size": 4096}
+    experiment_parameters = {"num_runs": 3, "max_steps": 200}
+
+    sweeps = {}
+    for keep_runs, run_experiment in [(True, experiment.curves_experiment), (False, experiment.summaries_experiment)]:
+        sweeps[keep_runs] = ParameterSweep(environment, agent, agent_parameters, experiment_parameters,
+                                           experiment.NAME_FORMAT, experiment=run_experiment,
+                                           directory=str(tmp_path / str(keep_runs)), summaries=True,
+                                           keep_runs=keep_runs)
+        sweeps[keep_runs].run(max_workers=0)
+
+    name = sweeps[True].names[0]
+    assert name == "ActorCriticSoftmax_tilings_8_tiledim_8_actor_ss_0.25_critic_ss_2_avg_reward_ss_0.015625"
+    for file_type in ("total_return", "exp_avg_reward"):
+        runs = np.load(sweeps[True].result_path(name, file_type))
+        summary = load_summary(sweeps[False].summary_path(name, file_type))
+        np.testing.assert_allclose(summary["mean"], runs.mean(axis=0), rtol=1e-10, atol=1e-10)
+        np.testing.assert_allclose(summary["std"], runs.std(axis=0), rtol=1e-8, atol=1e-10)
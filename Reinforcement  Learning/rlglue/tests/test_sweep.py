@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+
+from rlglue.rl_glue import RLGlue
+from rlglue.sweep import ParameterSweep, parameter_grid, run_episodes
+
+from test_stats import NoiseEnvironment, FixedActionAgent
+
+EXPERIMENT_PARAMETERS = {"num_runs": 4, "num_episodes": 3}
+
+
+def make_sweep(directory, **kwargs):
+    return ParameterSweep(NoiseEnvironment, FixedActionAgent, {"action": [0, 1, 2]}, EXPERIMENT_PARAMETERS,
+                          "agent_{action}", directory=str(directory), seed_offset=10, **kwargs)
+
+
+def test_parameter_grid():
+    configs = parameter_grid({"a": [1, 2], "b": np.array([0.5, 0.25]), "c": "fixed"})
+    assert configs == [{"a": 1, "b": 0.5, "c": "fixed"}, {"a": 1, "b": 0.25, "c": "fixed"},
+                       {"a": 2, "b": 0.5, "c": "fixed"}, {"a": 2, "b": 0.25, "c": "fixed"}]
+
+
+def test_results_match_independent_runs(tmp_path):
+    sweep = make_sweep(tmp_path)
+    assert sweep.run(max_workers=0) == ["agent_0", "agent_1", "agent_2"]
+
+    for config, name in zip(sweep.configs, sweep.names):
+        for file_type in ("episode_return", "episode_steps"):
+            assert np.load(sweep.result_path(name, file_type)).shape == (4, 3)
+        returns = np.load(sweep.result_path(name, "episode_return"))
+        for run in range(1, 5):
+            rl_glue = RLGlue(NoiseEnvironment, FixedActionAgent)
+            rl_glue.rl_init(dict(config, seed=10 + run), {"seed": 10 + run})
+            np.testing.assert_array_equal(returns[run - 1], run_episodes(rl_glue, EXPERIMENT_PARAMETERS)["episode_return"])
+
+
+def test_seeds_are_shared_by_configurations(tmp_path):
+    sweep = make_sweep(tmp_path)
+    sweep.run(max_workers=0)
+
+    returns = [np.load(sweep.result_path(name, "episode_return")) for name in sweep.names]
+    # the same noise in every configuration: the 4 steps of an episode add 4 * action
+    np.testing.assert_allclose(returns[1] - returns[0], 4.0, atol=1e-12)
+    np.testing.assert_allclose(returns[2] - returns[0], 8.0, atol=1e-12)
+    # and different noise in every run
+    assert len({tuple(run) for run in returns[0]}) == 4
+
+
+def test_process_pool_matches_serial_run(tmp_path):
+    serial, pooled = make_sweep(tmp_path / "serial"), make_sweep(tmp_path / "pooled")
+    serial.run(max_workers=0)
+    pooled.run(max_workers=2)
+
+    for name in serial.names:
+        np.testing.assert_array_equal(np.load(pooled.result_path(name, "episode_return")),
+                                      np.load(serial.result_path(name, "episode_return")))
+
+
+def test_resume_runs_only_the_missing_cells(tmp_path):
+    sweep = make_sweep(tmp_path)
+    sweep.run(max_workers=0)
+    expected = np.load(sweep.result_path("agent_1", "episode_return"))
+
+    # an interrupted sweep: agent_1 is missing its run 3 and its results, and
+    # run 1 was checkpointed with a marker a rerun would overwrite
+    os.remove(sweep.checkpoint_path("agent_1", 3))
+    os.remove(sweep.result_path("agent_1", "episode_return"))
+    with np.load(sweep.checkpoint_path("agent_1", 1)) as cell:
+        marked = {file_type: cell[file_type] for file_type in cell.files}
+    marked["episode_return"] = np.full(3, -1.0)
+    np.savez(sweep.checkpoint_path("agent_1", 1), **marked)
+
+    resumed = make_sweep(tmp_path)
+    assert resumed.pending_cells() == [(1, 3)]
+    resumed.run(max_workers=0)
+
+    returns = np.load(resumed.result_path("agent_1", "episode_return"))
+    assert returns[0].tolist() == [-1.0] * 3
+    np.testing.assert_array_equal(returns[1:], expected[1:])
+    assert resumed.pending_cells() == []
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from rlglue.benchmark import load_module
+from rlglue.tiles import ArrayIHT, TileCoder, tiles, tileswrap
+
+tc = load_module("Function Approximation and Control", "tiles3")
+
+STATES = np.random.RandomState(0).uniform(-3, 8, size=(400, 2))
+
+
+@pytest.mark.parametrize("iht_size", [4096, 64])
+def test_tiles_match_tiles3(iht_size):
+    # a 64 entry table fills up, so the collisions and overfullCount are compared too
+    iht, expected_iht = tc.IHT(iht_size), tc.IHT(iht_size)
+    expected = [tc.tiles(expected_iht, 8, state, [1, 2]) for state in STATES.tolist()]
+
+    assert tiles(iht, 8, STATES, [1, 2]).tolist() == expected
+    assert iht.overfullCount == expected_iht.overfullCount
+    assert tiles(iht, 8, STATES[0], [1, 2]).tolist() == expected[0]
+
+
+def test_array_iht_matches_tiles3_iht():
+    iht = tc.IHT(4096)
+    expected = [tc.tiles(iht, 8, state) for state in STATES.tolist()]
+
+    assert tiles(ArrayIHT(4096), 8, STATES).tolist() == expected
+
+
+def test_tileswrap_and_tile_coder_match_tiles3():
+    lows, highs = np.array([-np.pi, -2 * np.pi]), np.array([np.pi, 2 * np.pi])
+    states = np.random.RandomState(1).uniform(lows, highs, size=(400, 2))
+    scaled = (states - lows) / (highs - lows) * 8
+
+    iht = tc.IHT(4096)
+    expected = [tc.tileswrap(iht, 8, state, wrapwidths=[8, False]) for state in scaled.tolist()]
+
+    assert tileswrap(tc.IHT(4096), 8, scaled, [8, False]).tolist() == expected
+    coder = TileCoder(tc.IHT(4096), 8, lows, highs, 8, wrap=[True, False])
+    assert coder.get_tiles(states).tolist() == expected
+
+
+def test_array_iht_empty_batch():
+    iht = ArrayIHT(64)
+    assert iht.getindex_batch(np.zeros((0, 3), dtype=np.int64)).shape == (0,)
+
+    iht.getindex_batch([[0, 1, 2]])
+    assert iht.getindex_batch(np.zeros((0, 3), dtype=np.int64)).shape == (0,)
+    assert iht.count() == 1
+
+
+def test_array_iht_save_load(tmp_path):
+    coordinates = np.random.default_rng(0).integers(0, 20, size=(300, 3))
+    iht = ArrayIHT(1024)
+    indices = iht.getindex_batch(coordinates)
+    iht.save(str(tmp_path / "iht.npz"))
+
+    loaded = ArrayIHT.load(str(tmp_path / "iht.npz"))
+    assert loaded.count() == iht.count() and loaded.overfullCount == iht.overfullCount
+    np.testing.assert_array_equal(loaded.getindex_batch(coordinates, readonly=True), indices)
+
+    # both tables keep assigning the same indices to unseen coordinates
+    unseen = np.random.default_rng(1).integers(20, 40, size=(50, 3))
+    np.testing.assert_array_equal(loaded.getindex_batch(unseen), iht.getindex_batch(unseen))
+
+
+def test_empty_array_iht_save_load(tmp_path):
+    ArrayIHT(16).save(str(tmp_path / "iht.npz"))
+    loaded = ArrayIHT.load(str(tmp_path / "iht.npz"))
+    assert loaded.count() == 0
+    assert loaded.getindex_batch([[1, 2]]).tolist() == [0]
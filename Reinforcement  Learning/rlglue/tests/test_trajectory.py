@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from rlglue.agent import BaseAgent
+from rlglue.benchmark import load_module
+from rlglue.rl_glue import RLGlue
+from rlglue.trajectory import load_trajectories, replay_episodes, save_trajectories, td_replay
+
+RandomWalkEnvironment = load_module("Semi gradient TD with a Neural Network",
+                                    "randomwalk_environment").RandomWalkEnvironment
+
+ENV_INFO = {"num_states": 500, "start_state": 250, "left_terminal_state": 0, "right_terminal_state": 501,
+            "seed": 1}
+STEP_SIZES = [0.01, 0.05, 0.1]
+# the groups of 50 states of the state aggregation notebook; the terminal states are never looked up
+GROUPS = np.clip((np.arange(502) - 1) // 50, 0, 9)
+
+
+class AggregationTDAgent(BaseAgent):
+    """TD(0) with state aggregation under the uniform random policy, as in the notebook."""
+
+    def agent_init(self, agent_info={}):
+        self.rand_generator = np.random.RandomState(agent_info.get("seed"))
+        self.step_size = agent_info["step_size"]
+        self.weights = np.zeros(10)
+
+    def agent_start(self, state):
+        self.last_group = GROUPS[state]
+        return self.rand_generator.choice([0, 1])
+
+    def agent_step(self, reward, state):
+        group = GROUPS[state]
+        delta = reward + self.weights[group] - self.weights[self.last_group]
+        self.weights[self.last_group] += self.step_size * delta
+        self.last_group = group
+        return self.rand_generator.choice([0, 1])
+
+    def agent_end(self, reward):
+        self.weights[self.last_group] += self.step_size * (reward - self.weights[self.last_group])
+
+    def agent_cleanup(self):
+        pass
+
+    def agent_message(self, message):
+        pass
+
+
+def online_weights(step_size, num_episodes, record=False):
+    rl_glue = RLGlue(RandomWalkEnvironment, AggregationTDAgent)
+    recorder = rl_glue.rl_enable_recording() if record else None
+    rl_glue.rl_init({"step_size": step_size, "seed": 0}, ENV_INFO)
+    for _ in range(num_episodes):
+        rl_glue.rl_episode(0)
+    return rl_glue.agent.weights, recorder
+
+
+@pytest.mark.parametrize("path", [None, "walks", "walks.npz"])
+def test_replays_match_online_td(tmp_path, path):
+    weights, recorder = online_weights(STEP_SIZES[0], 30, record=True)
+    walks = recorder.trajectories()
+    assert len(walks["episode_offsets"]) == 31
+    if path is not None:
+        save_trajectories(str(tmp_path / path), walks)
+        walks = load_trajectories(str(tmp_path / path), mmap_mode="r")
+
+    # the policy does not depend on the weights, so every step-size sees the recorded episodes
+    expected = np.array([online_weights(step_size, 30)[0] for step_size in STEP_SIZES])
+    np.testing.assert_array_equal(expected[0], weights)
+
+    np.testing.assert_array_equal(td_replay(walks, STEP_SIZES, 10, features=GROUPS), expected)
+
+    agents = []
+    for step_size in STEP_SIZES:
+        agents.append(AggregationTDAgent())
+        agents[-1].agent_init({"step_size": step_size, "seed": 0})
+    replay_episodes(walks, agents)
+    np.testing.assert_array_equal(np.array([agent.weights for agent in agents]), expected)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from rlglue.utils import argmax, batch_argmax
+
+
+def loop_argmax(q_values, rand_generator):
+    """The loop-based argmax the agents used before rlglue.utils."""
+    top = float("-inf")
+    ties = []
+
+    for i in range(len(q_values)):
+        if q_values[i] > top:
+            top = q_values[i]
+            ties = []
+
+        if q_values[i] == top:
+            ties.append(i)
+
+    return rand_generator.choice(ties)
+
+
+def test_argmax_keeps_the_random_stream():
+    # few distinct values, so most rows have ties
+    q_values = np.random.default_rng(0).integers(0, 3, size=(500, 4)).astype(float)
+    old, new = np.random.RandomState(7), np.random.RandomState(7)
+
+    for q in q_values:
+        assert argmax(q, new) == loop_argmax(q, old)
+    assert old.randint(1 << 30) == new.randint(1 << 30)
+
+
+def test_batch_argmax_matches_sequential_argmax():
+    q_values = np.random.default_rng(1).integers(0, 3, size=(200, 5)).astype(float)
+    sequential = np.random.RandomState(3)
+    expected = [argmax(q, sequential) for q in q_values]
+
+    batched = np.random.RandomState(3)
+    assert batch_argmax(q_values, batched).tolist() == expected
+    assert batched.randint(1 << 30) == sequential.randint(1 << 30)
@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+
+from rlglue.environment import BaseEnvironment
+from rlglue.agent import BaseAgent
+from rlglue.rl_glue import RLGlue
+from rlglue.vector_rl_glue import VectorRLGlue
+
+NUM_RUNS = 6
+LENGTH = 8
+
+
+class ChainEnvironment(BaseEnvironment):
+    """A chain of LENGTH states, starting at a seeded random state; action 1 moves right, 0 left.
+
+    Reaching the right end terminates with reward 10; every other step gives
+    the number of the new state.
+    """
+
+    def env_init(self, env_info={}):
+        self.rand_generator = np.random.RandomState(env_info.get("seed"))
+
+    def env_start(self):
+        self.state = self.rand_generator.randint(LENGTH - 1)
+        return self.state
+
+    def env_step(self, action):
+        self.state = max(self.state + (1 if action == 1 else -1), 0)
+        if self.state == LENGTH - 1:
+            return (10.0, self.state, True)
+        return (float(self.state), self.state, False)
+
+
+class BatchChainEnvironment:
+    """ChainEnvironment with the batched protocol; run i draws its starts like ChainEnvironment with seed + i."""
+
+    def env_init(self, env_info={}):
+        seed = env_info.get("seed", 0)
+        self.rand_generators = [np.random.RandomState(seed + i) for i in range(env_info["num_runs"])]
+        self.states = np.zeros(env_info["num_runs"], dtype=int)
+
+    def env_start_batch(self, mask):
+        for i in np.flatnonzero(mask):
+            self.states[i] = self.rand_generators[i].randint(LENGTH - 1)
+        return self.states.copy()
+
+    def env_step_batch(self, actions):
+        self.states = np.maximum(self.states + np.where(np.asarray(actions) == 1, 1, -1), 0)
+        terminals = self.states == LENGTH - 1
+        rewards = np.where(terminals, 10.0, self.states)
+        return rewards, self.states.copy(), terminals
+
+    def env_cleanup(self):
+        pass
+
+
+class DriftAgent(BaseAgent):
+    """Moves right with a probability that grows with every finished episode, and counts its calls."""
+
+    def agent_init(self, agent_info={}):
+        self.rand_generator = np.random.RandomState(agent_info.get("seed"))
+        self.p_right = 0.6
+        self.calls = {"start": 0, "step": 0, "end": 0}
+
+    def agent_start(self, state):
+        self.calls["start"] += 1
+        return self.act()
+
+    def agent_step(self, reward, state):
+        self.calls["step"] += 1
+        return self.act()
+
+    def agent_end(self, reward):
+        self.calls["end"] += 1
+        self.p_right = min(self.p_right + 0.05, 0.95)
+
+    def act(self):
+        return int(self.rand_generator.rand() < self.p_right)
+
+    def agent_message(self, message):
+        if message == "calls":
+            return dict(self.calls)
+
+
+def scalar_runs(num_episodes, max_steps_this_episode):
+    """Episode returns, step counts and agent calls of NUM_RUNS independent RLGlue runs."""
+    returns = np.zeros((NUM_RUNS, num_episodes))
+    steps = np.zeros((NUM_RUNS, num_episodes), dtype=int)
+    calls = []
+    for run in range(NUM_RUNS):
+        rl_glue = RLGlue(ChainEnvironment, DriftAgent)
+        rl_glue.rl_init({"seed": 100 + run}, {"seed": run})
+        for episode in range(num_episodes):
+            rl_glue.rl_episode(max_steps_this_episode)
+            returns[run, episode] = rl_glue.rl_return()
+            steps[run, episode] = rl_glue.rl_num_steps()
+        calls.append(rl_glue.rl_agent_message("calls"))
+    return returns, steps, calls
+
+
+@pytest.mark.parametrize("env_class", [ChainEnvironment, BatchChainEnvironment])
+@pytest.mark.parametrize("max_steps_this_episode", [0, 5])
+def test_rl_episodes_match_independent_rl_glue_runs(env_class, max_steps_this_episode):
+    num_episodes = 12
+    expected_returns, expected_steps, expected_calls = scalar_runs(num_episodes, max_steps_this_episode)
+
+    rl_glue = VectorRLGlue(env_class, DriftAgent, NUM_RUNS)
+    assert rl_glue.env_is_batched == (env_class is BatchChainEnvironment)
+    env_info = [{"seed": run} for run in range(NUM_RUNS)] if env_class is ChainEnvironment else {"seed": 0}
+    rl_glue.rl_init([{"seed": 100 + run} for run in range(NUM_RUNS)], env_info)
+    returns, steps = rl_glue.rl_episodes(num_episodes, max_steps_this_episode)
+
+    np.testing.assert_array_equal(returns, expected_returns)
+    np.testing.assert_array_equal(steps, expected_steps)
+    # only terminations count as episodes
+    num_episodes_run = np.array([len(r) for r in rl_glue.episode_returns])
+    if max_steps_this_episode == 0:
+        np.testing.assert_array_equal(rl_glue.rl_num_episodes(), num_episodes_run)
+    else:
+        # both cut-off and terminated episodes happened
+        assert (steps == max_steps_this_episode).any() and (steps < max_steps_this_episode).any()
+        assert (rl_glue.rl_num_episodes() < num_episodes_run).any()
+
+    # the runs that finished first kept stepping, so only the first episodes line up call by call
+    for calls, expected in zip(rl_glue.rl_agent_message("calls"), expected_calls):
+        assert calls["start"] >= expected["start"] and calls["end"] >= expected["end"]
+
+
+def test_rl_step_auto_resets_finished_runs():
+    rl_glue = VectorRLGlue(BatchChainEnvironment, DriftAgent, NUM_RUNS)
+    rl_glue.rl_init([{"seed": 100 + run} for run in range(NUM_RUNS)], {"seed": 0})
+    rl_glue.rl_start()
+
+    # the same runs, stepped one RLGlue.rl_step at a time and restarted on termination
+    scalar = [RLGlue(ChainEnvironment, DriftAgent) for _ in range(NUM_RUNS)]
+    for run, glue in enumerate(scalar):
+        glue.rl_init({"seed": 100 + run}, {"seed": run})
+        glue.rl_start()
+
+    num_terminals = 0
+    for _ in range(200):
+        rewards, observations, actions, terminals = rl_glue.rl_step()
+        for run, glue in enumerate(scalar):
+            reward, state, action, terminal = glue.rl_step()
+            assert (rewards[run], terminals[run]) == (reward, terminal)
+            if terminal:
+                # VectorRLGlue already started the next episode
+                state, action = glue.rl_start()
+            assert (observations[run], actions[run]) == (state, action)
+            assert rl_glue.rl_return()[run] == (0.0 if terminal else glue.rl_return())
+        num_terminals += terminals.sum()
+
+    assert num_terminals > NUM_RUNS
+    assert rl_glue.rl_num_episodes().tolist() == [glue.num_episodes for glue in scalar]
@@ -0,0 +1,109 @@
+import itertools
+
+import pytest
+
+from rlglue.agent import BaseAgent
+from rlglue.environment import BaseEnvironment
+from rlglue.rl_glue import RLGlue, SlotsRLGlue
+
+
+class CountingEnvironment(BaseEnvironment):
+    """Episodes of 3 steps, with the step count as the state."""
+
+    def env_init(self, env_info={}):
+        self.t = 0
+
+    def env_start(self):
+        self.t = 0
+        return self.t
+
+    def env_step(self, action):
+        self.t += 1
+        return (1.0, self.t, self.t == 3)
+
+    def env_cleanup(self):
+        pass
+
+    def env_message(self, message):
+        pass
+
+
+class ConstantAgent(BaseAgent):
+
+    def agent_init(self, agent_info={}):
+        pass
+
+    def agent_start(self, state):
+        return 0
+
+    def agent_step(self, reward, state):
+        return 0
+
+    def agent_end(self, reward):
+        pass
+
+    def agent_cleanup(self):
+        pass
+
+    def agent_message(self, message):
+        pass
+
+
+def _enable(rl_glue, what):
+    if what == "profiling":
+        return rl_glue.rl_enable_profiling()
+    return rl_glue.rl_enable_recording()
+
+
+def _disable(rl_glue, what):
+    if what == "profiling":
+        rl_glue.rl_disable_profiling()
+    else:
+        rl_glue.rl_disable_recording()
+
+
+@pytest.mark.parametrize("glue_class", [RLGlue, SlotsRLGlue])
+@pytest.mark.parametrize("enable_order", list(itertools.permutations(["profiling", "recording"])))
+@pytest.mark.parametrize("disable_order", list(itertools.permutations(["profiling", "recording"])))
+def test_profiling_and_recording_unwrap_in_any_order(glue_class, enable_order, disable_order):
+    rl_glue = glue_class(CountingEnvironment, ConstantAgent)
+    rl_glue.rl_init()
+    wrappers = {what: _enable(rl_glue, what) for what in enable_order}
+    profiler, recorder = wrappers["profiling"], wrappers["recording"]
+
+    rl_glue.rl_episode(0)
+    assert profiler.stats["env_step"][0] == 3
+    assert recorder.num_episodes() == 1
+
+    # after removing the first wrapper, the other one keeps working
+    first, second = disable_order
+    _disable(rl_glue, first)
+    rl_glue.rl_episode(0)
+    assert profiler.stats["env_step"][0] == (3 if first == "profiling" else 6)
+    assert recorder.num_episodes() == (1 if first == "recording" else 2)
+
+    _disable(rl_glue, second)
+    _disable(rl_glue, second)
+    rl_glue.rl_episode(0)
+    assert profiler.stats["env_step"][0] == (3 if first == "profiling" else 6)
+    assert recorder.num_episodes() == (1 if first == "recording" else 2)
+
+    # every instance attribute is gone: the environment and agent use their class methods again
+    for name in ("env_start", "env_step"):
+        assert name not in vars(rl_glue.environment)
+    for name in ("agent_start", "agent_step", "agent_end"):
+        assert name not in vars(rl_glue.agent)
+
+
+def test_recorded_columns():
+    rl_glue = RLGlue(CountingEnvironment, ConstantAgent)
+    recorder = rl_glue.rl_enable_recording()
+    rl_glue.rl_init()
+    rl_glue.rl_episode(0)
+    rl_glue.rl_episode(2)
+
+    trajectories = recorder.trajectories()
+    assert trajectories["states"].tolist() == [0, 1, 2, 0]
+    assert trajectories["next_states"].tolist() == [1, 2, 3, 1]
+    assert trajectories["terminals"].tolist() == [False, False, True, False]
+    assert trajectories["episode_offsets"].tolist() == [0, 3, 4]
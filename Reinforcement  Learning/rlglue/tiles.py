@@ -0,0 +1,486 @@
+#!/usr/bin/env python
+
+"""Vectorized grid-style tile coding, compatible with Rich Sutton's tiles3.
+
+tiles computes the coordinates of every tiling of a whole batch of states with
+integer array math, instead of building one Python list per tiling and state:
+
+    indices = tiles(iht, 8, states)      # states (B, d) -> indices (B, 8)
+
+The coordinates are exactly those of tiles3.tiles. Backed by an IHT (a
+tiles3.IHT, or the array-backed ArrayIHT below), the indices are the ones
+tiles3 would return for the same sequence of calls. Backed by an integer size,
+the coordinates are hashed with a vectorized hash, so the indices are in
+[0, size) but differ from tiles3, which uses Python's tuple hash.
+"""
+
+from functools import lru_cache
+from math import floor
+
+import numpy as np
+
+# random odd multipliers of the vectorized coordinate hash, one per coordinate
+_HASH_MULTIPLIERS = np.random.RandomState(0).randint(1, 2 ** 62, size=64, dtype=np.int64) | 1
+
+
+@lru_cache(maxsize=None)
+def _tiling_offsets(num_tilings, num_floats, wrap=False):
+    """The (num_tilings,) tiling numbers and (num_tilings, num_floats) offsets of tiles3."""
+    tilings = np.arange(num_tilings)
+    # tiles3 offsets float j of tiling t by t * (1 + 2j) before dividing by num_tilings,
+    # tileswrap by (t * (1 + 2j)) % num_tilings
+    offsets = tilings[:, None] * (1 + 2 * np.arange(num_floats))
+    if wrap:
+        offsets %= num_tilings
+    tilings.setflags(write=False)
+    offsets.setflags(write=False)
+
+    return tilings, offsets
+
+
+def _wrap_widths(wrapwidths, num_floats):
+    """The wrap width of every float (0 for no wrapping) from a tiles3 wrapwidths list."""
+    widths = np.zeros(num_floats, dtype=np.int64)
+    for j, width in enumerate(wrapwidths):
+        widths[j] = width or 0
+
+    return widths
+
+
+def tile_coordinates(num_tilings, floats, ints=(), wrapwidths=None):
+    """The tiles3 coordinates of every tiling of every state
+
+    Args:
+        num_tilings (int): the number of tilings
+        floats (Numpy array): the (B, d) states, already scaled so that a tile
+            has width 1
+        ints (Numpy array): integers appended to the coordinates, either shared
+            by every state (k,) or one row per state (B, k)
+        wrapwidths (list): None for tiles3.tiles coordinates, or the tileswrap
+            wrap width of every float (False or 0 for no wrapping)
+    Returns:
+        Numpy array: the (B, num_tilings, 1 + d + k) integer coordinates, the
+            first one being the tiling
+    """
+    floats = np.asarray(floats, dtype=float)
+    num_states, num_floats = floats.shape
+
+    quantized = np.floor(floats * num_tilings).astype(np.int64)
+    tilings, offsets = _tiling_offsets(num_tilings, num_floats, wrapwidths is not None)
+
+    ints = np.asarray(ints, dtype=np.int64)
+    if ints.ndim < 2:
+        ints = ints.reshape(1, -1)
+    ints = np.broadcast_to(ints, (num_states, ints.shape[1]))
+
+    coordinates = np.empty((num_states, num_tilings, 1 + num_floats + ints.shape[1]), dtype=np.int64)
+    coordinates[:, :, 0] = tilings
+    coordinates[:, :, 1:1 + num_floats] = (quantized[:, None, :] + offsets) // num_tilings
+    coordinates[:, :, 1 + num_floats:] = ints[:, None, :]
+
+    if wrapwidths is not None:
+        _wrap(coordinates[:, :, 1:1 + num_floats], _wrap_widths(wrapwidths, num_floats))
+
+    return coordinates
+
+
+def _wrap(float_coordinates, widths):
+    """Wraps, in place, the float coordinates whose width is not 0."""
+    wrapped = np.flatnonzero(widths)
+    if len(wrapped):
+        float_coordinates[..., wrapped] %= widths[wrapped]
+
+
+def _hash64(coordinates):
+    """A 64-bit multiply-shift hash of every row of coordinates; the products wrap around."""
+    hashes = coordinates @ _HASH_MULTIPLIERS[:coordinates.shape[-1]]
+    hashes ^= hashes >> 31
+
+    return hashes
+
+
+def hash_coordinates(coordinates, size):
+    """Hashes every row of coordinates into [0, size)
+
+    Args:
+        coordinates (Numpy array): integer coordinates, the last axis being hashed
+        size (int): the number of indices
+    Returns:
+        Numpy array: the indices, with the shape of coordinates without its last axis
+    """
+    return _hash64(coordinates) % size
+
+
+def _unique_rows(rows):
+    """The first occurrence of every distinct row, and the group of every row.
+
+    Same as np.unique(rows, axis=0, return_index=True, return_inverse=True),
+    but groups the rows by sorting their 64-bit hashes, which is much faster
+    than sorting the rows. A batch with two different rows of the same hash
+    is grouped by sorting the rows themselves instead.
+    """
+    hashes = _hash64(rows)
+    order = np.argsort(hashes, kind="stable")
+    sorted_rows = rows[order]
+    is_first = np.ones(len(rows), dtype=bool)
+    np.any(sorted_rows[1:] != sorted_rows[:-1], axis=1, out=is_first[1:])
+
+    if np.count_nonzero(is_first) != len(np.unique(hashes)):
+        order = np.lexsort(rows.T[::-1])
+        sorted_rows = rows[order]
+        np.any(sorted_rows[1:] != sorted_rows[:-1], axis=1, out=is_first[1:])
+
+    inverse = np.empty(len(rows), dtype=np.int64)
+    inverse[order] = np.cumsum(is_first) - 1
+
+    # the sorts are stable, so the first row of every group is its first occurrence
+    return order[is_first], inverse
+
+
+class ArrayIHT:
+    """Index hash table backed by preallocated arrays, a drop-in for tiles3.IHT
+
+    The coordinates of the tile with index i are stored in row i of a
+    (size, num_coordinates) integer array, and an open-addressing table of
+    2 ** n >= 2 * size slots (linear probing) maps the hash of a coordinate
+    row to its index. No tuple or dict entry is allocated per tile, and a
+    whole batch of coordinates is looked up with array operations.
+
+    Indices are assigned in first-seen order, like tiles3.IHT. Once the table
+    is full, unseen coordinates get the index hash % size and increment
+    overfullCount on every lookup, as in tiles3.IHT, but with the vectorized
+    hash instead of Python's tuple hash.
+
+    args:
+        size (int): the number of indices
+        num_coordinates (int): the length of a coordinate row, set by the
+            first lookup if None
+    """
+
+    def __init__(self, size, num_coordinates=None):
+        self.size = size
+        self.overfullCount = 0
+        self.num_entries = 0
+
+        num_slots = 1
+        while num_slots < 2 * size:
+            num_slots *= 2
+        self.slot_mask = num_slots - 1
+        self.slots = np.full(num_slots, -1, dtype=np.int64)
+
+        self.coordinates = None
+        if num_coordinates is not None:
+            self.coordinates = np.zeros((size, num_coordinates), dtype=np.int64)
+
+    def __str__(self):
+        "Prepares a string for printing whenever this object is printed"
+        return "Collision table:" + \
+               " size:" + str(self.size) + \
+               " overfullCount:" + str(self.overfullCount) + \
+               " dictionary:" + str(self.num_entries) + " items"
+
+    def count(self):
+        return self.num_entries
+
+    def fullp(self):
+        return self.num_entries >= self.size
+
+    def getindex(self, obj, readonly=False):
+        """The index of one coordinate tuple, as tiles3.IHT.getindex (None for a readonly miss)."""
+        index = self.getindex_batch(np.array([obj], dtype=np.int64), readonly)[0]
+        if index == -1 and readonly:
+            return None
+        return int(index)
+
+    def getindex_batch(self, coordinates, readonly=False):
+        """The indices of a batch of coordinate rows
+
+        Gives the same indices, in the same order, as calling getindex on
+        every row in turn.
+
+        Args:
+            coordinates (Numpy array): the (n, num_coordinates) integer coordinates
+            readonly (bool): do not add unseen coordinates; their index is -1
+        Returns:
+            Numpy array: the (n,) indices
+        """
+        coordinates = np.asarray(coordinates, dtype=np.int64)
+        if self.coordinates is None:
+            self.coordinates = np.zeros((self.size, coordinates.shape[1]), dtype=np.int64)
+        elif coordinates.shape[1] != self.coordinates.shape[1]:
+            raise ValueError("Expected {} coordinates per tile, got {}".format(
+                self.coordinates.shape[1], coordinates.shape[1]))
+
+        indices = self._lookup(coordinates)
+        missing = np.flatnonzero(indices == -1)
+        if readonly or len(missing) == 0:
+            return indices
+
+        # unseen coordinates get new indices in order of first occurrence, until the table is full
+        rows = coordinates[missing]
+        first, inverse = _unique_rows(rows)
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        rank = rank[inverse]
+
+        num_new = min(len(order), self.size - self.num_entries)
+        new_rows = rows[first[order[:num_new]]]
+        new_indices = self.num_entries + np.arange(num_new)
+        self.coordinates[new_indices] = new_rows
+        self._insert(new_rows, new_indices)
+        self.num_entries += num_new
+
+        stored = rank < num_new
+        indices[missing[stored]] = self.num_entries - num_new + rank[stored]
+
+        overfull = missing[~stored]
+        if len(overfull):
+            if self.overfullCount == 0:
+                print('IHT full, starting to allow collisions')
+            self.overfullCount += len(overfull)
+            indices[overfull] = hash_coordinates(coordinates[overfull], self.size)
+
+        return indices
+
+    def _lookup(self, coordinates):
+        """The stored index of every coordinate row, -1 if it is not stored."""
+        if len(coordinates) == 0:
+            return np.zeros(0, dtype=np.int64)
+        slots = _hash64(coordinates) & self.slot_mask
+
+        # usually every row is stored at its first probe, e.g. for an already visited state
+        stored = self.slots[slots]
+        if stored.min() >= 0 and (self.coordinates[stored] == coordinates).all():
+            return stored
+
+        indices = np.full(len(coordinates), -1, dtype=np.int64)
+        pending = np.arange(len(coordinates))
+
+        while len(pending):
+            stored = self.slots[slots[pending]]
+            occupied = stored != -1
+            found = occupied.copy()
+            found[occupied] = np.all(self.coordinates[stored[occupied]] == coordinates[pending[occupied]], axis=1)
+            indices[pending[found]] = stored[found]
+
+            # probe the next slot for the rows whose slot holds other coordinates
+            pending = pending[occupied & ~found]
+            slots[pending] = (slots[pending] + 1) & self.slot_mask
+
+        return indices
+
+    def _insert(self, coordinates, indices):
+        """Adds coordinate rows that are not stored yet (and are all different)."""
+        slots = _hash64(coordinates) & self.slot_mask
+        pending = np.arange(len(coordinates))
+
+        while len(pending):
+            free = self.slots[slots[pending]] == -1
+            # several rows may probe the same free slot: the first one takes it
+            free_slots, first = np.unique(slots[pending[free]], return_index=True)
+            winners = pending[free][first]
+            self.slots[free_slots] = indices[winners]
+
+            is_winner = np.zeros(len(coordinates), dtype=bool)
+            is_winner[winners] = True
+            pending = pending[~is_winner[pending]]
+            slots[pending] = (slots[pending] + 1) & self.slot_mask
+
+    def save(self, file):
+        """Saves the table, e.g. with a trained agent's weights
+
+        Args:
+            file (string or file): where to write the .npz data
+        """
+        np.savez(file, size=self.size, overfull_count=self.overfullCount,
+                 coordinates=self.coordinates[:self.num_entries] if self.coordinates is not None
+                 else np.zeros((0, 0), dtype=np.int64))
+
+    @classmethod
+    def load(cls, file):
+        """Loads a table written by save
+
+        Args:
+            file (string or file): the .npz data
+        Returns:
+            ArrayIHT: the table, giving the same indices as the saved one
+        """
+        with np.load(file) as data:
+            coordinates = data["coordinates"]
+            size = int(data["size"])
+            overfull_count = int(data["overfull_count"])
+
+        iht = cls(size, coordinates.shape[1] if coordinates.size else None)
+        iht.overfullCount = overfull_count
+        if coordinates.size:
+            iht.num_entries = len(coordinates)
+            iht.coordinates[:iht.num_entries] = coordinates
+            iht._insert(coordinates, np.arange(iht.num_entries))
+
+        return iht
+
+
+def coordinates_to_indices(coordinates, iht_or_size, readonly=False):
+    """Maps (..., num_coordinates) tile coordinates to tile indices
+
+    Args:
+        coordinates (Numpy array): the tile coordinates
+        iht_or_size: an IHT, an int size, or None to return the coordinates
+        readonly (bool): with an IHT, do not add unseen coordinates; their
+            index is -1 (tiles3 returns None)
+    Returns:
+        Numpy array: the indices, with the shape of coordinates without its last axis
+    """
+    if iht_or_size is None:
+        return coordinates
+    if isinstance(iht_or_size, (int, np.integer)):
+        return hash_coordinates(coordinates, iht_or_size)
+    if isinstance(iht_or_size, ArrayIHT):
+        rows = coordinates.reshape(-1, coordinates.shape[-1])
+        return iht_or_size.getindex_batch(rows, readonly).reshape(coordinates.shape[:-1])
+
+    # a tiles3.IHT, queried in the same order as tiles3 so it assigns the same indices
+    getindex = iht_or_size.getindex
+    indices = [getindex(tuple(coords), readonly) for coords in coordinates.reshape(-1, coordinates.shape[-1]).tolist()]
+    if readonly:
+        indices = [-1 if index is None else index for index in indices]
+
+    return np.array(indices, dtype=np.int64).reshape(coordinates.shape[:-1])
+
+
+def tiles(iht_or_size, num_tilings, floats, ints=(), readonly=False):
+    """The tile indices of one state or of a batch of states, see tiles3.tiles
+
+    Args:
+        iht_or_size: an IHT, an int size, or None to return the coordinates
+        num_tilings (int): the number of tilings
+        floats (Numpy array): one (d,) state or a (B, d) batch of states
+        ints (Numpy array): integers appended to the coordinates, shared (k,)
+            or per state (B, k)
+        readonly (bool): see coordinates_to_indices
+    Returns:
+        Numpy array: the (num_tilings,) or (B, num_tilings) tile indices
+    """
+    floats = np.asarray(floats, dtype=float)
+    batch = floats.reshape(-1, floats.shape[-1])
+
+    indices = coordinates_to_indices(tile_coordinates(num_tilings, batch, ints), iht_or_size, readonly)
+
+    return indices[0] if floats.ndim == 1 else indices
+
+
+def tileswrap(iht_or_size, num_tilings, floats, wrapwidths, ints=(), readonly=False):
+    """The tile indices of one state or of a batch of states, wrapping some floats, see tiles3.tileswrap
+
+    Args:
+        iht_or_size: an IHT, an int size, or None to return the coordinates
+        num_tilings (int): the number of tilings
+        floats (Numpy array): one (d,) state or a (B, d) batch of states
+        wrapwidths (list): the wrap width of every float, False or 0 for no wrapping
+        ints (Numpy array): integers appended to the coordinates, shared (k,)
+            or per state (B, k)
+        readonly (bool): see coordinates_to_indices
+    Returns:
+        Numpy array: the (num_tilings,) or (B, num_tilings) tile indices
+    """
+    floats = np.asarray(floats, dtype=float)
+    batch = floats.reshape(-1, floats.shape[-1])
+
+    coordinates = tile_coordinates(num_tilings, batch, ints, wrapwidths)
+    indices = coordinates_to_indices(coordinates, iht_or_size, readonly)
+
+    return indices[0] if floats.ndim == 1 else indices
+
+
+class TileCoder:
+    """Tile coder with a fixed configuration, for batches of states
+
+    The scaling of every state variable, the tiling offsets and the wrap
+    widths are computed once, so encoding a batch is a few array operations.
+    Every variable is scaled from [low, high] to [0, num_tiles] as
+    (x - low) / (high - low) * num_tiles, the scaling of the notebook tile
+    coders, and wrapped variables (e.g. an angle) use the coordinates of
+    tiles3.tileswrap with a wrap width of num_tiles.
+
+    args:
+        iht_or_size: an ArrayIHT, a tiles3.IHT or an int size
+        num_tilings (int): the number of tilings
+        lows (list): the lowest value of every state variable
+        highs (list): the highest value of every state variable
+        num_tiles (int or list): the number of tiles along every state variable
+        wrap (list): True for the state variables that wrap around, e.g.
+            [True, False] for the pendulum (angle, angular velocity). None for
+            no wrapping, which gives the coordinates of tiles3.tiles.
+        memoize (bool): remember the tiles of every grid cell met by a
+            single-state call. An agent encoding one state per step then
+            skips the array math for cells it has already visited; the
+            memoized tiles are read-only arrays.
+    """
+
+    def __init__(self, iht_or_size, num_tilings, lows, highs, num_tiles=8, wrap=None, memoize=False):
+        self.iht = iht_or_size
+        self.num_tilings = num_tilings
+        self.lows = np.asarray(lows, dtype=float)
+        self.ranges = np.asarray(highs, dtype=float) - self.lows
+        self.num_tiles = np.broadcast_to(np.asarray(num_tiles, dtype=float), self.lows.shape)
+        self.num_floats = len(self.lows)
+
+        self.wrapwidths = None
+        if wrap is not None:
+            self.wrapwidths = np.where(wrap, self.num_tiles, 0).astype(np.int64)
+        self.tilings, self.offsets = _tiling_offsets(num_tilings, self.num_floats, wrap is not None)
+
+        # the tiles only depend on the quantized state, floor(scaled state * num_tilings)
+        self.memo = {} if memoize else None
+        self.quantization = list(zip(self.lows.tolist(), self.ranges.tolist(), self.num_tiles.tolist()))
+
+    def get_tiles(self, states, readonly=False):
+        """The active tiles of one state or of a batch of states
+
+        Args:
+            states (Numpy array): one (d,) state or a (B, d) batch of states
+            readonly (bool): see coordinates_to_indices
+        Returns:
+            Numpy array: the (num_tilings,) or (B, num_tilings) tile indices
+        """
+        if self.memo is not None and not readonly and np.ndim(states) == 1:
+            return self._memoized_tiles(states)
+
+        states = np.asarray(states, dtype=float)
+        batch = states.reshape(-1, self.num_floats)
+
+        scaled = (batch - self.lows) / self.ranges * self.num_tiles
+        quantized = np.floor(scaled * self.num_tilings).astype(np.int64)
+
+        coordinates = np.empty((len(batch), self.num_tilings, 1 + self.num_floats), dtype=np.int64)
+        coordinates[:, :, 0] = self.tilings
+        coordinates[:, :, 1:] = (quantized[:, None, :] + self.offsets) // self.num_tilings
+        if self.wrapwidths is not None:
+            _wrap(coordinates[:, :, 1:], self.wrapwidths)
+
+        indices = coordinates_to_indices(coordinates, self.iht, readonly)
+
+        return indices[0] if states.ndim == 1 else indices
+
+    def _memoized_tiles(self, state):
+        """get_tiles of one state, through the memo of quantized states."""
+        if isinstance(state, np.ndarray):
+            state = state.tolist()
+        num_tilings = self.num_tilings
+        # the same float operations as get_tiles, on Python floats
+        key = tuple([floor((x - low) / width * num_tiles * num_tilings)
+                     for x, (low, width, num_tiles) in zip(state, self.quantization)])
+
+        indices = self.memo.get(key)
+        if indices is None:
+            memo, self.memo = self.memo, None
+            indices = self.get_tiles(state)
+            self.memo = memo
+
+            # tiles hashed by a full IHT count as collisions on every lookup, so they are not memoized
+            if isinstance(self.iht, (int, np.integer)) or not self.iht.fullp():
+                indices.setflags(write=False)
+                self.memo[key] = indices
+
+        return indices
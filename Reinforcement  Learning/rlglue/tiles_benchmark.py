@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+"""Reports pendulum tile-coding states/sec of tiles3.tileswrap against the batched TileCoder.
+
+Run from a source checkout with:
+
+    python -m rlglue.tiles_benchmark
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from rlglue.benchmark import load_module
+from rlglue.tiles import ArrayIHT, TileCoder
+
+# the pendulum (angle, angular velocity) ranges of the Actor-Critic assignment
+LOWS = [-np.pi, -2 * np.pi]
+HIGHS = [np.pi, 2 * np.pi]
+
+
+def tileswrap_loop(tc, iht_size, num_tilings, num_tiles, states):
+    """The per-state encoding of the notebook's PendulumTileCoder.get_tiles."""
+    iht = tc.IHT(iht_size)
+    scaled = (states - LOWS) / (np.array(HIGHS) - LOWS) * num_tiles
+    for angle, ang_vel in scaled.tolist():
+        tc.tileswrap(iht, num_tilings, [angle, ang_vel], wrapwidths=[num_tiles, False])
+
+
+def tile_coder_batch(iht_or_size, num_tilings, num_tiles, states):
+    coder = TileCoder(iht_or_size, num_tilings, LOWS, HIGHS, num_tiles, wrap=[True, False])
+    coder.get_tiles(states)
+
+
+def states_per_second(encode, states, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encode(states)
+        best = min(best, time.perf_counter() - start)
+
+    return len(states) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--states", type=int, default=10000)
+    parser.add_argument("--num-tiles", type=int, default=8)
+    parser.add_argument("--iht-size", type=int, default=4096)
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="best of this many timings is reported, to filter out noise")
+    args = parser.parse_args()
+
+    tc = load_module("Average Reward Softmax Actor-Critic", "tiles3")
+    rand_generator = np.random.RandomState(0)
+    states = rand_generator.uniform(LOWS, HIGHS, size=(args.states, 2))
+
+    print("{:<8} {:<28} {:>14}".format("tilings", "encoder", "states/sec"))
+    for num_tilings in (8, 16, 32):
+        variants = [
+            ("tileswrap loop, IHT", lambda s: tileswrap_loop(tc, args.iht_size, num_tilings, args.num_tiles, s)),
+            ("TileCoder, tiles3 IHT", lambda s: tile_coder_batch(tc.IHT(args.iht_size), num_tilings,
+                                                                 args.num_tiles, s)),
+            ("TileCoder, ArrayIHT", lambda s: tile_coder_batch(ArrayIHT(args.iht_size), num_tilings,
+                                                               args.num_tiles, s)),
+            ("TileCoder, int size", lambda s: tile_coder_batch(args.iht_size, num_tilings, args.num_tiles, s)),
+        ]
+        for name, encode in variants:
+            rate = states_per_second(encode, states, args.repeats)
+            print("{:<8} {:<28} {:>14,.0f}".format(num_tilings, name, rate))
+
+
+if __name__ == '__main__':
+    main()
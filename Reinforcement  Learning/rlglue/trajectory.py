@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+
+"""Records the (s, a, r, s', done) steps of RLGlue episodes and replays them offline.
+
+For policy evaluation the behaviour policy does not depend on the step-size
+being compared, so the environment only has to be simulated once: record the
+episodes, then replay them through every agent (replay_episodes) or through
+all the step-sizes of a tabular / state-aggregation TD(0) sweep at once
+(td_replay).
+
+Trajectories are a dict of columns, one row per step, episode after episode:
+"states", "actions", "rewards", "next_states" and "terminals", and the
+(num_episodes + 1,) "episode_offsets": episode i is rows episode_offsets[i] to
+episode_offsets[i + 1]. An episode cut off by max_steps ends on a row whose
+terminal flag is False.
+
+Example:
+
+    rl_glue = RLGlue(RandomWalkEnvironment, TDAgent)
+    recorder = rl_glue.rl_enable_recording()
+    rl_glue.rl_init(agent_info, env_info)
+    for episode in range(num_episodes):
+        rl_glue.rl_episode(0)
+    save_trajectories("data/walks", recorder.trajectories())
+
+    walks = load_trajectories("data/walks", mmap_mode="r")
+    weights = td_replay(walks, step_sizes=[0.01, 0.05, 0.1], num_features=10,
+                        features=(np.arange(502) - 1) // 50)
+"""
+
+import os
+
+import numpy as np
+
+from rlglue.profiling import MethodPatch
+
+COLUMNS = ("states", "actions", "rewards", "next_states", "terminals")
+
+
+def _compact(column):
+    """The column as an array, with integers stored in the smallest signed dtype that holds them."""
+    column = np.asarray(column)
+    if column.dtype.kind in "iu" and column.size:
+        for dtype in (np.int8, np.int16, np.int32):
+            info = np.iinfo(dtype)
+            if info.min <= column.min() and column.max() <= info.max:
+                return column.astype(dtype)
+    return column
+
+
+class TrajectoryRecorder:
+    """TrajectoryRecorder class
+
+    Wraps the env_start and env_step methods of an environment instance (like
+    rlglue.profiling.Profiler), so every step taken through it is recorded,
+    whoever drives the environment. The action is the argument of env_step.
+
+    args:
+        environment: the environment instance to record
+    """
+
+    def __init__(self, environment):
+        self.environment = environment
+        self.columns = {column: [] for column in COLUMNS}
+        self.episode_starts = []
+        self.state = None
+
+        states, actions, rewards, next_states, terminals = (self.columns[column] for column in COLUMNS)
+
+        def make_recorded_start(env_start):
+            def recorded_start():
+                self.state = env_start()
+                self.episode_starts.append(len(states))
+                return self.state
+
+            return recorded_start
+
+        def make_recorded_step(env_step):
+            def recorded_step(action):
+                reward_obs_term = env_step(action)
+                reward, state, terminal = reward_obs_term
+
+                states.append(self.state)
+                actions.append(action)
+                rewards.append(reward)
+                next_states.append(state)
+                terminals.append(terminal)
+                self.state = state
+
+                return reward_obs_term
+
+            return recorded_step
+
+        self.patches = [MethodPatch(environment, "env_start", make_recorded_start),
+                        MethodPatch(environment, "env_step", make_recorded_step)]
+
+    def unwrap(self):
+        """Restores the environment methods; the steps recorded so far are kept."""
+        for patch in reversed(self.patches):
+            patch.remove()
+
+    def reset(self):
+        """Forgets the recorded steps, e.g. between runs."""
+        for column in self.columns.values():
+            column.clear()
+        self.episode_starts = []
+
+    def num_episodes(self):
+        return len(self.episode_starts)
+
+    def trajectories(self):
+        """The recorded episodes
+
+        Returns:
+            dict: the columns described in the module docstring, as arrays
+        """
+        trajectories = {column: _compact(values) for column, values in self.columns.items()}
+        trajectories["terminals"] = trajectories["terminals"].astype(bool)
+        trajectories["episode_offsets"] = np.array(self.episode_starts + [len(self.columns["states"])],
+                                                   dtype=np.int64)
+        return trajectories
+
+
+def save_trajectories(path, trajectories):
+    """Writes trajectories to disk
+
+    Args:
+        path (string): a ".npz" file (compressed), or a directory that gets one
+            .npy file per column, which load_trajectories can memory-map
+        trajectories (dict): the columns, e.g. TrajectoryRecorder.trajectories()
+    """
+    if path.endswith(".npz"):
+        np.savez_compressed(path, **trajectories)
+        return
+
+    os.makedirs(path, exist_ok=True)
+    for column, values in trajectories.items():
+        np.save(os.path.join(path, column + ".npy"), values)
+
+
+def load_trajectories(path, mmap_mode=None):
+    """Reads trajectories written by save_trajectories
+
+    Args:
+        path (string): the ".npz" file or the directory of columns
+        mmap_mode (string): e.g. "r" to memory-map the columns of a directory
+            instead of reading them (ignored for ".npz" files)
+
+    Returns:
+        dict: the columns
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            return {column: data[column] for column in data.files}
+
+    return {name[:-len(".npy")]: np.load(os.path.join(path, name), mmap_mode=mmap_mode)
+            for name in sorted(os.listdir(path)) if name.endswith(".npy")}
+
+
+def replay_episodes(trajectories, agents, episodes=None, callback=None):
+    """Feeds recorded episodes to agents, in place of the environment
+
+    Every agent sees the same states and rewards, as if each had been run by
+    RLGlue on the same episodes; the actions the agents return are ignored,
+    so only agents that do not change the behaviour policy (policy
+    evaluation) learn what they would have learned online.
+
+    Args:
+        trajectories (dict): the recorded columns
+        agents (list): initialized agents with agent_start, agent_step and agent_end
+        episodes (iterable): the indices of the episodes to replay, all of them by default
+        callback (callable): callback(episode, agents) after every episode,
+            e.g. to log a learning curve
+
+    Returns:
+        list: the agents
+    """
+    offsets = trajectories["episode_offsets"]
+    if episodes is None:
+        episodes = range(len(offsets) - 1)
+
+    for episode in episodes:
+        start, end = offsets[episode], offsets[episode + 1]
+        # plain Python values (or arrays for vector states), as an environment would give them
+        rewards = trajectories["rewards"][start:end].tolist()
+        next_states = trajectories["next_states"][start:end]
+        terminals = trajectories["terminals"][start:end].tolist()
+        first_state = trajectories["states"][start]
+        if next_states.ndim == 1:
+            next_states = next_states.tolist()
+            first_state = first_state.item()
+
+        for agent in agents:
+            agent.agent_start(first_state)
+
+        for t in range(end - start):
+            if terminals[t]:
+                for agent in agents:
+                    agent.agent_end(rewards[t])
+            else:
+                for agent in agents:
+                    agent.agent_step(rewards[t], next_states[t])
+
+        if callback is not None:
+            callback(episode, agents)
+
+    return agents
+
+
+def td_replay(trajectories, step_sizes, num_features, features=None, discount=1.0,
+              weights=None, episodes=None, callback=None):
+    """TD(0) with one-hot features, for every step-size at once, on recorded episodes
+
+    Makes the updates of the tabular (features=None) or state-aggregation TD
+    agents of the notebooks, w[x] += step_size * (r + discount * w[x'] - w[x])
+    with w[x'] = 0 after a terminal step, as one (num_step_sizes,) vector
+    operation per step.
+
+    Args:
+        trajectories (dict): the recorded columns, with integer states
+        step_sizes (list): the step-sizes to compare
+        num_features (int): the number of weights of each agent
+        features (Numpy array): the feature index (e.g. group) of every state;
+            by default the state is its own feature
+        discount (float): the discount factor
+        weights (Numpy array): (num_step_sizes, num_features) weights to start
+            from, updated in place; zeros by default
+        episodes (iterable): the indices of the episodes to replay, all of them by default
+        callback (callable): callback(episode, weights) after every episode
+
+    Returns:
+        Numpy array: the (num_step_sizes, num_features) weights, one row per step-size
+    """
+    step_sizes = np.asarray(step_sizes, dtype=float)
+    if weights is None:
+        weights = np.zeros((len(step_sizes), num_features))
+
+    offsets = trajectories["episode_offsets"]
+    if episodes is None:
+        episodes = range(len(offsets) - 1)
+
+    for episode in episodes:
+        start, end = offsets[episode], offsets[episode + 1]
+        x = np.asarray(trajectories["states"][start:end], dtype=np.intp)
+        next_x = np.asarray(trajectories["next_states"][start:end], dtype=np.intp)
+        if features is not None:
+            x = features[x]
+            next_x = features[next_x]
+        rewards = np.asarray(trajectories["rewards"][start:end], dtype=float)
+        continues = ~np.asarray(trajectories["terminals"][start:end])
+
+        for t in range(end - start):
+            target = rewards[t]
+            if continues[t]:
+                target = target + discount * weights[:, next_x[t]]
+            weights[:, x[t]] += step_sizes * (target - weights[:, x[t]])
+
+        if callback is not None:
+            callback(episode, weights)
+
+    return weights
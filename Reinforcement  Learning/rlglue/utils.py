@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+"""Action-selection helpers shared by the agents.
+"""
+
+import numpy as np
+
+
+def argmax(q_values, rand_generator=np.random, compat=True):
+    """argmax with random tie-breaking
+
+    Args:
+        q_values (Numpy array): the array of action values
+        rand_generator: the np.random.RandomState (or the np.random module)
+            used to break ties
+        compat (bool): draw a random number on every call, even without a tie.
+            This consumes rand_generator exactly like the loop-based
+            rand_generator.choice(ties) it replaces, so seeded runs and the
+            notebook grader asserts are unchanged. With compat=False the
+            draw is skipped when there is a single best action.
+    Returns:
+        action (int): an action with the highest value
+    """
+    q_values = np.asarray(q_values)
+    ties = np.flatnonzero(q_values == q_values.max())
+
+    if not compat and len(ties) == 1:
+        return ties[0]
+    return ties[rand_generator.randint(len(ties))]
+
+
+def batch_argmax(q_values, rand_generator=np.random):
+    """argmax with random tie-breaking of every row of a (batch, num_actions) matrix
+
+    Makes one draw per row, in row order, so the result is the same as calling
+    argmax (with compat=True) on every row in turn with the same rand_generator.
+
+    Args:
+        q_values (Numpy array): the (batch, num_actions) action values
+        rand_generator: the np.random.RandomState (or the np.random module)
+            used to break ties
+    Returns:
+        Numpy array: one action with the highest value per row
+    """
+    q_values = np.asarray(q_values)
+    is_max = q_values == q_values.max(axis=1, keepdims=True)
+    ties_seen = np.cumsum(is_max, axis=1)
+
+    # pick the k-th tied action of every row, k drawn uniformly from the row's ties
+    k = rand_generator.randint(0, ties_seen[:, -1])
+    return np.argmax(ties_seen > k[:, None], axis=1)
@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+
+"""Glues together N independent agent/environment runs stepped in lock-step.
+"""
+
+import numpy as np
+
+
+class _LoopEnvironment:
+    """Adapts N scalar RL-Glue environments to the batched environment protocol.
+
+    args:
+        environments (list): one BaseEnvironment instance per run
+    """
+
+    def __init__(self, environments):
+        self.environments = environments
+        self.observations = None
+
+    def env_init(self, env_infos):
+        for environment, env_info in zip(self.environments, env_infos):
+            environment.env_init(env_info)
+
+    def env_start_batch(self, mask):
+        """Starts the runs selected by mask.
+
+        Returns:
+            list: the current observation of every run
+        """
+        if self.observations is None:
+            self.observations = [None] * len(self.environments)
+
+        for i in np.flatnonzero(mask):
+            self.observations[i] = self.environments[i].env_start()
+
+        return _stack(self.observations)
+
+    def env_step_batch(self, actions):
+        """Steps every run with its own action.
+
+        Returns:
+            (Numpy array, Numpy array, Numpy array): rewards, observations and
+                terminal flags, one row per run
+        """
+        num_runs = len(self.environments)
+        rewards = np.zeros(num_runs)
+        terminals = np.zeros(num_runs, dtype=bool)
+
+        for i, environment in enumerate(self.environments):
+            rewards[i], self.observations[i], terminals[i] = environment.env_step(actions[i])
+
+        return rewards, _stack(self.observations), terminals
+
+    def env_cleanup(self):
+        for environment in self.environments:
+            environment.env_cleanup()
+
+    def env_message(self, message):
+        return [environment.env_message(message) for environment in self.environments]
+
+
+class _LoopAgent:
+    """Adapts N scalar RL-Glue agents to the batched agent protocol.
+
+    args:
+        agents (list): one BaseAgent instance per run
+    """
+
+    def __init__(self, agents):
+        self.agents = agents
+
+    def agent_init(self, agent_infos):
+        for agent, agent_info in zip(self.agents, agent_infos):
+            agent.agent_init(agent_info)
+
+    def agent_start_batch(self, observations, mask):
+        actions = [None] * len(self.agents)
+        for i in np.flatnonzero(mask):
+            actions[i] = self.agents[i].agent_start(observations[i])
+
+        return actions
+
+    def agent_step_batch(self, rewards, observations, terminals):
+        actions = [None] * len(self.agents)
+        for i, agent in enumerate(self.agents):
+            if terminals[i]:
+                agent.agent_end(rewards[i])
+            else:
+                actions[i] = agent.agent_step(rewards[i], observations[i])
+
+        return actions
+
+    def agent_cleanup(self):
+        for agent in self.agents:
+            agent.agent_cleanup()
+
+    def agent_message(self, message):
+        return [agent.agent_message(message) for agent in self.agents]
+
+
+def _stack(values):
+    """Stacks per-run values into one array, keeping ragged or None values as objects."""
+    try:
+        return np.asarray(values)
+    except ValueError:
+        stacked = np.empty(len(values), dtype=object)
+        stacked[:] = values
+        return stacked
+
+
+def _per_run_infos(info, num_runs):
+    """Expands a shared info dict (or a list of per-run dicts) into num_runs dicts."""
+    if isinstance(info, dict):
+        return [dict(info) for _ in range(num_runs)]
+
+    if len(info) != num_runs:
+        raise ValueError("Expected {} per-run info dicts, got {}".format(num_runs, len(info)))
+    return list(info)
+
+
+class VectorRLGlue:
+    """VectorRLGlue class
+
+    Steps num_runs independent agent/environment pairs in lock-step. Episodes
+    that terminate are reset automatically, so every call to rl_step advances
+    every run by exactly one environment step.
+
+    Environment classes that define env_start_batch(mask) and
+    env_step_batch(actions), and agent classes that define
+    agent_start_batch(observations, mask) and
+    agent_step_batch(rewards, observations, terminals), are instantiated once
+    and receive "num_runs" in their init info. Any other class falls back to
+    num_runs scalar instances driven by a Python loop.
+
+    args:
+        env_class: the Environment class, batched or scalar
+        agent_class: the Agent class, batched or scalar
+        num_runs (int): the number of independent runs
+    """
+
+    def __init__(self, env_class, agent_class, num_runs):
+        self.num_runs = num_runs
+
+        self.env_is_batched = hasattr(env_class, "env_step_batch")
+        self.agent_is_batched = hasattr(agent_class, "agent_step_batch")
+
+        if self.env_is_batched:
+            self.environment = env_class()
+        else:
+            self.environment = _LoopEnvironment([env_class() for _ in range(num_runs)])
+
+        if self.agent_is_batched:
+            self.agent = agent_class()
+        else:
+            self.agent = _LoopAgent([agent_class() for _ in range(num_runs)])
+
+        self.last_observations = None
+        self.last_actions = None
+        self.total_reward = None
+        self.num_steps = None
+        self.num_episodes = None
+        self.episode_returns = None
+        self.episode_steps = None
+
+    def rl_init(self, agent_init_info={}, env_init_info={}):
+        """Initial method called when the VectorRLGlue experiment is created
+
+        Args:
+            agent_init_info (dict or list): a dict shared by every run, or a
+                list of num_runs dicts (e.g. with a different "seed" each)
+            env_init_info (dict or list): same as agent_init_info, for the
+                environment
+        """
+        if self.env_is_batched:
+            self.environment.env_init(dict(env_init_info, num_runs=self.num_runs))
+        else:
+            self.environment.env_init(_per_run_infos(env_init_info, self.num_runs))
+
+        if self.agent_is_batched:
+            self.agent.agent_init(dict(agent_init_info, num_runs=self.num_runs))
+        else:
+            self.agent.agent_init(_per_run_infos(agent_init_info, self.num_runs))
+
+        self.total_reward = np.zeros(self.num_runs)
+        self.num_steps = np.zeros(self.num_runs, dtype=int)
+        self.num_episodes = np.zeros(self.num_runs, dtype=int)
+        self.episode_returns = [[] for _ in range(self.num_runs)]
+        self.episode_steps = [[] for _ in range(self.num_runs)]
+
+    def rl_start(self):
+        """Starts an episode in every run
+
+        Returns:
+            tuple: (observations, actions), one row per run
+        """
+        mask = np.ones(self.num_runs, dtype=bool)
+        self.total_reward[:] = 0.0
+        self.num_steps[:] = 1
+
+        self.last_observations = self.environment.env_start_batch(mask)
+        self.last_actions = _stack(self.agent.agent_start_batch(self.last_observations, mask))
+
+        return self.last_observations, self.last_actions
+
+    def rl_step(self, max_steps_this_episode=0):
+        """Step taken by VectorRLGlue in every run: takes an environment step,
+            then either a step or an end by the agent, and restarts the runs
+            whose episode is over.
+
+        Args:
+            max_steps_this_episode (Int): episodes reaching this many steps are
+                cut off and restarted without calling agent_end (0 for no
+                limit). Steps are counted as RLGlue counts them, from 1 at the
+                start, so a cut-off episode took max_steps_this_episode - 1
+                environment steps, as in RLGlue.rl_episode.
+
+        Returns:
+            (Numpy array, Numpy array, Numpy array, Numpy array): rewards,
+                observations, actions and terminal flags. The observations and
+                actions of terminated runs are those of the new episode.
+        """
+        rewards, observations, terminals = self.environment.env_step_batch(self.last_actions)
+        terminals = np.asarray(terminals, dtype=bool)
+
+        self.total_reward += rewards
+        self.num_steps += ~terminals
+
+        actions = _stack(self.agent.agent_step_batch(rewards, observations, terminals))
+
+        done = terminals
+        if max_steps_this_episode > 0:
+            done = terminals | (self.num_steps >= max_steps_this_episode)
+
+        if done.any():
+            self._end_episodes(done, terminals)
+            observations = self.environment.env_start_batch(done)
+            start_actions = _stack(self.agent.agent_start_batch(observations, done))
+            if actions.dtype != start_actions.dtype:
+                actions = actions.astype(object)
+            actions[done] = start_actions[done]
+            if actions.dtype == object:
+                actions = _stack(actions.tolist())
+
+        self.last_observations = observations
+        self.last_actions = actions
+
+        return rewards, observations, actions, terminals
+
+    def _end_episodes(self, done, terminals):
+        """Books the statistics of the finished episodes and resets their counters."""
+        self.num_episodes += terminals
+        for i in np.flatnonzero(done):
+            self.episode_returns[i].append(self.total_reward[i])
+            self.episode_steps[i].append(self.num_steps[i])
+
+        self.total_reward[done] = 0.0
+        self.num_steps[done] = 1
+
+    def rl_run(self, num_steps, max_steps_this_episode=0):
+        """Runs every run for a fixed number of steps
+
+        Args:
+            num_steps (Int): the number of steps to take in every run
+            max_steps_this_episode (Int): see rl_step
+
+        Returns:
+            Numpy array: the (num_steps, num_runs) rewards
+        """
+        if self.last_actions is None:
+            self.rl_start()
+
+        rewards = np.zeros((num_steps, self.num_runs))
+        rl_step = self.rl_step
+        for t in range(num_steps):
+            rewards[t] = rl_step(max_steps_this_episode)[0]
+
+        return rewards
+
+    def rl_episodes(self, num_episodes, max_steps_this_episode=0):
+        """Runs until every run has finished num_episodes episodes
+
+        Runs that finish early keep stepping (the agents keep learning) until
+        the slowest run is done; their extra episodes are not returned.
+
+        Args:
+            num_episodes (Int): the number of episodes per run
+            max_steps_this_episode (Int): see rl_step
+
+        Returns:
+            (Numpy array, Numpy array): the (num_runs, num_episodes) episode
+                returns and episode lengths
+        """
+        first_episode = [len(returns) for returns in self.episode_returns]
+        target = np.array(first_episode) + num_episodes
+
+        self.rl_start()
+        rl_step = self.rl_step
+        while any(len(returns) < end for returns, end in zip(self.episode_returns, target)):
+            rl_step(max_steps_this_episode)
+
+        returns = np.array([r[start:start + num_episodes]
+                            for r, start in zip(self.episode_returns, first_episode)])
+        steps = np.array([s[start:start + num_episodes]
+                          for s, start in zip(self.episode_steps, first_episode)])
+
+        return returns, steps
+
+    def rl_cleanup(self):
+        """Cleanup done at end of experiment."""
+        self.environment.env_cleanup()
+        self.agent.agent_cleanup()
+
+    def rl_agent_message(self, message):
+        """Message passed to communicate with the agent(s) during experiment
+
+        Returns:
+            The answer of a batched agent, or a list with one answer per run
+        """
+        return self.agent.agent_message(message)
+
+    def rl_env_message(self, message):
+        """Message passed to communicate with the environment(s) during experiment
+
+        Returns:
+            The answer of a batched environment, or a list with one answer per run
+        """
+        return self.environment.env_message(message)
+
+    def rl_return(self):
+        """The total reward of the current episode of every run
+
+        Returns:
+            Numpy array: one total reward per run
+        """
+        return self.total_reward
+
+    def rl_num_steps(self):
+        """The number of steps taken in the current episode of every run
+
+        Returns:
+            Numpy array: one step count per run
+        """
+        return self.num_steps
+
+    def rl_num_episodes(self):
+        """The number of terminated episodes of every run
+
+        Returns:
+            Numpy array: one episode count per run
+        """
+        return self.num_episodes